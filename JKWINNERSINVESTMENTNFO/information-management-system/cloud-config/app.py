@@ -1,26 +1,110 @@
 # Cloud-Ready Flask Application for JKWI Information Management System
-from flask import Flask, request, jsonify, render_template
+from flask import Flask, request, jsonify, render_template, make_response
 from flask_cors import CORS
-from flask_jwt_extended import JWTManager, jwt_required, create_access_token, get_jwt_identity
-from werkzeug.security import generate_password_hash, check_password_hash
+from flask_jwt_extended import jwt_required, create_access_token, get_jwt, get_jwt_identity, verify_jwt_in_request
+from werkzeug.middleware.proxy_fix import ProxyFix
 import os
 import json
+import time
+import base64
+import hashlib
+from functools import wraps
 from datetime import datetime, timedelta
 import firebase_admin
 from firebase_admin import credentials, firestore
 from dotenv import load_dotenv
+from id_generator import new_id as new_doc_id
+from async_data import AsyncCloudDataManager
+from collection_cache import CollectionCache, ttls_from_env
+from user_store import DuplicateUserError, create_user_repository, public_user
+from password_hasher import HasherBusyError, hasher_from_env
+from auth_tokens import CachingJWTManager, TokenDenylist, VerifiedTokenCache
+from compression import ORJSON_AVAILABLE, ORJSONProvider, init_compression
+from change_log import ChangeLog
+from local_store import CollectionVersions, LocalDocumentStore
+from events import ChangeLogBroadcaster, Debouncer, EventBroker
+from metrics import MetricsRegistry, SharedMetricsStore, init_metrics
+from rate_limit import (ConcurrencyLimiter, MemoryBucketStore, RateLimiter, SQLiteBucketStore,
+                        init_rate_limiting, limits_from_env)
+from idempotency import (IN_FLIGHT, MISMATCH, REPLAY, MemoryIdempotencyStore, SQLiteIdempotencyStore,
+                         request_fingerprint)
 
 # Load environment variables
 load_dotenv()
 
 app = Flask(__name__)
 CORS(app)
+# Number of reverse proxies in front of the app whose X-Forwarded-For is trusted
+if int(os.getenv('TRUSTED_PROXIES', 0)):
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=int(os.getenv('TRUSTED_PROXIES')))
+
+# Faster JSON serialisation and compressed responses
+if ORJSON_AVAILABLE and os.getenv('FAST_JSON', 'true').lower() != 'false':
+    app.json = ORJSONProvider(app)
+# Before init_compression so request metrics see the compressed response
+metrics = MetricsRegistry(
+    shared=SharedMetricsStore() if os.getenv('METRICS_SHARED', 'false').lower() == 'true' else None,
+    publish_interval=float(os.getenv('METRICS_PUBLISH_INTERVAL', 5))
+)
+init_metrics(app, metrics)
+init_compression(
+    app,
+    min_size=int(os.getenv('COMPRESS_MIN_SIZE', 1024)),
+    gzip_level=int(os.getenv('GZIP_LEVEL', 6)),
+    brotli_quality=int(os.getenv('BROTLI_QUALITY', 4))
+)
 
 # Configuration
 app.config['JWT_SECRET_KEY'] = os.getenv('JWT_SECRET_KEY', 'your-secret-key-change-in-production')
 app.config['JWT_ACCESS_TOKEN_EXPIRES'] = timedelta(hours=24)
 
-jwt = JWTManager(app)
+jwt = CachingJWTManager(app, token_cache=VerifiedTokenCache(
+    max_size=int(os.getenv('TOKEN_CACHE_SIZE', 4096)),
+    ttl=float(os.getenv('TOKEN_CACHE_TTL', 300))
+))
+token_denylist = TokenDenylist(
+    max_token_age=app.config['JWT_ACCESS_TOKEN_EXPIRES'].total_seconds()
+)
+
+@jwt.token_in_blocklist_loader
+def check_if_token_revoked(jwt_header, jwt_payload):
+    """Reject logged-out tokens and tokens of deactivated users"""
+    return token_denylist.is_revoked(jwt_payload)
+
+@jwt.token_verification_loader
+def check_token_scope(jwt_header, jwt_payload):
+    """Stream tokens are only good for opening /api/events"""
+    if jwt_payload.get('scope') == STREAM_TOKEN_SCOPE:
+        return request.endpoint == 'stream_events'
+    return request.endpoint != 'stream_events'
+
+@jwt.token_verification_failed_loader
+def token_scope_rejected(jwt_header, jwt_payload):
+    return jsonify({'msg': 'Token not valid for this endpoint'}), 401
+
+def rate_limit_identity():
+    """User of a valid token, so authenticated callers are limited per user"""
+    try:
+        verify_jwt_in_request(optional=True)
+        return get_jwt_identity()
+    except Exception:
+        return None
+
+# Throttling per user/IP (opt-in) and a cap on requests in progress
+rate_limiter = None
+admission = None
+if os.getenv('RATE_LIMITING', 'false').lower() == 'true':
+    rate_limiter = RateLimiter(
+        limits_from_env(),
+        store=SQLiteBucketStore() if os.getenv('RATE_LIMIT_STORE', 'memory') == 'sqlite' else MemoryBucketStore()
+    )
+if int(os.getenv('MAX_CONCURRENT_REQUESTS', 100)):
+    admission = ConcurrencyLimiter(
+        int(os.getenv('MAX_CONCURRENT_REQUESTS', 100)),
+        wait=float(os.getenv('ADMISSION_WAIT', 0))
+    )
+if rate_limiter or admission:
+    init_rate_limiting(app, rate_limiter, admission, identify=rate_limit_identity)
 
 # Initialize Firebase (alternative cloud database option)
 try:
@@ -36,22 +120,56 @@ except Exception as e:
     print(f"⚠️ Firebase initialization failed: {e}")
     db = None
 
+# Firestore rejects batched writes with more than 500 operations
+FIRESTORE_BATCH_LIMIT = 500
+MAX_BATCH_ITEMS = int(os.getenv('MAX_BATCH_ITEMS', 1000))
+# Collections with a POST /api/<collection>:batch endpoint, advertised by /api/health
+BATCH_COLLECTIONS = ['directors', 'divisions', 'members', 'partnerships']
+# Bounds how long a cloud ETag can miss writes made outside this API
+ETAG_MAX_AGE = int(os.getenv('ETAG_MAX_AGE', 60))
+
+metrics.describe('jkwi_data_operation_duration_seconds', 'histogram',
+                 'CloudDataManager calls by operation, collection and backend')
+metrics.describe('jkwi_password_hash_duration_seconds', 'histogram',
+                 'Password hashing and verification, including queueing')
+
+def timed_data_op(operation):
+    """Record how long a CloudDataManager call takes, by collection and backend"""
+    def decorator(method):
+        @wraps(method)
+        def wrapper(self, collection_name, *args, **kwargs):
+            with metrics.time('jkwi_data_operation_duration_seconds', operation=operation,
+                              collection=collection_name, backend='firestore' if self.use_cloud else 'local'):
+                return method(self, collection_name, *args, **kwargs)
+        return wrapper
+    return decorator
+
 class CloudDataManager:
     """Enhanced data manager with cloud database support"""
     
-    def __init__(self):
+    def __init__(self, change_log=None, local_store=None, versions=None):
         self.use_cloud = db is not None
-        self.local_data = self._get_default_data()
+        self.change_log = change_log
+        # Shared by every worker process through the state database
+        self.local_store = local_store or LocalDocumentStore()
+        self.local_store.seed(self._get_default_data())
+        self.versions = versions or CollectionVersions()
+        self._local_reads = {}
+        self._seen_versions = {}
+        self.cache = CollectionCache(ttls_from_env())
+        self._listeners = {}
+        self._change_listeners = []
         
     def _get_default_data(self):
         """Default data structure for local fallback"""
         return {
-            'company': {
+            'company': [{
+                'id': 'main',
                 'name': 'JK Winners Investment',
                 'tradingName': 'JKWI',
                 'description': 'JK Winners Investment (JKWI) is a comprehensive investment company structured to provide excellence across multiple sectors.',
                 'lastUpdated': datetime.now().isoformat()
-            },
+            }],
             'directors': [],
             'divisions': [
                 {'id': 1, 'name': 'Mining Division', 'description': 'Mineral extraction and resource development', 'head': ''},
@@ -73,120 +191,403 @@ class CloudDataManager:
             ]
         }
     
-    async def get_collection(self, collection_name):
-        """Get data from cloud or local storage"""
-        if self.use_cloud:
-            try:
-                docs = db.collection(collection_name).stream()
-                return [{'id': doc.id, **doc.to_dict()} for doc in docs]
-            except Exception as e:
-                print(f"Cloud fetch error for {collection_name}: {e}")
-                return self.local_data.get(collection_name, [])
-        else:
-            return self.local_data.get(collection_name, [])
-    
-    async def save_to_collection(self, collection_name, doc_id, data):
-        """Save data to cloud or local storage"""
-        if self.use_cloud:
-            try:
-                doc_ref = db.collection(collection_name).document(doc_id)
-                doc_ref.set(data)
-                return True
-            except Exception as e:
-                print(f"Cloud save error for {collection_name}: {e}")
-                return False
-        else:
-            if collection_name not in self.local_data:
-                self.local_data[collection_name] = []
-            
-            # Update existing or add new
-            existing_index = next((i for i, item in enumerate(self.local_data[collection_name]) 
-                                 if item.get('id') == doc_id), None)
-            
-            data['id'] = doc_id
-            if existing_index is not None:
-                self.local_data[collection_name][existing_index] = data
-            else:
-                self.local_data[collection_name].append(data)
-            return True
-    
-    async def delete_from_collection(self, collection_name, doc_id):
-        """Delete data from cloud or local storage"""
-        if self.use_cloud:
-            try:
-                db.collection(collection_name).document(doc_id).delete()
-                return True
-            except Exception as e:
-                print(f"Cloud delete error for {collection_name}: {e}")
-                return False
-        else:
-            if collection_name in self.local_data:
-                self.local_data[collection_name] = [
-                    item for item in self.local_data[collection_name] 
-                    if item.get('id') != doc_id
-                ]
-            return True
+    @timed_data_op('get')
+    def get_collection_sync(self, collection_name, consistent=False):
+        """Get data from cloud or local storage (synchronous)
 
-    # Synchronous versions for Flask compatibility
-    def get_collection_sync(self, collection_name):
-        """Get data from cloud or local storage (synchronous)"""
+        Cloud reads are served from the collection cache unless ``consistent``
+        is set, which always reads through to Firestore.
+        """
+        # Read before the data, so a racing write can only make the copy look older
+        version = self.versions.get(collection_name)
         if self.use_cloud:
+            use_cache = not consistent and self.cache.is_cached(collection_name)
+            if use_cache:
+                if self._seen_versions.get(collection_name) != version:
+                    # Another worker wrote to this collection since it was cached
+                    self.cache.invalidate(collection_name)
+                    self._seen_versions[collection_name] = version
+                hit, cached = self.cache.get(collection_name)
+                if hit:
+                    return cached
+                generation = cached
             try:
                 docs = db.collection(collection_name).stream()
-                return [{'id': doc.id, **doc.to_dict()} for doc in docs]
+                result = [{'id': doc.id, **doc.to_dict()} for doc in docs]
+                if use_cache:
+                    self.cache.put(collection_name, result, generation)
+                return result
             except Exception as e:
                 print(f"Cloud fetch error for {collection_name}: {e}")
-                return self.local_data.get(collection_name, [])
+                return self.local_store.list(collection_name)
         else:
-            return self.local_data.get(collection_name, [])
+            cached = self._local_reads.get(collection_name)
+            if cached is not None and cached[0] == version:
+                return cached[1]
+            result = self.local_store.list(collection_name)
+            self._local_reads[collection_name] = (version, result)
+            return result
     
+    @timed_data_op('save')
     def save_to_collection_sync(self, collection_name, doc_id, data):
         """Save data to cloud or local storage (synchronous)"""
         if self.use_cloud:
             try:
                 doc_ref = db.collection(collection_name).document(doc_id)
                 doc_ref.set(data)
+                self._log_changes(collection_name, [(doc_id, 'upsert', {**data, 'id': doc_id})])
                 return True
             except Exception as e:
                 print(f"Cloud save error for {collection_name}: {e}")
                 return False
+            finally:
+                self._after_write(collection_name)
         else:
-            if collection_name not in self.local_data:
-                self.local_data[collection_name] = []
-            
-            # Update existing or add new
-            existing_index = next((i for i, item in enumerate(self.local_data[collection_name]) 
-                                 if item.get('id') == doc_id), None)
-            
             data['id'] = doc_id
-            if existing_index is not None:
-                self.local_data[collection_name][existing_index] = data
-            else:
-                self.local_data[collection_name].append(data)
+            self.local_store.upsert_many(collection_name, [(doc_id, data)])
+            self._log_changes(collection_name, [(doc_id, 'upsert', data)])
+            self._after_write(collection_name)
             return True
     
+    @timed_data_op('save_many')
+    def save_many_to_collection_sync(self, collection_name, items):
+        """Save a list of (doc_id, data) pairs, returning one success flag per item"""
+        if self.use_cloud:
+            results = []
+            for start in range(0, len(items), FIRESTORE_BATCH_LIMIT):
+                chunk = items[start:start + FIRESTORE_BATCH_LIMIT]
+                try:
+                    batch = db.batch()
+                    collection_ref = db.collection(collection_name)
+                    for doc_id, data in chunk:
+                        batch.set(collection_ref.document(doc_id), data)
+                    batch.commit()
+                    self._log_changes(collection_name, [
+                        (doc_id, 'upsert', {**data, 'id': doc_id}) for doc_id, data in chunk
+                    ])
+                    results.extend([True] * len(chunk))
+                except Exception as e:
+                    # A batch commits atomically, so the whole chunk failed
+                    print(f"Cloud batch save error for {collection_name}: {e}")
+                    results.extend([False] * len(chunk))
+            self._after_write(collection_name)
+            return results
+        else:
+            for doc_id, data in items:
+                data['id'] = doc_id
+            self.local_store.upsert_many(collection_name, items)
+            self._log_changes(collection_name, [(doc_id, 'upsert', data) for doc_id, data in items])
+            self._after_write(collection_name)
+            return [True] * len(items)
+    
+    @timed_data_op('delete')
     def delete_from_collection_sync(self, collection_name, doc_id):
         """Delete data from cloud or local storage (synchronous)"""
         if self.use_cloud:
             try:
                 db.collection(collection_name).document(doc_id).delete()
+                self._log_changes(collection_name, [(doc_id, 'delete', None)])
                 return True
             except Exception as e:
                 print(f"Cloud delete error for {collection_name}: {e}")
                 return False
+            finally:
+                self._after_write(collection_name)
         else:
-            if collection_name in self.local_data:
-                self.local_data[collection_name] = [
-                    item for item in self.local_data[collection_name] 
-                    if item.get('id') != doc_id
-                ]
+            self.local_store.delete(collection_name, doc_id)
+            self._log_changes(collection_name, [(doc_id, 'delete', None)])
+            self._after_write(collection_name)
+            return True
+
+    def add_change_listener(self, listener):
+        """Call listener(collection_name, [(doc_id, op, data), ...]) after each successful write"""
+        self._change_listeners.append(listener)
+
+    def _log_changes(self, collection_name, changes):
+        """Record successful writes for /api/sync and notify change listeners"""
+        if not changes:
+            return
+        if self.change_log is not None:
+            self.change_log.append_many(collection_name, changes)
+        for listener in self._change_listeners:
+            listener(collection_name, changes)
+
+    def _after_write(self, collection_name):
+        """Invalidate cached reads and bump the collection's version"""
+        self.cache.invalidate(collection_name)
+        self.versions.bump(collection_name)
+    
+    def etag(self, collection_name, variant=b''):
+        """ETag for the current version of a collection
+
+        ``variant`` distinguishes differently shaped responses of the same
+        collection, such as pages of a paginated list.
+        """
+        parts = [self.versions.epoch, collection_name, str(self.versions.get(collection_name))]
+        if self.use_cloud:
+            parts.append(str(int(time.time() // ETAG_MAX_AGE)))
+        return hashlib.sha1('|'.join(parts).encode('utf-8') + variant).hexdigest()[:20]
+    
+    def watch_collection(self, collection_name):
+        """Keep a collection's cache entry hot with a Firestore snapshot listener"""
+        if not self.use_cloud or collection_name in self._listeners:
+            return False
+        
+        def on_snapshot(col_snapshot, changes, read_time):
+            # Bump first and mark the new version as seen, otherwise the next
+            # read would take the refreshed entry for a stale one and drop it
+            self._seen_versions[collection_name] = self.versions.bump(collection_name)
+            self.cache.refresh(collection_name, [{'id': doc.id, **doc.to_dict()} for doc in col_snapshot])
+            for listener in self._change_listeners:
+                listener(collection_name, [
+                    (change.document.id, 'delete' if change.type.name == 'REMOVED' else 'upsert', None)
+                    for change in changes
+                ])
+        
+        try:
+            self._listeners[collection_name] = db.collection(collection_name).on_snapshot(on_snapshot)
             return True
+        except Exception as e:
+            print(f"Cloud listener error for {collection_name}: {e}")
+            return False
 
 # Initialize cloud data manager
-cloud_data = CloudDataManager()
+cloud_data = CloudDataManager(change_log=ChangeLog())
+for collection_name in filter(None, os.getenv('CACHE_LISTEN', '').split(',')):
+    cloud_data.watch_collection(collection_name.strip())
+async_data = AsyncCloudDataManager(
+    cloud_data, max_concurrency=int(os.getenv('READ_CONCURRENCY', 8))
+)
+
+# Live updates for dashboards over /api/events
+event_broker = EventBroker(
+    max_pending=int(os.getenv('EVENTS_QUEUE_SIZE', 100)),
+    heartbeat=float(os.getenv('EVENTS_HEARTBEAT', 15)),
+    max_duration=float(os.getenv('EVENTS_MAX_DURATION', 300)),
+    max_subscribers=int(os.getenv('EVENTS_MAX_SUBSCRIBERS', 4))
+)
+# Stream tokens go in the /api/events URL, so they only open streams and expire quickly
+STREAM_TOKEN_SCOPE = 'events'
+STREAM_TOKEN_TTL = timedelta(seconds=int(os.getenv('EVENTS_TOKEN_TTL', 60)))
+
+def build_stats(data):
+    """Dashboard statistics from the directors, divisions and members collections"""
+    return {
+        'totalDirectors': len(data['directors']),
+        'totalDivisions': len(data['divisions']),
+        'totalMembers': len(data['members']),
+        'systemStatus': 'Active'
+    }
+
+def push_stats():
+    """Recompute the stats once for all open event streams"""
+    if not event_broker.has_subscribers():
+        # Nobody to keep it current for, so new subscribers get a fresh push instead
+        event_broker.discard('stats')
+        return
+    data = {name: cloud_data.get_collection_sync(name) for name in ('directors', 'divisions', 'members')}
+    event_broker.publish('stats', build_stats(data), sticky=True)
+
+stats_pusher = Debouncer(push_stats, delay=float(os.getenv('EVENTS_STATS_DEBOUNCE', 1.0)))
+
+def publish_changes(collection_name, changes):
+    """Notify event streams of changed documents; clients fetch them via /api/sync"""
+    event_broker.publish('change', {
+        'collection': collection_name,
+        'changes': [{'id': str(doc_id), 'op': op} for doc_id, op, _ in changes]
+    })
+    stats_pusher.trigger()
+
+cloud_data.add_change_listener(publish_changes)
+# Relays writes made by other worker processes; only needed with several workers
+event_broadcaster = None
+if os.getenv('EVENTS_BROADCAST', 'false').lower() == 'true':
+    event_broadcaster = ChangeLogBroadcaster(
+        cloud_data.change_log, publish_changes,
+        interval=float(os.getenv('EVENTS_POLL_INTERVAL', 1.0))
+    )
+
+MAX_PAGE_SIZE = 1000
+SYNC_COLLECTIONS = ('company', 'directors', 'divisions', 'members', 'partnerships')
+
+def conditional_get(collection_name):
+    """Answer If-None-Match with 304 when the collection has not changed
+
+    The ETag comes from the collection's version counter, which every write
+    bumps, so unchanged data is neither read nor serialised.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            etag = cloud_data.etag(collection_name, request.query_string)
+            if request.if_none_match.contains_weak(etag):
+                response = app.response_class(status=304)
+            else:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+            response.set_etag(etag, weak=True)
+            response.headers['Cache-Control'] = 'private, no-cache'
+            return response
+        return wrapper
+    return decorator
+
+def consistent_read():
+    """Whether the client asked to bypass the read cache"""
+    return (request.args.get('consistent') == 'true'
+            or 'no-cache' in request.headers.get('Cache-Control', ''))
+
+def encode_cursor(key):
+    """Opaque page cursor for a (created, id) sort key"""
+    return base64.urlsafe_b64encode(json.dumps(key).encode('utf-8')).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor, items, key):
+    """Sort key of a page cursor, or None if it is not valid"""
+    try:
+        decoded = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+        if isinstance(decoded, list) and len(decoded) == 2 and all(isinstance(part, str) for part in decoded):
+            return tuple(decoded)
+    except ValueError:
+        pass
+    # Cursors handed out before they carried the timestamp were bare IDs
+    return next((key(item) for item in items if str(item.get('id', '')) == cursor), None)
+
+def paginate(items, date_field):
+    """Apply ?after=<cursor>&limit=<n> cursor pagination when requested
+
+    Pages are ordered by creation time with the ID as tie-breaker, so legacy
+    timestamp IDs and ULIDs interleave correctly; documents without a creation
+    time come first. Without either parameter the full list is returned unchanged.
+    """
+    after = request.args.get('after')
+    limit = request.args.get('limit', type=int)
+    if after is None and limit is None:
+        return items
+    
+    def key(item):
+        return (str(item.get(date_field) or ''), str(item.get('id', '')))
+    
+    limit = max(1, min(limit or MAX_PAGE_SIZE, MAX_PAGE_SIZE))
+    ordered = sorted(items, key=key)
+    if after:
+        start = decode_cursor(after, items, key)
+        if start is None:
+            return None
+        ordered = [item for item in ordered if key(item) > start]
+    page = ordered[:limit]
+    return {
+        'items': page,
+        'next_cursor': encode_cursor(key(page[-1])) if len(ordered) > limit else None
+    }
+
+def page_response(items, date_field):
+    """JSON response for a possibly paginated collection"""
+    page = paginate(items, date_field)
+    if page is None:
+        return jsonify({'error': 'Invalid cursor'}), 400
+    return jsonify(page)
+
+# sqlite (default) shares keys between workers; memory is per process
+idempotency_store = (MemoryIdempotencyStore if os.getenv('IDEMPOTENCY_STORE', 'sqlite') == 'memory'
+                     else SQLiteIdempotencyStore)(
+    ttl=int(os.getenv('IDEMPOTENCY_TTL', 86400)),
+    max_entries=int(os.getenv('IDEMPOTENCY_MAX_KEYS', 5000))
+)
+
+def idempotent(view):
+    """Replay the stored response when a create is retried with the same Idempotency-Key"""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        key = request.headers.get('Idempotency-Key')
+        if key is None:
+            return view(*args, **kwargs)
+        if not key or len(key) > 255:
+            return jsonify({'error': 'Idempotency-Key must be 1 to 255 characters'}), 400
+        
+        scope = f'{get_jwt_identity()}|{request.method}|{request.path}|{key}'
+        state, stored = idempotency_store.begin(scope, request_fingerprint(request.get_data()))
+        if state == REPLAY:
+            status, body, mimetype = stored
+            response = app.response_class(body, status=status, mimetype=mimetype)
+            response.headers['Idempotent-Replayed'] = 'true'
+            return response
+        if state == IN_FLIGHT:
+            response = jsonify({'error': 'A request with this Idempotency-Key is still in progress'})
+            response.headers['Retry-After'] = '1'
+            return response, 409
+        if state == MISMATCH:
+            return jsonify({'error': 'Idempotency-Key was already used with a different request'}), 422
+        
+        try:
+            response = make_response(view(*args, **kwargs))
+        except Exception:
+            idempotency_store.abandon(scope)
+            raise
+        if response.status_code >= 500:
+            # Server-side failures are not remembered, so a retry can succeed
+            idempotency_store.abandon(scope)
+        else:
+            idempotency_store.complete(scope, response.status_code, response.get_data(), response.mimetype)
+        return response
+    return wrapper
+
+def create_batch(collection_name, date_field, label):
+    """Create every object in the request's JSON array with one batched write"""
+    items = request.get_json()
+    if not isinstance(items, list):
+        return jsonify({'error': 'Request body must be a JSON array'}), 400
+    if len(items) > MAX_BATCH_ITEMS:
+        return jsonify({'error': f'Batch exceeds {MAX_BATCH_ITEMS} items'}), 413
+    
+    created_at = datetime.now().isoformat()
+    results = [None] * len(items)
+    pending = []
+    for index, item in enumerate(items):
+        if not isinstance(item, dict):
+            results[index] = {'index': index, 'success': False, 'error': 'Item must be a JSON object'}
+            continue
+        doc_id = new_doc_id()
+        pending.append((index, doc_id, {**item, 'id': doc_id, date_field: created_at}))
+    
+    saved = cloud_data.save_many_to_collection_sync(
+        collection_name, [(doc_id, data) for _, doc_id, data in pending]
+    )
+    for (index, doc_id, data), success in zip(pending, saved):
+        results[index] = {'index': index, 'id': doc_id, 'success': success}
+        if not success:
+            results[index]['error'] = f'Failed to add {label}'
+    
+    created = sum(1 for result in results if result['success'])
+    return jsonify({
+        'message': f'{created} of {len(items)} {label}s added',
+        'created': created,
+        'failed': len(items) - created,
+        'results': results
+    }), 201 if created == len(items) else 207
 
 # User Management
-users_db = {}  # In production, this should be in the cloud database
+users = create_user_repository(db)
+password_hasher = hasher_from_env()
+password_hasher.observer = lambda operation, seconds: metrics.observe(
+    'jkwi_password_hash_duration_seconds', seconds, operation=operation
+)
+
+def admin_required(view):
+    """Only let active administrators through; use after @jwt_required()"""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        user = users.get_user(get_jwt_identity())
+        if not user or not user.get('is_admin') or not user.get('is_active', True):
+            return jsonify({'error': 'Administrator access required'}), 403
+        return view(*args, **kwargs)
+    return wrapper
+
+@app.errorhandler(HasherBusyError)
+def hasher_busy(error):
+    """Shed logins and registrations while the hashing queue is full"""
+    response = jsonify({'error': 'Server busy, please retry shortly'})
+    response.headers['Retry-After'] = '1'
+    return response, 503
 
 @app.route('/api/register', methods=['POST'])
 def register():
@@ -197,11 +598,15 @@ def register():
     email = data.get('email')
     division = data.get('division', '')
     
-    if username in users_db:
+    if not username or not password:
+        return jsonify({'error': 'Username and password are required'}), 400
+    
+    # Checked before hashing so duplicates are rejected cheaply
+    if users.get_user(username) is not None:
         return jsonify({'error': 'Username already exists'}), 400
     
     # Hash password
-    password_hash = generate_password_hash(password)
+    password_hash = password_hasher.hash(password)
     
     # Create user
     user_data = {
@@ -213,7 +618,12 @@ def register():
         'is_active': True
     }
     
-    users_db[username] = user_data
+    try:
+        users.create_user(user_data)
+    except DuplicateUserError as e:
+        if e.field == 'email':
+            return jsonify({'error': 'Email already registered'}), 400
+        return jsonify({'error': 'Username already exists'}), 400
     
     # Create access token
     access_token = create_access_token(identity=username)
@@ -235,16 +645,21 @@ def login():
     username = data.get('username')
     password = data.get('password')
     
-    if username not in users_db:
+    user = users.get_user(username) if username and password else None
+    if user is None:
         return jsonify({'error': 'Invalid credentials'}), 401
     
-    user = users_db[username]
-    if not check_password_hash(user['password_hash'], password):
+    if not password_hasher.verify(user['password_hash'], password):
+        users.record_login_attempt(username, success=False)
         return jsonify({'error': 'Invalid credentials'}), 401
     
     if not user.get('is_active', True):
         return jsonify({'error': 'Account is deactivated'}), 401
     
+    users.record_login_attempt(username, success=True)
+    if password_hasher.needs_rehash(user['password_hash']):
+        # Hashing settings changed since this password was stored
+        users.update_user(username, {'password_hash': password_hasher.hash(password)})
     access_token = create_access_token(identity=username)
     
     return jsonify({
@@ -256,15 +671,55 @@ def login():
         }
     }), 200
 
+@app.route('/api/logout', methods=['POST'])
+@jwt_required()
+def logout():
+    """Revoke the token used for this request"""
+    claims = get_jwt()
+    token_denylist.revoke_token(claims['jti'], claims['exp'])
+    return jsonify({'message': 'Logged out successfully'})
+
+@app.route('/api/users/<username>/deactivate', methods=['POST'])
+@jwt_required()
+@admin_required
+def deactivate_user(username):
+    """Deactivate a user and revoke their tokens immediately"""
+    if not users.update_user(username, {'is_active': False}):
+        return jsonify({'error': 'User not found'}), 404
+    token_denylist.revoke_identity(username)
+    return jsonify({'message': 'User deactivated successfully'})
+
+@app.route('/api/users/<username>/activate', methods=['POST'])
+@jwt_required()
+@admin_required
+def activate_user(username):
+    """Allow a deactivated user to log in again"""
+    if not users.update_user(username, {'is_active': True}):
+        return jsonify({'error': 'User not found'}), 404
+    # Tokens from before the deactivation stay revoked; new logins are accepted
+    token_denylist.restore_identity(username)
+    return jsonify({'message': 'User activated successfully'})
+
+@app.route('/api/users', methods=['GET'])
+@jwt_required()
+@admin_required
+def list_users():
+    """List or search users by username/email prefix"""
+    limit = max(1, min(request.args.get('limit', 50, type=int), 500))
+    offset = max(0, request.args.get('offset', 0, type=int))
+    found = users.list_users(request.args.get('q'), limit=limit, offset=offset)
+    return jsonify([public_user(user) for user in found])
+
 # Company Management
 @app.route('/api/company', methods=['GET'])
 @jwt_required()
+@conditional_get('company')
 def get_company():
     """Get company information"""
-    company_data = cloud_data.get_collection_sync('company')
+    company_data = cloud_data.get_collection_sync('company', consistent=consistent_read())
     if company_data:
-        return jsonify(company_data[0] if isinstance(company_data, list) and company_data else cloud_data.local_data['company'])
-    return jsonify(cloud_data.local_data['company'])
+        return jsonify(company_data[0])
+    return jsonify(cloud_data._get_default_data()['company'][0])
 
 @app.route('/api/company', methods=['PUT'])
 @jwt_required()
@@ -283,15 +738,16 @@ def update_company():
 @jwt_required()
 def get_directors():
     """Get all directors"""
-    directors = cloud_data.get_collection_sync('directors')
-    return jsonify(directors)
+    directors = cloud_data.get_collection_sync('directors', consistent=consistent_read())
+    return page_response(directors, 'createdAt')
 
 @app.route('/api/directors', methods=['POST'])
 @jwt_required()
+@idempotent
 def add_director():
     """Add new director"""
     data = request.get_json()
-    director_id = str(int(datetime.now().timestamp() * 1000))
+    director_id = new_doc_id()
     
     director_data = {
         **data,
@@ -304,6 +760,13 @@ def add_director():
         return jsonify({'message': 'Director added successfully', 'data': director_data}), 201
     return jsonify({'error': 'Failed to add director'}), 500
 
+@app.route('/api/directors:batch', methods=['POST'])
+@jwt_required()
+@idempotent
+def add_directors_batch():
+    """Add several directors in one request"""
+    return create_batch('directors', 'createdAt', 'director')
+
 @app.route('/api/directors/<director_id>', methods=['PUT'])
 @jwt_required()
 def update_director(director_id):
@@ -328,17 +791,19 @@ def delete_director(director_id):
 # Divisions Management
 @app.route('/api/divisions', methods=['GET'])
 @jwt_required()
+@conditional_get('divisions')
 def get_divisions():
     """Get all divisions"""
-    divisions = cloud_data.get_collection_sync('divisions')
+    divisions = cloud_data.get_collection_sync('divisions', consistent=consistent_read())
     return jsonify(divisions)
 
 @app.route('/api/divisions', methods=['POST'])
 @jwt_required()
+@idempotent
 def add_division():
     """Add new division"""
     data = request.get_json()
-    division_id = str(int(datetime.now().timestamp() * 1000))
+    division_id = new_doc_id()
     
     division_data = {
         **data,
@@ -351,20 +816,29 @@ def add_division():
         return jsonify({'message': 'Division added successfully', 'data': division_data}), 201
     return jsonify({'error': 'Failed to add division'}), 500
 
+@app.route('/api/divisions:batch', methods=['POST'])
+@jwt_required()
+@idempotent
+def add_divisions_batch():
+    """Add several divisions in one request"""
+    return create_batch('divisions', 'createdAt', 'division')
+
 # Members Management
 @app.route('/api/members', methods=['GET'])
 @jwt_required()
+@conditional_get('members')
 def get_members():
     """Get all members"""
-    members = cloud_data.get_collection_sync('members')
-    return jsonify(members)
+    members = cloud_data.get_collection_sync('members', consistent=consistent_read())
+    return page_response(members, 'registrationDate')
 
 @app.route('/api/members', methods=['POST'])
 @jwt_required()
+@idempotent
 def add_member():
     """Add new member"""
     data = request.get_json()
-    member_id = str(int(datetime.now().timestamp() * 1000))
+    member_id = new_doc_id()
     
     member_data = {
         **data,
@@ -377,6 +851,13 @@ def add_member():
         return jsonify({'message': 'Member added successfully', 'data': member_data}), 201
     return jsonify({'error': 'Failed to add member'}), 500
 
+@app.route('/api/members:batch', methods=['POST'])
+@jwt_required()
+@idempotent
+def add_members_batch():
+    """Add several members in one request"""
+    return create_batch('members', 'registrationDate', 'member')
+
 @app.route('/api/members/<member_id>', methods=['PUT'])
 @jwt_required()
 def update_member(member_id):
@@ -401,45 +882,114 @@ def delete_member(member_id):
 # Partnerships Management
 @app.route('/api/partnerships', methods=['GET'])
 @jwt_required()
+@conditional_get('partnerships')
 def get_partnerships():
     """Get all partnerships"""
-    partnerships = cloud_data.get_collection_sync('partnerships')
+    partnerships = cloud_data.get_collection_sync('partnerships', consistent=consistent_read())
     return jsonify(partnerships)
 
+@app.route('/api/partnerships:batch', methods=['POST'])
+@jwt_required()
+@idempotent
+def add_partnerships_batch():
+    """Add several partnerships in one request"""
+    return create_batch('partnerships', 'createdAt', 'partnership')
+
 # Statistics and Dashboard
 @app.route('/api/stats', methods=['GET'])
 @jwt_required()
-def get_stats():
+async def get_stats():
     """Get system statistics"""
-    directors = cloud_data.get_collection_sync('directors')
-    divisions = cloud_data.get_collection_sync('divisions')
-    members = cloud_data.get_collection_sync('members')
-    
-    stats = {
-        'totalDirectors': len(directors),
-        'totalDivisions': len(divisions),
-        'totalMembers': len(members),
-        'systemStatus': 'Active'
-    }
-    
-    return jsonify(stats)
+    data = await async_data.get_collections('directors', 'divisions', 'members')
+    return jsonify(build_stats(data))
+
+@app.route('/api/events/token', methods=['POST'])
+@jwt_required()
+def create_stream_token():
+    """Short-lived token for /api/events, which only accepts these"""
+    token = create_access_token(
+        identity=get_jwt_identity(),
+        additional_claims={'scope': STREAM_TOKEN_SCOPE},
+        expires_delta=STREAM_TOKEN_TTL
+    )
+    return jsonify({'token': token, 'expires_in': int(STREAM_TOKEN_TTL.total_seconds())})
+
+@app.route('/api/events', methods=['GET'])
+@jwt_required(locations=['query_string'])
+def stream_events():
+    """Server-sent events: 'change' for written documents, 'stats' for dashboard totals
+
+    EventSource cannot set headers, so a stream token from /api/events/token is
+    passed as ?jwt=<token>. Once this worker has EVENTS_MAX_SUBSCRIBERS streams
+    open it answers 503 and the client polls /api/sync instead.
+    """
+    if event_broadcaster is not None:
+        event_broadcaster.start()
+    subscription = event_broker.subscribe()
+    if subscription is None:
+        response = jsonify({'error': 'Too many event streams, poll /api/sync instead'})
+        response.headers['Retry-After'] = '30'
+        return response, 503
+    if event_broker.latest('stats') is None:
+        stats_pusher.trigger()
+    response = app.response_class(event_broker.stream(subscription), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    # Stops nginx-style proxies from buffering the stream
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
 
 # Data Export/Import
 @app.route('/api/export', methods=['GET'])
 @jwt_required()
-def export_data():
+async def export_data():
     """Export all data"""
-    export_data = {}
     collections = ['company', 'directors', 'divisions', 'members', 'partnerships']
-    
-    for collection in collections:
-        export_data[collection] = cloud_data.get_collection_sync(collection)
+    export_data = await async_data.get_collections(*collections)
     
     export_data['exported_at'] = datetime.now().isoformat()
     export_data['exported_by'] = get_jwt_identity()
     
     return jsonify(export_data)
 
+# Delta Sync
+@app.route('/api/sync', methods=['GET'])
+@jwt_required()
+async def sync_changes():
+    """Documents changed since ?since=<cursor>, with tombstones for deletes
+
+    Without a usable cursor (first sync, expired or from another change log)
+    the response is a full snapshot with ``reset`` set, and the client should
+    replace its local copy. Only writes made through this API are tracked.
+    """
+    limit = max(1, min(request.args.get('limit', MAX_PAGE_SIZE, type=int), MAX_PAGE_SIZE))
+    since = request.args.get('since')
+    seq = cloud_data.change_log.parse_cursor(since) if since else None
+    
+    if seq is None:
+        # Taken before reading, so writes racing the snapshot are replayed next time
+        cursor = cloud_data.change_log.cursor()
+        data = await async_data.get_collections(*SYNC_COLLECTIONS)
+        changes = []
+        for collection_name in SYNC_COLLECTIONS:
+            changes.extend(
+                {'collection': collection_name, 'id': str(doc.get('id')), 'op': 'upsert', 'data': doc}
+                for doc in data[collection_name]
+            )
+        return jsonify({'cursor': cursor, 'reset': True, 'has_more': False, 'changes': changes})
+    
+    changes, cursor, has_more = cloud_data.change_log.changes_since(
+        seq, limit=limit, collections=SYNC_COLLECTIONS
+    )
+    return jsonify({
+        'cursor': cursor,
+        'reset': False,
+        'has_more': has_more,
+        'changes': [
+            {key: change[key] for key in ('collection', 'id', 'op', 'data')}
+            for change in changes
+        ]
+    })
+
 # Health Check
 @app.route('/api/health', methods=['GET'])
 def health_check():
@@ -447,9 +997,37 @@ def health_check():
     return jsonify({
         'status': 'healthy',
         'timestamp': datetime.now().isoformat(),
-        'cloud_db': 'connected' if cloud_data.use_cloud else 'local_fallback'
+        'cloud_db': 'connected' if cloud_data.use_cloud else 'local_fallback',
+        'capabilities': {
+            'batch': BATCH_COLLECTIONS,
+            'max_batch_items': MAX_BATCH_ITEMS,
+            'idempotency_keys': True
+        },
+        'async_reads': async_data.stats(),
+        'cache': cloud_data.cache.stats(),
+        'users': users.stats(),
+        'tokens': {**jwt.token_cache.stats(), **token_denylist.stats()},
+        'events': event_broker.stats(),
+        'idempotency': idempotency_store.stats(),
+        'rate_limits': {
+            **(rate_limiter.stats() if rate_limiter else {'enabled': False}),
+            **(admission.stats() if admission else {})
+        },
+        'metrics': {
+            'requests': metrics.total('jkwi_http_requests_total'),
+            'in_flight': metrics.total('jkwi_http_requests_in_flight'),
+            'routes': metrics.histogram_summary('jkwi_http_request_duration_seconds', 'method', 'route'),
+            'data': metrics.histogram_summary('jkwi_data_operation_duration_seconds', 'operation', 'collection'),
+            'hashing': metrics.histogram_summary('jkwi_password_hash_duration_seconds', 'operation'),
+            'serialisation': metrics.histogram_summary('jkwi_json_serialise_duration_seconds')
+        }
     })
 
+@app.route('/api/metrics', methods=['GET'])
+def prometheus_metrics():
+    """Request, data-layer and hashing metrics in Prometheus text format"""
+    return app.response_class(metrics.render(), mimetype='text/plain; version=0.0.4')
+
 # Serve the web application
 @app.route('/')
 def index():
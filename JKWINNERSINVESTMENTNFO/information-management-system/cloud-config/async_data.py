@@ -0,0 +1,74 @@
+"""
+Async read path for the JKWI cloud API
+Flask runs each async view on its own short-lived event loop, so a loop-bound
+Firestore AsyncClient cannot be shared between requests. Reads instead run the
+thread-safe Firestore client on a bounded thread pool and are awaited from the
+view, and concurrent reads of the same collection share one fetch. The same
+client honours FIRESTORE_EMULATOR_HOST, and local-storage mode goes through the
+same path.
+"""
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class AsyncCloudDataManager:
+    """Concurrent, coalesced async reads on top of a CloudDataManager"""
+
+    def __init__(self, data_manager, max_concurrency=8):
+        self.data_manager = data_manager
+        self.max_concurrency = max_concurrency
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_concurrency, thread_name_prefix='jkwi-read'
+        )
+        # RLock: a future that finishes before its callback is attached runs
+        # the callback immediately, on the thread already holding the lock
+        self._lock = threading.RLock()
+        self._inflight = {}
+        self.reads = 0
+        self.coalesced_reads = 0
+
+    def _forget(self, collection_name, future):
+        with self._lock:
+            if self._inflight.get(collection_name) is future:
+                del self._inflight[collection_name]
+
+    def _fetch(self, collection_name):
+        """Return the in-flight fetch for a collection, starting one if needed"""
+        with self._lock:
+            future = self._inflight.get(collection_name)
+            if future is not None:
+                self.coalesced_reads += 1
+                return future
+
+            self.reads += 1
+            future = self._executor.submit(
+                self.data_manager.get_collection_sync, collection_name
+            )
+            self._inflight[collection_name] = future
+            future.add_done_callback(
+                lambda done, name=collection_name: self._forget(name, done)
+            )
+            return future
+
+    async def get_collection(self, collection_name):
+        """Get a collection without blocking the event loop"""
+        return await asyncio.wrap_future(self._fetch(collection_name))
+
+    async def get_collections(self, *collection_names):
+        """Fetch several collections concurrently, keyed by name"""
+        results = await asyncio.gather(
+            *(self.get_collection(name) for name in collection_names)
+        )
+        return dict(zip(collection_names, results))
+
+    def stats(self):
+        """Read counters for the health endpoint"""
+        with self._lock:
+            return {
+                'max_concurrency': self.max_concurrency,
+                'in_flight': len(self._inflight),
+                'reads': self.reads,
+                'coalesced_reads': self.coalesced_reads
+            }
@@ -0,0 +1,181 @@
+"""
+Access token verification cache and revocation list
+VerifiedTokenCache remembers the claims of tokens whose signature has already
+been checked, keyed by a hash of the token, so repeat requests skip the
+signature verification. TokenDenylist revokes single tokens (logout) or every
+token issued to a user before a point in time (deactivation). Lookups are O(1)
+against in-memory sets that are reloaded from the shared state database when
+another worker changes them.
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from flask_jwt_extended import JWTManager
+
+from state_store import SQLiteStore
+
+
+def token_key(encoded_token):
+    """Cache key for a token, so raw tokens are never kept as dict keys"""
+    return hashlib.sha256(encoded_token.encode('utf-8')).digest()
+
+
+class VerifiedTokenCache:
+    """LRU of verified token claims that honours each token's expiry"""
+
+    def __init__(self, max_size=4096, ttl=300, clock=time.time):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, encoded_token):
+        key = token_key(encoded_token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= self._clock():
+                self._entries.pop(key, None)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return dict(entry[1])
+
+    def put(self, encoded_token, claims):
+        expires_at = self._clock() + self.ttl
+        if 'exp' in claims:
+            expires_at = min(expires_at, claims['exp'])
+        with self._lock:
+            self._entries[token_key(encoded_token)] = (expires_at, dict(claims))
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def stats(self):
+        with self._lock:
+            return {'cached_tokens': len(self._entries), 'hits': self.hits, 'misses': self.misses}
+
+
+class CachingJWTManager(JWTManager):
+    """JWTManager that skips signature verification for recently verified tokens"""
+
+    def __init__(self, app=None, token_cache=None, **kwargs):
+        self.token_cache = token_cache or VerifiedTokenCache()
+        super().__init__(app, **kwargs)
+
+    def _decode_jwt_from_config(self, encoded_token, csrf_value=None, allow_expired=False):
+        if csrf_value is not None or allow_expired:
+            return super()._decode_jwt_from_config(encoded_token, csrf_value, allow_expired)
+        claims = self.token_cache.get(encoded_token)
+        if claims is None:
+            claims = super()._decode_jwt_from_config(encoded_token, csrf_value, allow_expired)
+            self.token_cache.put(encoded_token, claims)
+        return claims
+
+
+class TokenDenylist(SQLiteStore):
+    """Revoked tokens and users, shared between workers through SQLite"""
+
+    schema = """
+        CREATE TABLE IF NOT EXISTS revoked_tokens (
+            jti TEXT PRIMARY KEY,
+            expires_at REAL NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS revoked_identities (
+            identity TEXT PRIMARY KEY,
+            revoked_before REAL NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS denylist_version (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            version INTEGER NOT NULL
+        );
+        INSERT OR IGNORE INTO denylist_version (id, version) VALUES (1, 0);
+    """
+
+    def __init__(self, path=None, max_token_age=86400, sync_interval=1.0, clock=time.time):
+        self.max_token_age = max_token_age
+        self.sync_interval = sync_interval
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._jtis = set()
+        self._identities = {}
+        self._version = None
+        self._next_sync = 0
+        super().__init__(path)
+        self.sync(force=True)
+
+    def _bump(self, conn):
+        conn.execute('UPDATE denylist_version SET version = version + 1 WHERE id = 1')
+
+    def revoke_token(self, jti, expires_at):
+        """Revoke one token until it would have expired anyway"""
+        with self.connection() as conn:
+            conn.execute('INSERT OR REPLACE INTO revoked_tokens (jti, expires_at) VALUES (?, ?)',
+                         (jti, expires_at))
+            self._bump(conn)
+        with self._lock:
+            self._jtis.add(jti)
+
+    def revoke_identity(self, identity):
+        """Revoke every token issued to a user up to now
+
+        Tokens carry `iat` in whole seconds, so this covers the current second.
+        """
+        revoked_before = int(self._clock()) + 1
+        with self.connection() as conn:
+            conn.execute('INSERT OR REPLACE INTO revoked_identities (identity, revoked_before) VALUES (?, ?)',
+                         (identity, revoked_before))
+            self._bump(conn)
+        with self._lock:
+            self._identities[identity] = revoked_before
+
+    def restore_identity(self, identity):
+        """Accept tokens issued to a user from this second on; earlier ones stay revoked"""
+        now = int(self._clock())
+        with self.connection() as conn:
+            conn.execute('UPDATE revoked_identities SET revoked_before = MIN(revoked_before, ?) WHERE identity = ?',
+                         (now, identity))
+            self._bump(conn)
+        with self._lock:
+            if identity in self._identities:
+                self._identities[identity] = min(self._identities[identity], now)
+
+    def sync(self, force=False):
+        """Reload the in-memory sets if another worker changed the denylist"""
+        now = self._clock()
+        if not force and now < self._next_sync:
+            return
+        self._next_sync = now + self.sync_interval
+        conn = self.connection()
+        version = conn.execute('SELECT version FROM denylist_version WHERE id = 1').fetchone()[0]
+        if version == self._version:
+            return
+        with conn:
+            # Entries older than the longest token lifetime can no longer match
+            conn.execute('DELETE FROM revoked_tokens WHERE expires_at < ?', (now,))
+            conn.execute('DELETE FROM revoked_identities WHERE revoked_before < ?',
+                         (now - self.max_token_age,))
+        jtis = {row[0] for row in conn.execute('SELECT jti FROM revoked_tokens')}
+        identities = dict(conn.execute('SELECT identity, revoked_before FROM revoked_identities').fetchall())
+        with self._lock:
+            self._jtis = jtis
+            self._identities = identities
+            self._version = version
+
+    def is_revoked(self, jwt_payload):
+        """O(1) check used by the JWT blocklist loader"""
+        self.sync()
+        with self._lock:
+            if jwt_payload.get('jti') in self._jtis:
+                return True
+            revoked_before = self._identities.get(jwt_payload.get('sub'))
+        return revoked_before is not None and jwt_payload.get('iat', 0) < revoked_before
+
+    def stats(self):
+        with self._lock:
+            return {'revoked_tokens': len(self._jtis), 'revoked_users': len(self._identities)}
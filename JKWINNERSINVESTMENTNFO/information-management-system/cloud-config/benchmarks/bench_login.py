@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Login latency benchmark for the JKWI cloud API
+Registers a pool of users in a throwaway state database, then logs them in
+from several concurrent threads through the Flask test client and reports
+logins/sec and latency percentiles for each concurrency level.
+
+Usage (from cloud-config):
+    python benchmarks/bench_login.py --users 50 --logins 400 --concurrency 1 4 16
+    python benchmarks/bench_login.py --hash-method scrypt --hash-workers 4
+    python benchmarks/bench_login.py --inline   # hash on the request threads
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from latency_stats import percentile
+
+PASSWORD = 'Bench-Password-123'
+
+
+def load_app(state_db_path):
+    """Import the Flask app in local mode against a private state database"""
+    os.environ['STATE_DB_PATH'] = state_db_path
+    # Every benchmark login comes from one address
+    os.environ.setdefault('RATE_LIMITING', 'false')
+    os.environ.pop('FIREBASE_SERVICE_ACCOUNT_PATH', None)
+    import app as jkwi_app
+    return jkwi_app.app
+
+
+def register_users(flask_app, count):
+    client = flask_app.test_client()
+    usernames = [f'bench_user_{i}' for i in range(count)]
+    for username in usernames:
+        client.post('/api/register', json={'username': username, 'password': PASSWORD})
+    return usernames
+
+
+def run_level(flask_app, usernames, concurrency, logins):
+    """Perform `logins` logins from `concurrency` threads and return the stats"""
+    local = threading.local()
+
+    def login(i):
+        client = getattr(local, 'client', None)
+        if client is None:
+            client = local.client = flask_app.test_client()
+        started = time.perf_counter()
+        response = client.post('/api/login', json={
+            'username': usernames[i % len(usernames)],
+            'password': PASSWORD
+        })
+        return time.perf_counter() - started, response.status_code == 200
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(login, range(logins)))
+    elapsed = time.perf_counter() - started
+
+    latencies = [latency for latency, _ in results]
+    return {
+        'concurrency': concurrency,
+        'logins': logins,
+        'errors': sum(1 for _, ok in results if not ok),
+        'logins_per_sec': logins / elapsed,
+        'p50_ms': percentile(latencies, 50) * 1000,
+        'p95_ms': percentile(latencies, 95) * 1000,
+        'p99_ms': percentile(latencies, 99) * 1000
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='JKWI login latency benchmark')
+    parser.add_argument('--users', type=int, default=50, help='Accounts to register')
+    parser.add_argument('--logins', type=int, default=400, help='Logins per concurrency level')
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 4, 16, 64])
+    parser.add_argument('--hash-method', help='PASSWORD_HASH_METHOD, e.g. pbkdf2:sha256:600000')
+    parser.add_argument('--hash-workers', type=int, help='Hashing processes (HASH_WORKERS)')
+    parser.add_argument('--inline', action='store_true', help='Hash on the request threads')
+    args = parser.parse_args()
+
+    if args.hash_method:
+        os.environ['PASSWORD_HASH_METHOD'] = args.hash_method
+    if args.hash_workers:
+        os.environ['HASH_WORKERS'] = str(args.hash_workers)
+    if args.inline:
+        os.environ['HASH_INLINE'] = 'true'
+
+    with tempfile.TemporaryDirectory() as tmp:
+        flask_app = load_app(os.path.join(tmp, 'bench_state.db'))
+        usernames = register_users(flask_app, args.users)
+
+        print(f"{'threads':>8} {'logins/s':>10} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>7}")
+        for concurrency in args.concurrency:
+            result = run_level(flask_app, usernames, concurrency, args.logins)
+            print(f"{result['concurrency']:>8} {result['logins_per_sec']:>10.1f} "
+                  f"{result['p50_ms']:>9.1f} {result['p95_ms']:>9.1f} "
+                  f"{result['p99_ms']:>9.1f} {result['errors']:>7}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,331 @@
+#!/usr/bin/env python3
+"""
+Per-route throughput benchmark for the JKWI cloud API, without a server
+Imports the Flask app in local mode against a throwaway state database, seeds
+it with synthetic members and directors, and calls every route through the
+Flask test client. Each route runs for several timed rounds; only the request
+itself is timed, not the setup or clean-up around it, and writes are undone
+afterwards so every route sees the same data. Reports the median ops/sec of
+the rounds with latency percentiles, and writes them as JSON so runs can be
+compared over time.
+
+Usage (from cloud-config):
+    python benchmarks/bench_routes.py --members 10000 --rounds 5
+    python benchmarks/bench_routes.py --routes members stats --compare bench_routes_previous.json
+"""
+
+import argparse
+import gc
+import itertools
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.bench_login import PASSWORD, load_app
+from benchmarks.bench_serialisation import build_members
+from create_demo_data import JKWIDemoDataGenerator
+from latency_stats import percentile
+
+BENCH_USER = 'bench_routes_user'
+# Deactivated and reactivated by the user admin routes
+TARGET_USER = 'bench_routes_target'
+
+
+class Route:
+    """One request to benchmark
+
+    ``prepare()`` returns extra test client arguments for the next request and
+    ``cleanup(response)`` undoes its writes; neither is timed.
+    """
+
+    def __init__(self, method, path, prepare=None, cleanup=None, label=None, **request_kwargs):
+        self.method = method
+        self.path = path
+        self.prepare = prepare
+        self.cleanup = cleanup
+        self.request_kwargs = request_kwargs
+        # Names stay the same between runs so results can be compared
+        self.name = label or f"{method} {path}"
+
+
+class RouteBench:
+    """Seeds the local backend and builds a Route for every API endpoint"""
+
+    def __init__(self, jkwi_app, members, directors):
+        self.jkwi_app = jkwi_app
+        self.flask_app = jkwi_app.app
+        self.cloud_data = jkwi_app.cloud_data
+        self.client = self.flask_app.test_client()
+        self._ids = itertools.count()
+        # Delta syncs from here return the seeded documents, up to a page
+        self.sync_cursor = self.cloud_data.change_log.cursor()
+        self.seed(members, directors)
+        for username in (BENCH_USER, TARGET_USER):
+            self.client.post('/api/register', json={'username': username, 'password': PASSWORD})
+        # The user admin routes are restricted to administrators
+        jkwi_app.users.update_user(BENCH_USER, {'is_admin': True})
+        self.headers = {'Authorization': f'Bearer {self.token(BENCH_USER)}'}
+
+    def seed(self, members, directors):
+        generator = JKWIDemoDataGenerator()
+        self.member_ids = [str(i) for i in range(members)]
+        self.cloud_data.save_many_to_collection_sync(
+            'members', [(member['id'], member) for member in build_members(members)])
+        self.director_ids = [f'director-{i}' for i in range(directors)]
+        self.cloud_data.save_many_to_collection_sync('directors', [
+            (doc_id, {**director, 'id': doc_id})
+            for doc_id, director in zip(self.director_ids, itertools.cycle(generator.create_demo_directors(12)))
+        ])
+
+    def token(self, username):
+        with self.flask_app.app_context():
+            return self.jkwi_app.create_access_token(identity=username)
+
+    def unique(self, prefix):
+        return f'{prefix}-{next(self._ids)}'
+
+    def temporary(self, collection_name, record):
+        """prepare() for deletes: a document to delete, written directly"""
+        def prepare():
+            doc_id = self.unique(f'bench-{collection_name}')
+            self.cloud_data.save_to_collection_sync(collection_name, doc_id, dict(record))
+            return {'path': f'/api/{collection_name}/{doc_id}'}
+        return prepare
+
+    def remove_created(self, collection_name):
+        """cleanup() for creates: delete whatever the response says was added"""
+        def cleanup(response):
+            body = response.get_json(silent=True) or {}
+            if 'results' in body:
+                doc_ids = [result['id'] for result in body['results'] if result.get('success')]
+            else:
+                doc_ids = [body.get('data', {}).get('id')]
+            for doc_id in filter(None, doc_ids):
+                self.cloud_data.delete_from_collection_sync(collection_name, doc_id)
+        return cleanup
+
+    def routes(self, batch_size):
+        member = {'fullName': 'Bench Member', 'email': 'bench@jkwi.com', 'division': 'Mining Division',
+                  'status': 'Active'}
+        director = {'name': 'Bench Director', 'position': 'Director', 'division': 'Finance Division'}
+        division = {'name': 'Bench Division', 'description': 'Benchmark division'}
+        partnership = {'name': 'Bench Partner', 'description': 'Benchmark partnership'}
+        company = self.cloud_data.get_collection_sync('company')[0]
+        member_ids = itertools.cycle(self.member_ids or ['missing'])
+        director_ids = itertools.cycle(self.director_ids or ['missing'])
+
+        def register():
+            return {'json': {'username': self.unique('bench_register'), 'password': PASSWORD}}
+
+        def logout():
+            return {'headers': {'Authorization': f'Bearer {self.token(BENCH_USER)}'}}
+
+        def reactivate(response):
+            self.jkwi_app.users.update_user(TARGET_USER, {'is_active': True})
+
+        def next_member():
+            return {'path': f'/api/members/{next(member_ids)}'}
+
+        def stream_token():
+            # /api/events only accepts stream tokens, passed in the URL
+            with self.flask_app.app_context():
+                token = self.jkwi_app.create_access_token(
+                    identity=BENCH_USER, additional_claims={'scope': self.jkwi_app.STREAM_TOKEN_SCOPE})
+            return {'path': f'/api/events?jwt={token}', 'headers': {}}
+
+        def next_director():
+            return {'path': f'/api/directors/{next(director_ids)}'}
+
+        def restore(collection_name, original):
+            def cleanup(response):
+                self.cloud_data.save_to_collection_sync(collection_name, original['id'], dict(original))
+            return cleanup
+
+        def restore_member(response):
+            doc_id = response.request.path.rsplit('/', 1)[-1]
+            self.cloud_data.save_to_collection_sync('members', doc_id, dict(seed_members[doc_id]))
+
+        def restore_director(response):
+            doc_id = response.request.path.rsplit('/', 1)[-1]
+            self.cloud_data.save_to_collection_sync('directors', doc_id, dict(seed_directors[doc_id]))
+
+        seed_members = {str(doc['id']): doc for doc in self.cloud_data.get_collection_sync('members')}
+        seed_directors = {str(doc['id']): doc for doc in self.cloud_data.get_collection_sync('directors')}
+
+        return [
+            Route('GET', '/api/health'),
+            Route('GET', '/api/metrics'),
+            Route('GET', '/'),
+            Route('POST', '/api/register', prepare=register),
+            Route('POST', '/api/login', json={'username': BENCH_USER, 'password': PASSWORD}),
+            Route('POST', '/api/logout', prepare=logout),
+            Route('GET', '/api/users'),
+            Route('POST', f'/api/users/{TARGET_USER}/deactivate', cleanup=reactivate),
+            Route('POST', f'/api/users/{TARGET_USER}/activate'),
+            Route('GET', '/api/company'),
+            Route('PUT', '/api/company', json=company, cleanup=restore('company', company)),
+            Route('GET', '/api/directors'),
+            Route('POST', '/api/directors', json=director, cleanup=self.remove_created('directors')),
+            Route('POST', '/api/directors:batch', json=[director] * batch_size,
+                  cleanup=self.remove_created('directors')),
+            Route('PUT', '/api/directors/<id>', prepare=next_director, json={'status': 'Active'},
+                  cleanup=restore_director),
+            Route('DELETE', '/api/directors/<id>', prepare=self.temporary('directors', director)),
+            Route('GET', '/api/divisions'),
+            Route('POST', '/api/divisions', json=division, cleanup=self.remove_created('divisions')),
+            Route('POST', '/api/divisions:batch', json=[division] * batch_size,
+                  cleanup=self.remove_created('divisions')),
+            Route('GET', '/api/members'),
+            Route('GET', '/api/members?limit=100'),
+            Route('POST', '/api/members', json=member, cleanup=self.remove_created('members')),
+            Route('POST', '/api/members:batch', json=[member] * batch_size,
+                  cleanup=self.remove_created('members')),
+            Route('PUT', '/api/members/<id>', prepare=next_member, json={'status': 'Pending'},
+                  cleanup=restore_member),
+            Route('DELETE', '/api/members/<id>', prepare=self.temporary('members', member)),
+            Route('GET', '/api/partnerships'),
+            Route('POST', '/api/partnerships:batch', json=[partnership] * batch_size,
+                  cleanup=self.remove_created('partnerships')),
+            Route('GET', '/api/stats'),
+            Route('POST', '/api/events/token'),
+            Route('GET', '/api/events', prepare=stream_token, buffered=False),
+            Route('GET', '/api/export'),
+            Route('GET', '/api/sync'),
+            Route('GET', f'/api/sync?since={self.sync_cursor}', label='GET /api/sync?since=<cursor>'),
+        ]
+
+    def uncovered(self, routes):
+        """API rules of the app that no Route exercises"""
+        covered = {(route.method, route.path.split('?')[0]) for route in routes}
+        missing = []
+        for rule in self.flask_app.url_map.iter_rules():
+            if rule.endpoint == 'static':
+                continue
+            path = rule.rule.replace('<username>', TARGET_USER)
+            for argument in rule.arguments - {'username'}:
+                path = path.replace(f'<{argument}>', '<id>')
+            for method in rule.methods - {'HEAD', 'OPTIONS'}:
+                if (method, path) not in covered:
+                    missing.append(f'{method} {rule.rule}')
+        return sorted(missing)
+
+    def run_round(self, route, round_time, max_ops):
+        """Latencies of the requests made to one route in one round"""
+        latencies = []
+        spent = 0.0
+        while spent < round_time and len(latencies) < max_ops:
+            kwargs = {'method': route.method, 'path': route.path, 'headers': self.headers,
+                      **route.request_kwargs}
+            if route.prepare is not None:
+                kwargs.update(route.prepare())
+            started = time.perf_counter()
+            response = self.client.open(**kwargs)
+            latency = time.perf_counter() - started
+            latencies.append(latency)
+            spent += latency
+            if response.status_code >= 400:
+                raise RuntimeError(f"{route.name} returned {response.status_code}: {response.get_data(as_text=True)[:200]}")
+            if route.cleanup is not None:
+                route.cleanup(response)
+            response.close()
+        return latencies
+
+    def measure(self, route, rounds, round_time, max_ops):
+        self.run_round(route, round_time / 4, max_ops)
+        rates = []
+        latencies = []
+        for _ in range(rounds):
+            # As timeit does: keep collector pauses from landing in random rounds
+            gc.collect()
+            gc.disable()
+            try:
+                round_latencies = self.run_round(route, round_time, max_ops)
+            finally:
+                gc.enable()
+            rates.append(len(round_latencies) / sum(round_latencies))
+            latencies.extend(round_latencies)
+        return {
+            'ops_per_sec': round(statistics.median(rates), 1),
+            'spread_pct': round((max(rates) - min(rates)) / statistics.median(rates) * 100, 1),
+            'requests': len(latencies),
+            'p50_ms': round(percentile(latencies, 50) * 1000, 3),
+            'p95_ms': round(percentile(latencies, 95) * 1000, 3),
+            'p99_ms': round(percentile(latencies, 99) * 1000, 3)
+        }
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=Path(__file__).resolve().parent, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='JKWI per-route benchmark through the Flask test client')
+    parser.add_argument('--members', type=int, default=1000, help='Synthetic members to seed')
+    parser.add_argument('--directors', type=int, default=50, help='Synthetic directors to seed')
+    parser.add_argument('--batch-size', type=int, default=100, help='Items per :batch request')
+    parser.add_argument('--rounds', type=int, default=5, help='Timed rounds per route; the median is reported')
+    parser.add_argument('--round-time', type=float, default=0.5, help='Seconds of requests per round')
+    parser.add_argument('--max-ops', type=int, default=10000, help='Most requests per round')
+    parser.add_argument('--routes', nargs='+', help='Only routes containing any of these strings')
+    parser.add_argument('--output', help='Where to write the JSON results (default bench_routes_<timestamp>.json)')
+    parser.add_argument('--compare', help='Earlier results file to show the change against')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        load_app(os.path.join(tmp, 'bench_state.db'))
+        import app as jkwi_app
+        if jkwi_app.cloud_data.use_cloud:
+            sys.exit("❌ The app is using Firestore; unset FIREBASE_SERVICE_ACCOUNT_PATH to benchmark locally")
+
+        bench = RouteBench(jkwi_app, args.members, args.directors)
+        routes = bench.routes(args.batch_size)
+        for missing in bench.uncovered(routes):
+            print(f"⚠️ Not benchmarked: {missing}")
+        if args.routes:
+            routes = [route for route in routes if any(part in route.name for part in args.routes)]
+
+        previous = {}
+        if args.compare:
+            with open(args.compare, 'r') as f:
+                previous = json.load(f)['routes']
+
+        results = {}
+        print(f"{'route':<48} {'ops/s':>10} {'spread':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+        for route in routes:
+            result = results[route.name] = bench.measure(route, args.rounds, args.round_time, args.max_ops)
+            line = (f"{route.name:<48} {result['ops_per_sec']:>10.1f} {result['spread_pct']:>6.1f}% "
+                    f"{result['p50_ms']:>9.3f} {result['p95_ms']:>9.3f} {result['p99_ms']:>9.3f}")
+            if route.name in previous:
+                change = result['ops_per_sec'] / previous[route.name]['ops_per_sec'] - 1
+                line += f" {change * 100:>+7.1f}%"
+            print(line)
+
+    output = args.output or f"bench_routes_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    with open(output, 'w') as f:
+        json.dump({
+            'timestamp': datetime.now().isoformat(),
+            'git_commit': git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'config': {key: getattr(args, key) for key in ('members', 'directors', 'batch_size', 'rounds',
+                                                           'round_time', 'max_ops')},
+            'routes': results
+        }, f, indent=2)
+    print(f"📄 Results saved to: {output}")
+
+
+if __name__ == '__main__':
+    main()
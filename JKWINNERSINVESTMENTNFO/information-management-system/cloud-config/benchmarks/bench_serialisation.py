@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Serialisation and compression benchmark for member list responses
+Builds demo member lists of several sizes and reports, for the stdlib json
+encoder (as configured by Flask) and orjson, the time to serialise and the
+response size uncompressed, gzipped and (if installed) brotli-compressed.
+
+Usage (from cloud-config):
+    python benchmarks/bench_serialisation.py --sizes 1000 10000 100000
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from compression import BROTLI_AVAILABLE, ORJSON_AVAILABLE, compress
+from create_demo_data import JKWIDemoDataGenerator
+
+if ORJSON_AVAILABLE:
+    import orjson
+
+
+def build_members(count):
+    """Demo members, generated in blocks and repeated to reach `count`"""
+    generator = JKWIDemoDataGenerator()
+    block = generator.create_demo_members(min(count, 1000))
+    return [{**block[i % len(block)], 'id': str(i)} for i in range(count)]
+
+
+def best_of(repeat, fn):
+    """Fastest of `repeat` runs, in milliseconds, plus the last result"""
+    best, result = None, None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        elapsed = (time.perf_counter() - started) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='JKWI serialisation benchmark')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    random.seed(42)
+    encoders = {
+        # Matches Flask's DefaultJSONProvider in production (compact, sorted keys)
+        'json': lambda obj: json.dumps(obj, separators=(',', ':'), sort_keys=True, ensure_ascii=True).encode('utf-8')
+    }
+    if ORJSON_AVAILABLE:
+        encoders['orjson'] = lambda obj: orjson.dumps(obj, option=orjson.OPT_SORT_KEYS)
+    encodings = ['gzip'] + (['br'] if BROTLI_AVAILABLE else [])
+
+    header = f"{'members':>8} {'encoder':>7} {'dump ms':>9} {'raw KB':>9}"
+    for encoding in encodings:
+        header += f" {encoding + ' KB':>9} {encoding + ' ms':>9}"
+    print(header)
+
+    for size in args.sizes:
+        members = build_members(size)
+        for name, encode in encoders.items():
+            dump_ms, body = best_of(args.repeat, lambda: encode(members))
+            line = f"{size:>8} {name:>7} {dump_ms:>9.1f} {len(body) / 1024:>9.1f}"
+            for encoding in encodings:
+                compress_ms, compressed = best_of(args.repeat, lambda: compress(body, encoding))
+                line += f" {len(compressed) / 1024:>9.1f} {compress_ms:>9.1f}"
+            print(line)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Throughput benchmark for serve.py at several worker counts
+For each worker count, starts serve.py on a free port with a throwaway state
+database, seeds members, and drives a read-heavy mix of API requests from
+client threads for a fixed duration. Reports requests/sec and latency
+percentiles per worker count. Needs gunicorn; the Werkzeug fallback only ever
+runs one process.
+
+Usage (from cloud-config):
+    python benchmarks/bench_workers.py --workers 1 2 4 8 --clients 32 --duration 10
+"""
+
+import argparse
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import requests
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from latency_stats import percentile
+from serve import GUNICORN_AVAILABLE
+
+SERVE_PY = Path(__file__).resolve().parent.parent / 'serve.py'
+# (weight, path) pairs for the request mix
+REQUEST_MIX = [(5, '/api/members?limit=100'), (2, '/api/divisions'), (2, '/api/stats'), (1, '/api/company')]
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_server(workers, threads, state_db_path):
+    port = free_port()
+    env = {
+        **os.environ,
+        'WEB_CONCURRENCY': str(workers),
+        'THREADS': str(threads),
+        'HOST': '127.0.0.1',
+        'PORT': str(port),
+        'STATE_DB_PATH': state_db_path,
+        'RATE_LIMITING': 'false'
+    }
+    env.pop('FIREBASE_SERVICE_ACCOUNT_PATH', None)
+    process = subprocess.Popen([sys.executable, str(SERVE_PY)], env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    base_url = f'http://127.0.0.1:{port}'
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            if requests.get(f'{base_url}/api/health', timeout=1).ok:
+                return process, base_url
+        except requests.ConnectionError:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError(f'serve.py did not start with {workers} workers')
+
+
+def seed(base_url, members):
+    session = requests.Session()
+    response = session.post(f'{base_url}/api/register', json={'username': 'bench', 'password': 'Bench-123'})
+    token = response.json()['access_token']
+    session.headers['Authorization'] = f'Bearer {token}'
+    for start in range(0, members, 500):
+        batch = [{'fullName': f'Member {i}', 'country': 'Zambia'} for i in range(start, min(start + 500, members))]
+        session.post(f'{base_url}/api/members:batch', json=batch).raise_for_status()
+    return token
+
+
+def run_load(base_url, token, clients, duration):
+    paths = [path for weight, path in REQUEST_MIX for _ in range(weight)]
+    latencies, errors = [], []
+    lock = threading.Lock()
+    stop_at = time.perf_counter() + duration
+
+    def client():
+        session = requests.Session()
+        session.headers['Authorization'] = f'Bearer {token}'
+        rng = random.Random()
+        local_latencies, local_errors = [], 0
+        while time.perf_counter() < stop_at:
+            started = time.perf_counter()
+            try:
+                ok = session.get(base_url + rng.choice(paths), timeout=30).ok
+            except requests.RequestException:
+                ok = False
+            local_latencies.append(time.perf_counter() - started)
+            local_errors += not ok
+        with lock:
+            latencies.extend(local_latencies)
+            errors.append(local_errors)
+
+    threads = [threading.Thread(target=client) for _ in range(clients)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    return {
+        'requests': len(latencies),
+        'errors': sum(errors),
+        'requests_per_sec': len(latencies) / elapsed,
+        'p50_ms': percentile(latencies, 50) * 1000,
+        'p95_ms': percentile(latencies, 95) * 1000,
+        'p99_ms': percentile(latencies, 99) * 1000
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='JKWI multi-worker throughput benchmark')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--threads', type=int, default=8, help='Threads per worker')
+    parser.add_argument('--clients', type=int, default=32, help='Concurrent client threads')
+    parser.add_argument('--duration', type=float, default=10, help='Seconds of load per worker count')
+    parser.add_argument('--members', type=int, default=2000, help='Members to seed')
+    args = parser.parse_args()
+
+    if not GUNICORN_AVAILABLE:
+        sys.exit('gunicorn is required to compare worker counts (pip install gunicorn)')
+
+    print(f"{'workers':>8} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>7}")
+    for workers in args.workers:
+        with tempfile.TemporaryDirectory() as tmp:
+            process, base_url = start_server(workers, args.threads, os.path.join(tmp, 'bench_state.db'))
+            try:
+                token = seed(base_url, args.members)
+                result = run_load(base_url, token, args.clients, args.duration)
+            finally:
+                process.terminate()
+                process.wait(timeout=30)
+        print(f"{workers:>8} {result['requests_per_sec']:>9.1f} {result['p50_ms']:>9.1f} "
+              f"{result['p95_ms']:>9.1f} {result['p99_ms']:>9.1f} {result['errors']:>7}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,148 @@
+"""
+Change log behind the /api/sync delta endpoint
+CloudDataManager appends every successful write here. Only the latest change
+per document is kept, so the log stays proportional to the number of
+documents rather than the number of writes. Deletes are kept as tombstones
+for TOMBSTONE_RETENTION seconds; a client whose cursor predates pruned
+tombstones is told to resync from scratch.
+
+Cursors look like '<epoch>.<seq>'. The epoch changes whenever the log is
+recreated, which also forces a full resync.
+"""
+
+import json
+import os
+import threading
+import time
+
+from state_store import SQLiteStore
+
+TOMBSTONE_RETENTION = 7 * 24 * 3600
+PRUNE_INTERVAL = 3600
+
+
+class ChangeLog(SQLiteStore):
+    """Latest change per document, ordered by a global sequence number"""
+
+    schema = """
+        CREATE TABLE IF NOT EXISTS change_log (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            collection TEXT NOT NULL,
+            doc_id TEXT NOT NULL,
+            op TEXT NOT NULL,
+            data TEXT,
+            origin INTEGER NOT NULL,
+            changed_at REAL NOT NULL
+        );
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_change_log_doc ON change_log (collection, doc_id);
+        CREATE TABLE IF NOT EXISTS change_log_meta (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            epoch TEXT NOT NULL,
+            pruned_through INTEGER NOT NULL DEFAULT 0
+        );
+    """
+
+    def __init__(self, path=None, tombstone_retention=TOMBSTONE_RETENTION, clock=time.time):
+        self.tombstone_retention = tombstone_retention
+        self._clock = clock
+        self._next_prune = 0
+        self._prune_lock = threading.Lock()
+        super().__init__(path)
+        with self.connection() as conn:
+            conn.execute('INSERT OR IGNORE INTO change_log_meta (id, epoch) VALUES (1, ?)',
+                         (os.urandom(4).hex(),))
+
+    def reset(self):
+        """Forget every change and start a new epoch, invalidating all cursors"""
+        with self.connection() as conn:
+            conn.execute('DELETE FROM change_log')
+            conn.execute('UPDATE change_log_meta SET epoch = ?, pruned_through = 0 WHERE id = 1',
+                         (os.urandom(4).hex(),))
+
+    def _meta(self):
+        return self.connection().execute(
+            'SELECT epoch, pruned_through FROM change_log_meta WHERE id = 1'
+        ).fetchone()
+
+    def append(self, collection, doc_id, op, data=None):
+        """Record an 'upsert' (with the stored document) or a 'delete'"""
+        self.append_many(collection, [(doc_id, op, data)])
+
+    def append_many(self, collection, changes):
+        """Record several (doc_id, op, data) changes in one transaction"""
+        now = self._clock()
+        rows = [
+            (collection, str(doc_id), op,
+             json.dumps(data, default=str) if data is not None else None,
+             os.getpid(), now)
+            for doc_id, op, data in changes
+        ]
+        with self.connection() as conn:
+            # REPLACE drops the document's previous entry and assigns a new seq
+            conn.executemany(
+                'INSERT OR REPLACE INTO change_log (collection, doc_id, op, data, origin, changed_at) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                rows
+            )
+
+    def cursor(self):
+        """Cursor for the current end of the log"""
+        epoch, pruned_through = self._meta()
+        seq = self.connection().execute('SELECT COALESCE(MAX(seq), 0) FROM change_log').fetchone()[0]
+        return f'{epoch}.{max(seq, pruned_through)}'
+
+    def parse_cursor(self, cursor):
+        """Sequence number of a cursor, or None if it cannot be served incrementally"""
+        epoch, pruned_through = self._meta()
+        try:
+            cursor_epoch, seq = cursor.split('.', 1)
+            seq = int(seq)
+        except (AttributeError, ValueError):
+            return None
+        if cursor_epoch != epoch or seq < pruned_through:
+            return None
+        return seq
+
+    def changes_since(self, seq, limit=500, collections=None):
+        """Changes after `seq`: (changes, cursor, has_more)"""
+        self.prune()
+        epoch, _ = self._meta()
+        rows = self.connection().execute(
+            'SELECT seq, collection, doc_id, op, data, origin FROM change_log '
+            'WHERE seq > ? ORDER BY seq LIMIT ?',
+            (seq, limit + 1)
+        ).fetchall()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        changes = [
+            {
+                'collection': row['collection'],
+                'id': row['doc_id'],
+                'op': row['op'],
+                'data': json.loads(row['data']) if row['data'] is not None else None,
+                'seq': row['seq'],
+                'origin': row['origin']
+            }
+            for row in rows
+            if collections is None or row['collection'] in collections
+        ]
+        last_seq = rows[-1]['seq'] if rows else seq
+        return changes, f'{epoch}.{last_seq}', has_more
+
+    def prune(self):
+        """Drop tombstones past their retention, at most once per PRUNE_INTERVAL"""
+        now = self._clock()
+        with self._prune_lock:
+            if now < self._next_prune:
+                return
+            self._next_prune = now + PRUNE_INTERVAL
+        with self.connection() as conn:
+            cutoff = now - self.tombstone_retention
+            horizon = conn.execute(
+                "SELECT MAX(seq) FROM change_log WHERE op = 'delete' AND changed_at < ?", (cutoff,)
+            ).fetchone()[0]
+            if horizon is None:
+                return
+            conn.execute("DELETE FROM change_log WHERE op = 'delete' AND seq <= ?", (horizon,))
+            conn.execute('UPDATE change_log_meta SET pruned_through = MAX(pruned_through, ?) WHERE id = 1',
+                         (horizon,))
@@ -0,0 +1,106 @@
+"""
+Read cache for CloudDataManager
+Keeps whole collections in memory for a per-collection TTL. Writes made
+through the same manager invalidate the affected collection, and a
+generation counter stops a read that raced with a write from caching the
+pre-write result.
+"""
+
+import os
+import threading
+import time
+
+# Rarely changing collections are cached by default; the rest opt in via CACHE_TTLS
+DEFAULT_CACHE_TTLS = {
+    'company': 300,
+    'divisions': 300,
+    'partnerships': 300
+}
+
+
+def parse_ttls(spec):
+    """Parse 'divisions=300,members=10' into {'divisions': 300.0, 'members': 10.0}"""
+    ttls = {}
+    for entry in (spec or '').split(','):
+        if '=' not in entry:
+            continue
+        name, seconds = entry.split('=', 1)
+        ttls[name.strip()] = float(seconds)
+    return ttls
+
+
+def ttls_from_env():
+    """Default TTLs overridden by the CACHE_TTLS environment variable"""
+    return {**DEFAULT_CACHE_TTLS, **parse_ttls(os.getenv('CACHE_TTLS'))}
+
+
+class CollectionCache:
+    """Per-collection TTL cache with hit/miss counters"""
+
+    def __init__(self, ttls=None, clock=time.monotonic):
+        self.ttls = dict(DEFAULT_CACHE_TTLS if ttls is None else ttls)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._generations = {}
+        self._pinned = set()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def is_cached(self, collection_name):
+        """Whether a collection is cached at all"""
+        return collection_name in self._pinned or self.ttls.get(collection_name, 0) > 0
+
+    def get(self, collection_name):
+        """Return (True, value) on a fresh hit, else (False, generation)
+
+        The generation must be passed back to put() so that a write landing
+        between the miss and the put discards the stale result.
+        """
+        with self._lock:
+            entry = self._entries.get(collection_name)
+            if entry is not None and (entry[0] is None or entry[0] > self._clock()):
+                self.hits += 1
+                return True, list(entry[1])
+            self.misses += 1
+            return False, self._generations.get(collection_name, 0)
+
+    def put(self, collection_name, value, generation):
+        """Cache a freshly read collection unless it was written meanwhile"""
+        with self._lock:
+            if self._generations.get(collection_name, 0) != generation:
+                return
+            if collection_name in self._pinned:
+                expires_at = None
+            else:
+                expires_at = self._clock() + self.ttls.get(collection_name, 0)
+            self._entries[collection_name] = (expires_at, list(value))
+
+    def refresh(self, collection_name, value):
+        """Replace an entry with an authoritative snapshot that does not expire"""
+        with self._lock:
+            self._pinned.add(collection_name)
+            self._generations[collection_name] = self._generations.get(collection_name, 0) + 1
+            self._entries[collection_name] = (None, list(value))
+
+    def invalidate(self, collection_name):
+        """Drop a collection after a write"""
+        with self._lock:
+            self._generations[collection_name] = self._generations.get(collection_name, 0) + 1
+            if self._entries.pop(collection_name, None) is not None:
+                self.invalidations += 1
+
+    def stats(self):
+        """Counters for the health endpoint"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / lookups, 3) if lookups else None,
+                'invalidations': self.invalidations,
+                'cached_collections': sorted(self._entries),
+                'listening': sorted(self._pinned),
+                'ttls': self.ttls
+            }
@@ -0,0 +1,91 @@
+"""
+Response compression and fast JSON for the JKWI cloud API
+init_compression() compresses responses above a size threshold with brotli
+or gzip, whichever the client prefers and the server supports.
+ORJSONProvider plugs orjson into Flask's JSON provider when it is installed.
+"""
+
+import gzip
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+COMPRESSIBLE_MIMETYPES = ('application/json', 'application/javascript', 'text/html', 'text/css', 'text/plain')
+
+
+def compress(data, encoding, gzip_level=6, brotli_quality=4):
+    """Compress a response body with the negotiated encoding"""
+    if encoding == 'br':
+        return brotli.compress(data, quality=brotli_quality)
+    return gzip.compress(data, compresslevel=gzip_level)
+
+
+def init_compression(app, min_size=1024, gzip_level=6, brotli_quality=4):
+    """Compress eligible responses of `app` after each request"""
+    from flask import request
+
+    encodings = ['br', 'gzip'] if BROTLI_AVAILABLE else ['gzip']
+
+    @app.after_request
+    def compress_response(response):
+        if (not 200 <= response.status_code < 300
+                or response.status_code == 204
+                or response.direct_passthrough
+                or response.is_streamed
+                or 'Content-Encoding' in response.headers
+                or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+            return response
+
+        response.vary.add('Accept-Encoding')
+        encoding = request.accept_encodings.best_match(encodings)
+        if encoding is None or response.content_length is None or response.content_length < min_size:
+            return response
+
+        response.set_data(compress(response.get_data(), encoding, gzip_level, brotli_quality))
+        response.headers['Content-Encoding'] = encoding
+        return response
+
+    return compress_response
+
+
+class ORJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson
+
+    Output matches the default provider's for the data this API returns,
+    except that datetimes are serialised as ISO 8601 rather than HTTP dates.
+    """
+
+    def _options(self, pretty=False):
+        options = orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            options |= orjson.OPT_SORT_KEYS
+        if pretty:
+            options |= orjson.OPT_INDENT_2
+        return options
+
+    def dumps(self, obj, **kwargs):
+        if set(kwargs) - {'separators', 'indent', 'sort_keys'}:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=self.default, option=self._options(bool(kwargs.get('indent')))).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        pretty = (self.compact is None and self._app.debug) or self.compact is False
+        body = orjson.dumps(obj, default=self.default, option=self._options(pretty) | orjson.OPT_APPEND_NEWLINE)
+        return self._app.response_class(body, mimetype=self.mimetype)
@@ -1,14 +1,68 @@
 #!/usr/bin/env python3
 """
 Demo Data Creator for JKWI Cloud System
-Creates realistic demo members, directors, and divisions for testing
+Creates realistic demo members, directors, and divisions for testing.
+With --members it instead streams any number of members for load-test
+fixtures: fields are sampled a block at a time (vectorised with NumPy when it
+is installed), fixed-size shards are generated in parallel processes, and the
+output is written as NDJSON, the 4-MEMBER folder layout, or SQL. The same
+--seed and --as-of always give the same members, whatever the worker count.
 """
 
+import argparse
 import json
+import os
+import shutil
 import uuid
 import random
-from datetime import datetime, timedelta
-from typing import List, Dict, Any
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import List, Dict, Any, Iterator
+
+from sql_bulk import DIALECTS, SQLBulkWriter, configured_database_url, dialect_from_url
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+EMAIL_DOMAINS = ["jkwi.co.za", "gmail.com", "outlook.com", "yahoo.com", "webmail.co.za"]
+AREA_CODES = ["011", "021", "031", "012", "041", "051", "053", "054", "058"]
+STREETS = [
+    "Main Road", "Church Street", "Market Street", "Long Street", "Loop Street",
+    "Commissioner Street", "Pritchard Street", "Fox Street", "Anderson Street",
+    "Mandela Avenue", "Jan Smuts Avenue", "Barry Hertzog Avenue", "William Nicol Drive"
+]
+CITIES = [
+    "Johannesburg", "Cape Town", "Durban", "Pretoria", "Port Elizabeth",
+    "Bloemfontein", "East London", "Pietermaritzburg", "Rustenburg", "Nelspruit"
+]
+PROVINCES = [
+    "Gauteng", "Western Cape", "KwaZulu-Natal", "Eastern Cape", "Free State",
+    "Northern Cape", "North West", "Mpumalanga", "Limpopo"
+]
+SKILLS = [
+    "Leadership", "Project Management", "Financial Analysis", "Mining Operations",
+    "Construction", "Agriculture", "Legal Compliance", "Marketing", "IT",
+    "Human Resources", "Logistics", "Quality Control", "Safety Management"
+]
+RELATIONSHIPS = ["Spouse", "Parent", "Sibling", "Friend"]
+
+# Country and municipality folders of the 4-MEMBER layout (see 4-MEMBER/create_member_system.py)
+MEMBER_TREE_MUNICIPALITIES = [
+    ("001", "South-Africa", "00100001", "Amahlathi"),
+    ("001", "South-Africa", "00100002", "Buffalo-City"),
+    ("001", "South-Africa", "00100005", "Kouga"),
+    ("001", "South-Africa", "00100007", "Mandela-Bay"),
+    ("002", "Botswana", "00200001", "Gaborone"),
+    ("002", "Botswana", "00200002", "Francistown"),
+    ("003", "Zimbabwe", "00300001", "Harare"),
+    ("003", "Zimbabwe", "00300002", "Bulawayo"),
+    ("004", "Namibia", "00400001", "Windhoek"),
+    ("008", "Zambia", "00800001", "Lusaka")
+]
 
 class JKWIDemoDataGenerator:
     def __init__(self):
@@ -103,7 +157,7 @@ class JKWIDemoDataGenerator:
     
     def generate_email(self, first_name: str, surname: str) -> str:
         """Generate realistic email address"""
-        domains = ["jkwi.co.za", "gmail.com", "outlook.com", "yahoo.com", "webmail.co.za"]
+        domains = EMAIL_DOMAINS
         clean_first = first_name.lower().replace(" ", "")
         clean_surname = surname.lower().replace(" ", "")
         
@@ -120,33 +174,16 @@ class JKWIDemoDataGenerator:
     
     def generate_phone(self) -> str:
         """Generate South African phone number"""
-        area_codes = ["011", "021", "031", "012", "041", "051", "053", "054", "058"]
-        area_code = random.choice(area_codes)
+        area_code = random.choice(AREA_CODES)
         number = ''.join([str(random.randint(0, 9)) for _ in range(7)])
         return f"+27-{area_code}-{number[:3]}-{number[3:]}"
     
     def generate_address(self) -> Dict[str, str]:
         """Generate South African address"""
-        streets = [
-            "Main Road", "Church Street", "Market Street", "Long Street", "Loop Street",
-            "Commissioner Street", "Pritchard Street", "Fox Street", "Anderson Street",
-            "Mandela Avenue", "Jan Smuts Avenue", "Barry Hertzog Avenue", "William Nicol Drive"
-        ]
-        
-        cities = [
-            "Johannesburg", "Cape Town", "Durban", "Pretoria", "Port Elizabeth",
-            "Bloemfontein", "East London", "Pietermaritzburg", "Rustenburg", "Nelspruit"
-        ]
-        
-        provinces = [
-            "Gauteng", "Western Cape", "KwaZulu-Natal", "Eastern Cape", "Free State",
-            "Northern Cape", "North West", "Mpumalanga", "Limpopo"
-        ]
-        
         return {
-            "street": f"{random.randint(1, 999)} {random.choice(streets)}",
-            "city": random.choice(cities),
-            "province": random.choice(provinces),
+            "street": f"{random.randint(1, 999)} {random.choice(STREETS)}",
+            "city": random.choice(CITIES),
+            "province": random.choice(PROVINCES),
             "postal_code": f"{random.randint(1000, 9999)}",
             "country": "South Africa"
         }
@@ -190,13 +227,9 @@ class JKWIDemoDataGenerator:
                 "emergencyContact": {
                     "name": f"{random.choice(self.first_names)} {random.choice(self.surnames)}",
                     "phone": self.generate_phone(),
-                    "relationship": random.choice(["Spouse", "Parent", "Sibling", "Friend"])
+                    "relationship": random.choice(RELATIONSHIPS)
                 },
-                "skills": random.sample([
-                    "Leadership", "Project Management", "Financial Analysis", "Mining Operations",
-                    "Construction", "Agriculture", "Legal Compliance", "Marketing", "IT",
-                    "Human Resources", "Logistics", "Quality Control", "Safety Management"
-                ], k=random.randint(2, 5)),
+                "skills": random.sample(SKILLS, k=random.randint(2, 5)),
                 "notes": f"Demo member created for testing purposes. Member #{i+1}",
                 "dateCreated": datetime.now().isoformat(),
                 "lastModified": datetime.now().isoformat()
@@ -409,78 +442,358 @@ class JKWIDemoDataGenerator:
             json.dump(self.demo_data, f, indent=2, ensure_ascii=False)
         print(f"💾 Demo data saved to: {filename}")
     
-    def create_sql_inserts(self, filename: str = "jkwi_demo_data.sql"):
-        """Create SQL insert statements for demo data"""
-        sql_content = """
--- JKWI Demo Data SQL Inserts
--- Generated on """ + datetime.now().strftime("%Y-%m-%d %H:%M:%S") + """
+    def create_sql_inserts(self, filename: str = "jkwi_demo_data.sql", dialect: str = "postgresql",
+                           copy: bool = False):
+        """Create a bulk SQL load script for demo data (multi-row INSERTs, or COPY for PostgreSQL)"""
+        created_at = datetime.now()
+        company = self.demo_data["company"]
+        with open(filename, 'w', encoding='utf-8', newline='\n') as f:
+            writer = SQLBulkWriter(f, dialect, copy=copy)
+            writer.comment(f"JKWI Demo Data SQL ({dialect})\nGenerated on {created_at.strftime('%Y-%m-%d %H:%M:%S')}")
+            writer.begin()
+            for table, columns in SQL_TABLES.items():
+                writer.create_table(table, columns)
+            
+            writer.write_table("company", sql_columns("company"), [[
+                company["name"], company["registrationNumber"], company["description"],
+                company["address"], company["contact"], created_at
+            ]])
+            writer.write_table("divisions", sql_columns("divisions"), (
+                [division["name"], division["description"], division["head"], division["budget"],
+                 division["color"], created_at]
+                for division in self.demo_data["divisions"]
+            ))
+            writer.write_table("directors", sql_columns("directors"), (
+                [director["fullName"], director["email"], director["phone"], director["division"],
+                 director["position"], director["experience"], director["salary"], director["status"], created_at]
+                for director in self.demo_data["directors"]
+            ))
+            writer.write_table("members", sql_columns("members"),
+                               (member_sql_row(member) for member in self.demo_data["members"]))
+            writer.commit()
+        print(f"📄 SQL {'COPY data' if copy else 'inserts'} saved to: {filename}")
 
--- Company Information
-INSERT INTO company (name, registration_number, description, address, contact_info, created_at) 
-VALUES (
-    '""" + self.demo_data["company"]["name"] + """',
-    '""" + self.demo_data["company"]["registrationNumber"] + """',
-    '""" + self.demo_data["company"]["description"] + """',
-    '""" + json.dumps(self.demo_data["company"]["address"]).replace("'", "''") + """',
-    '""" + json.dumps(self.demo_data["company"]["contact"]).replace("'", "''") + """',
-    NOW()
-);
+class NumpySampler:
+    """Block sampling with a NumPy generator seeded from a SeedSequence"""
+    
+    def __init__(self, seed: int, shard: int):
+        self.rng = np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(shard,)))
+    
+    def integers(self, low: int, high: int, size: int) -> List[int]:
+        return self.rng.integers(low, high, size=size).tolist()
+    
+    def dates(self, start: date, days: int, size: int) -> List[str]:
+        offsets = self.rng.integers(0, days, size=size)
+        return (np.datetime64(start, 'D') + offsets).astype(str).tolist()
+    
+    def subsets(self, population: int, low: int, high: int, size: int) -> List[List[int]]:
+        """`size` lists of between low and high-1 distinct indices below `population`"""
+        order = self.rng.random((size, population)).argsort(axis=1).tolist()
+        counts = self.rng.integers(low, high, size=size).tolist()
+        return [row[:count] for row, count in zip(order, counts)]
 
--- Divisions
-"""
-        for division in self.demo_data["divisions"]:
-            sql_content += f"""
-INSERT INTO divisions (name, description, head, budget, color, created_at) 
-VALUES (
-    '{division["name"]}',
-    '{division["description"]}',
-    '{division["head"]}',
-    {division["budget"]},
-    '{division["color"]}',
-    NOW()
-);
-"""
-        
-        sql_content += "\n-- Directors\n"
-        for director in self.demo_data["directors"]:
-            sql_content += f"""
-INSERT INTO directors (full_name, email, phone, division, position, experience, salary, status, created_at) 
-VALUES (
-    '{director["fullName"]}',
-    '{director["email"]}',
-    '{director["phone"]}',
-    '{director["division"]}',
-    '{director["position"]}',
-    {director["experience"]},
-    {director["salary"]},
-    '{director["status"]}',
-    NOW()
-);
-"""
-        
-        sql_content += "\n-- Members\n"
-        for member in self.demo_data["members"]:
-            sql_content += f"""
-INSERT INTO members (username, full_name, email, phone, division, member_type, status, membership_number, created_at) 
-VALUES (
-    '{member["username"]}',
-    '{member["fullName"]}',
-    '{member["email"]}',
-    '{member["phone"]}',
-    '{member["division"]}',
-    '{member["memberType"]}',
-    '{member["status"]}',
-    '{member["membershipNumber"]}',
-    NOW()
-);
-"""
-        
-        with open(filename, 'w', encoding='utf-8') as f:
-            f.write(sql_content)
-        print(f"📄 SQL inserts saved to: {filename}")
+class StdlibSampler:
+    """The same samples drawn with the random module, used when NumPy is missing"""
+    
+    def __init__(self, seed: int, shard: int):
+        self.rng = random.Random(f"{seed}:{shard}")
+    
+    def integers(self, low: int, high: int, size: int) -> List[int]:
+        return self.rng.choices(range(low, high), k=size)
+    
+    def dates(self, start: date, days: int, size: int) -> List[str]:
+        first = start.toordinal()
+        return [date.fromordinal(first + offset).isoformat() for offset in self.rng.choices(range(days), k=size)]
+    
+    def subsets(self, population: int, low: int, high: int, size: int) -> List[List[int]]:
+        return [self.rng.sample(range(population), self.rng.randrange(low, high)) for _ in range(size)]
+
+class StreamingMemberGenerator:
+    """Members sampled a block at a time, for fixtures of any size
+    
+    Members are numbered globally and generated in fixed-size shards, each
+    with its own seed derived from (seed, shard number), so any shard can be
+    generated on its own and the output does not depend on how shards are
+    spread over processes. Dates are relative to `as_of`.
+    """
+    
+    def __init__(self, seed: int = 42, as_of: date = None, block_size: int = 10000, use_numpy: bool = NUMPY_AVAILABLE):
+        self.seed = seed
+        self.as_of = as_of or date.today()
+        self.block_size = block_size
+        self.sampler_class = NumpySampler if use_numpy else StdlibSampler
+        demo = JKWIDemoDataGenerator()
+        self.first_names = demo.first_names
+        self.surnames = demo.surnames
+        self.division_names = [division["name"] for division in demo.divisions]
+        self.statuses = demo.statuses
+        self.member_types = demo.member_types
+        # Lower-cased once instead of per member
+        self.email_firsts = [name.lower().replace(" ", "") for name in self.first_names]
+        self.email_surnames = [name.lower().replace(" ", "") for name in self.surnames]
+    
+    def shard(self, shard: int, start: int, count: int) -> Iterator[Dict[str, Any]]:
+        """Members start .. start+count-1, which must all fall in `shard`"""
+        sampler = self.sampler_class(self.seed, shard)
+        for block_start in range(start, start + count, self.block_size):
+            yield from self.block(sampler, block_start, min(self.block_size, start + count - block_start))
+    
+    def block(self, sampler, start: int, size: int) -> Iterator[Dict[str, Any]]:
+        """One block of members, every field sampled for the whole block at once"""
+        names, surnames = len(self.first_names), len(self.surnames)
+        ids = sampler.integers(0, 2 ** 62, size)
+        firsts = sampler.integers(0, names, size)
+        lasts = sampler.integers(0, surnames, size)
+        email_patterns = sampler.integers(0, 4, size)
+        email_domains = sampler.integers(0, len(EMAIL_DOMAINS), size)
+        phone_areas = sampler.integers(0, len(AREA_CODES), size)
+        phone_numbers = sampler.integers(0, 10 ** 7, size)
+        street_numbers = sampler.integers(1, 1000, size)
+        streets = sampler.integers(0, len(STREETS), size)
+        cities = sampler.integers(0, len(CITIES), size)
+        provinces = sampler.integers(0, len(PROVINCES), size)
+        postal_codes = sampler.integers(1000, 10000, size)
+        divisions = sampler.integers(0, len(self.division_names), size)
+        member_types = sampler.integers(0, len(self.member_types), size)
+        statuses = sampler.integers(0, len(self.statuses), size)
+        join_dates = sampler.dates(self.as_of - timedelta(days=365 * 3), 365 * 3 - 30, size)
+        last_active = sampler.integers(1, 31, size)
+        contact_firsts = sampler.integers(0, names, size)
+        contact_lasts = sampler.integers(0, surnames, size)
+        contact_areas = sampler.integers(0, len(AREA_CODES), size)
+        contact_numbers = sampler.integers(0, 10 ** 7, size)
+        relationships = sampler.integers(0, len(RELATIONSHIPS), size)
+        skills = sampler.subsets(len(SKILLS), 2, 6, size)
+        
+        created = datetime.combine(self.as_of, datetime.min.time()).isoformat()
+        active_dates = [(self.as_of - timedelta(days=days)).isoformat() for days in range(31)]
+        for i in range(size):
+            first, last = self.first_names[firsts[i]], self.surnames[lasts[i]]
+            email_first, email_last = self.email_firsts[firsts[i]], self.email_surnames[lasts[i]]
+            local_part = (f"{email_first}.{email_last}", f"{email_first}{email_last}",
+                          f"{email_first[0]}{email_last}", f"{email_first}_{email_last}")[email_patterns[i]]
+            number, contact_number = f"{phone_numbers[i]:07d}", f"{contact_numbers[i]:07d}"
+            index = start + i
+            # The global member number keeps usernames and emails unique at any size
+            yield {
+                "id": f"{ids[i]:016x}",
+                "username": f"{email_first}.{email_last}{index + 1}",
+                "fullName": f"{first} {last}",
+                "firstName": first,
+                "surname": last,
+                "email": f"{local_part}{index + 1}@{EMAIL_DOMAINS[email_domains[i]]}",
+                "phone": f"+27-{AREA_CODES[phone_areas[i]]}-{number[:3]}-{number[3:]}",
+                "address": {
+                    "street": f"{street_numbers[i]} {STREETS[streets[i]]}",
+                    "city": CITIES[cities[i]],
+                    "province": PROVINCES[provinces[i]],
+                    "postal_code": str(postal_codes[i]),
+                    "country": "South Africa"
+                },
+                "division": self.division_names[divisions[i]],
+                "memberType": self.member_types[member_types[i]],
+                "status": self.statuses[statuses[i]],
+                "joinDate": join_dates[i],
+                "lastActive": active_dates[last_active[i]],
+                "membershipNumber": f"JKWI-{self.as_of.year}-{str(index + 1).zfill(4)}",
+                "emergencyContact": {
+                    "name": f"{self.first_names[contact_firsts[i]]} {self.surnames[contact_lasts[i]]}",
+                    "phone": f"+27-{AREA_CODES[contact_areas[i]]}-{contact_number[:3]}-{contact_number[3:]}",
+                    "relationship": RELATIONSHIPS[relationships[i]]
+                },
+                "skills": [SKILLS[skill] for skill in skills[i]],
+                "notes": f"Demo member created for testing purposes. Member #{index + 1}",
+                "dateCreated": created,
+                "lastModified": created
+            }
+
+def member_tree_document(member: Dict[str, Any], member_id: str, country: str) -> Dict[str, Any]:
+    """A generated member in the 4-MEMBER member file format"""
+    address = member["address"]
+    return {
+        "member_info": {
+            "member_id": member_id,
+            "full_name": member["fullName"],
+            "first_name": member["firstName"],
+            "last_name": member["surname"],
+            "nationality": country.replace("-", " ")
+        },
+        "contact_info": {
+            "email": member["email"],
+            "phone_primary": member["phone"],
+            "address": {
+                "street": address["street"],
+                "city": address["city"],
+                "province_state": address["province"],
+                "postal_code": address["postal_code"],
+                "country": country.replace("-", " ")
+            }
+        },
+        "jkwi_info": {
+            "username": member["username"],
+            "registration_date": member["joinDate"],
+            "status": member["status"],
+            "division": member["division"],
+            "position": member["memberType"]
+        },
+        "emergency_contact": member["emergencyContact"],
+        "system_info": {
+            "created_date": member["dateCreated"],
+            "last_updated": member["lastModified"],
+            "created_by": "JKWI Demo Data Generator",
+            "version": "1.0"
+        },
+        "notes": member["notes"],
+        "status_history": []
+    }
+
+# Tables of the SQL output, created if they do not exist; types valid in SQLite and PostgreSQL
+SQL_TABLES = {
+    "company": [("name", "TEXT"), ("registration_number", "TEXT"), ("description", "TEXT"),
+                ("address", "TEXT"), ("contact_info", "TEXT"), ("created_at", "TIMESTAMP")],
+    "divisions": [("name", "TEXT"), ("description", "TEXT"), ("head", "TEXT"), ("budget", "BIGINT"),
+                  ("color", "TEXT"), ("created_at", "TIMESTAMP")],
+    "directors": [("full_name", "TEXT"), ("email", "TEXT"), ("phone", "TEXT"), ("division", "TEXT"),
+                  ("position", "TEXT"), ("experience", "INTEGER"), ("salary", "BIGINT"), ("status", "TEXT"),
+                  ("created_at", "TIMESTAMP")],
+    "members": [("username", "TEXT"), ("full_name", "TEXT"), ("email", "TEXT"), ("phone", "TEXT"),
+                ("division", "TEXT"), ("member_type", "TEXT"), ("status", "TEXT"), ("membership_number", "TEXT"),
+                ("created_at", "TIMESTAMP")]
+}
+
+def sql_columns(table: str) -> List[str]:
+    return [name for name, _ in SQL_TABLES[table]]
+
+def member_sql_row(member: Dict[str, Any]) -> List[Any]:
+    return [member["username"], member["fullName"], member["email"], member["phone"], member["division"],
+            member["memberType"], member["status"], member["membershipNumber"], member["dateCreated"]]
+
+def write_member_shard(task: Dict[str, Any]) -> int:
+    """Generate one shard into its part file (or member folders); runs in a worker process"""
+    generator = StreamingMemberGenerator(task["seed"], date.fromisoformat(task["as_of"]), task["block_size"],
+                                         task["use_numpy"])
+    members = generator.shard(task["shard"], task["start"], task["count"])
+    output_format = task["format"]
+    if output_format == "member-tree":
+        root = Path(task["output"])
+        width = task["id_width"]
+        for index, member in enumerate(members, task["start"]):
+            country_code, country, municipality_code, municipality = MEMBER_TREE_MUNICIPALITIES[
+                index % len(MEMBER_TREE_MUNICIPALITIES)]
+            member_id = f"{municipality_code}{index + 1:0{width}d}"
+            folder = root / f"{country_code}-{country}" / f"{municipality_code}-{municipality}"
+            with open(folder / f"{member_id}.json", 'w', encoding='utf-8') as f:
+                json.dump(member_tree_document(member, member_id, country), f, indent=4, ensure_ascii=False)
+        return task["count"]
+    
+    with open(task["part"], 'w', encoding='utf-8', newline='\n') as f:
+        if output_format == "ndjson":
+            for member in members:
+                f.write(json.dumps({"collection": "members", "id": member["id"], "data": member},
+                                   ensure_ascii=False) + '\n')
+        else:
+            # Only the rows; the transaction and table come from generate_members
+            SQLBulkWriter(f, task["dialect"], copy=task["copy"]).write_table(
+                "members", sql_columns("members"), (member_sql_row(member) for member in members))
+    return task["count"]
+
+def generate_members(count: int, output: str, output_format: str = "ndjson", seed: int = 42,
+                     as_of: date = None, workers: int = None, shard_size: int = 100000,
+                     block_size: int = 10000, use_numpy: bool = NUMPY_AVAILABLE, dialect: str = "postgresql",
+                     copy: bool = False) -> int:
+    """Write `count` generated members to `output` using parallel shards; returns the count"""
+    as_of = as_of or date.today()
+    workers = workers or os.cpu_count() or 1
+    output_path = Path(output)
+    tasks = []
+    for shard, start in enumerate(range(0, count, shard_size)):
+        tasks.append({
+            "shard": shard, "start": start, "count": min(shard_size, count - start), "seed": seed,
+            "as_of": as_of.isoformat(), "block_size": block_size, "use_numpy": use_numpy,
+            "format": output_format, "output": str(output_path), "id_width": max(6, len(str(count))),
+            "part": f"{output_path}.part{shard:05d}", "dialect": dialect, "copy": copy
+        })
+    
+    if output_format == "member-tree":
+        for country_code, country, municipality_code, municipality in MEMBER_TREE_MUNICIPALITIES:
+            folder = output_path / f"{country_code}-{country}" / f"{municipality_code}-{municipality}"
+            folder.mkdir(parents=True, exist_ok=True)
+            # Empty municipality template, as create_member_system.py writes
+            with open(folder / f"{municipality_code}.json", 'w', encoding='utf-8') as f:
+                json.dump({"member_info": {"member_id": "", "template_id": municipality_code}}, f, indent=4)
+    
+    print(f"🚀 Generating {count} members in {len(tasks)} shards on {workers} processes "
+          f"({'NumPy' if use_numpy else 'random module'}, seed {seed})")
+    started = datetime.now()
+    written = 0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for shard_count in pool.map(write_member_shard, tasks):
+            written += shard_count
+            print(f"   👤 {written}/{count} members")
+    
+    if output_format != "member-tree":
+        # Parts are joined in shard order, so the file is the same for any worker count
+        with open(output_path, 'w', encoding='utf-8', newline='\n') as f:
+            if output_format == "ndjson":
+                f.write(json.dumps({"export_info": {
+                    "exported_at": started.isoformat(),
+                    "exported_by": "JKWI Demo Data Generator",
+                    "seed": seed,
+                    "as_of": as_of.isoformat(),
+                    "total_records": {"members": count}
+                }}) + '\n')
+            else:
+                sql = SQLBulkWriter(f, dialect, copy=copy)
+                sql.comment(f"JKWI generated members: {count}, seed {seed}, as of {as_of.isoformat()} ({dialect})")
+                sql.begin()
+                sql.create_table("members", SQL_TABLES["members"])
+            f.flush()
+            for task in tasks:
+                with open(task["part"], 'r', encoding='utf-8', newline='') as part:
+                    shutil.copyfileobj(part, f, 1024 * 1024)
+                os.remove(task["part"])
+            if output_format == "sql":
+                sql.commit()
+    
+    seconds = max((datetime.now() - started).total_seconds(), 1e-9)
+    print(f"✅ {written} members written to {output_path} in {seconds:.1f}s ({written / seconds:.0f} members/s)")
+    return written
 
 def main():
     """Main function to generate and save demo data"""
+    parser = argparse.ArgumentParser(description='Generate JKWI demo data')
+    parser.add_argument('--members', type=int, help='Stream this many generated members instead of the demo set')
+    parser.add_argument('--format', choices=['ndjson', 'member-tree', 'sql'], default='ndjson')
+    parser.add_argument('--output', help='Output file, or folder for member-tree (default jkwi_members.<format>)')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--as-of', type=date.fromisoformat, help='Date the generated dates are relative to (default today)')
+    parser.add_argument('--workers', type=int, help='Generator processes (default: CPU count)')
+    parser.add_argument('--shard-size', type=int, default=100000, help='Members per shard')
+    parser.add_argument('--database-url', default=configured_database_url(),
+                        help='Database the SQL output is for; picks the default --dialect '
+                             '(default: DATABASE_URL, else src/config/settings.py)')
+    parser.add_argument('--dialect', choices=DIALECTS,
+                        help='SQL dialect of the SQL output (default: from --database-url, else postgresql)')
+    parser.add_argument('--copy', action='store_true', help='Write PostgreSQL COPY data instead of INSERTs')
+    args = parser.parse_args()
+    if args.dialect is None:
+        if args.copy or not args.database_url:
+            args.dialect = 'postgresql'
+        else:
+            try:
+                args.dialect = dialect_from_url(args.database_url)
+            except ValueError as e:
+                parser.error(f'{e}; pass --dialect')
+    if args.copy and args.dialect != 'postgresql':
+        parser.error('--copy needs --dialect postgresql')
+    
+    if args.members is not None:
+        default_output = {'ndjson': 'jkwi_members.ndjson', 'member-tree': '4-MEMBER', 'sql': 'jkwi_members.sql'}
+        generate_members(args.members, args.output or default_output[args.format], args.format, seed=args.seed,
+                         as_of=args.as_of, workers=args.workers, shard_size=args.shard_size,
+                         dialect=args.dialect, copy=args.copy)
+        return None
+    
     print("🎯 JKWI Demo Data Generator")
     print("=" * 40)
     
@@ -493,7 +806,7 @@ def main():
     generator.save_to_file("jkwi_demo_data.json")
     
     # Create SQL inserts
-    generator.create_sql_inserts("jkwi_demo_data.sql")
+    generator.create_sql_inserts("jkwi_demo_data.sql", args.dialect, args.copy)
     
     # Print summary
     print("\n📊 Summary:")
@@ -0,0 +1,203 @@
+"""
+Server-sent events for live dashboards
+EventBroker fans events out to every open /api/events stream through one
+bounded queue per subscriber, so a slow client never holds up a writer: when
+its queue overflows it is sent a single 'resync' event instead. Debouncer
+collapses bursts of writes into one expensive follow-up (the stats push), and
+ChangeLogBroadcaster relays writes made by other worker processes by polling
+the shared change log.
+"""
+
+import json
+import os
+import queue
+import threading
+import time
+
+
+def format_sse(event, data, event_id=None):
+    """Encode one event in text/event-stream format"""
+    lines = []
+    if event_id is not None:
+        lines.append(f'id: {event_id}')
+    lines.append(f'event: {event}')
+    lines.extend(f'data: {line}' for line in json.dumps(data, default=str).splitlines())
+    return '\n'.join(lines) + '\n\n'
+
+
+class Subscription:
+    """One client's bounded queue of pending events"""
+
+    def __init__(self, max_pending):
+        self.queue = queue.Queue(maxsize=max_pending)
+        self.dropped = False
+
+    def offer(self, message):
+        try:
+            self.queue.put_nowait(message)
+        except queue.Full:
+            # The client fell behind; replace its backlog with one resync hint
+            self.dropped = True
+            while True:
+                try:
+                    self.queue.get_nowait()
+                except queue.Empty:
+                    break
+            try:
+                self.queue.put_nowait(format_sse('resync', {'reason': 'client fell behind'}))
+            except queue.Full:
+                pass
+
+
+class EventBroker:
+    """In-process pub/sub behind /api/events"""
+
+    def __init__(self, max_pending=100, heartbeat=15, max_duration=300, max_subscribers=None):
+        self.max_pending = max_pending
+        self.heartbeat = heartbeat
+        self.max_duration = max_duration
+        self.max_subscribers = max_subscribers
+        self._lock = threading.Lock()
+        self._subscribers = set()
+        self._sticky = {}
+        self.published = 0
+        self.overflows = 0
+        self.rejected = 0
+
+    def subscribe(self):
+        """New subscription, or None once `max_subscribers` streams are open"""
+        subscription = Subscription(self.max_pending)
+        with self._lock:
+            if self.max_subscribers and len(self._subscribers) >= self.max_subscribers:
+                # Each stream holds a worker thread; the rest must stay free for requests
+                self.rejected += 1
+                return None
+            self._subscribers.add(subscription)
+            for message in self._sticky.values():
+                subscription.offer(message)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+            if subscription.dropped:
+                self.overflows += 1
+
+    def has_subscribers(self):
+        return bool(self._subscribers)
+
+    def latest(self, event):
+        return self._sticky.get(event)
+
+    def discard(self, event):
+        """Forget a sticky event that can no longer be kept current"""
+        with self._lock:
+            self._sticky.pop(event, None)
+
+    def publish(self, event, data, sticky=False):
+        """Queue an event for every subscriber; sticky events are replayed to new ones"""
+        message = format_sse(event, data)
+        with self._lock:
+            if sticky:
+                self._sticky[event] = message
+            subscribers = list(self._subscribers)
+            self.published += 1
+        for subscription in subscribers:
+            subscription.offer(message)
+
+    def stream(self, subscription, retry_ms=3000):
+        """Generator of SSE text for one subscriber, ending after max_duration
+
+        The final 'reconnect' event tells the client to fetch a new stream token
+        and reconnect, which also re-checks that its login is still valid.
+        """
+        deadline = time.monotonic() + self.max_duration
+        try:
+            yield f'retry: {retry_ms}\n\n'
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    yield format_sse('reconnect', {'reason': 'stream expired'})
+                    return
+                try:
+                    yield subscription.queue.get(timeout=min(self.heartbeat, remaining))
+                except queue.Empty:
+                    # Comment line: keeps proxies from closing an idle connection
+                    yield ': keepalive\n\n'
+        finally:
+            self.unsubscribe(subscription)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'subscribers': len(self._subscribers),
+                'max_subscribers': self.max_subscribers,
+                'published': self.published,
+                'overflows': self.overflows,
+                'rejected': self.rejected
+            }
+
+
+class Debouncer:
+    """Run `fn` once, `delay` seconds after the first of a burst of triggers"""
+
+    def __init__(self, fn, delay=1.0):
+        self.fn = fn
+        self.delay = delay
+        self._lock = threading.Lock()
+        self._timer = None
+
+    def _run(self):
+        with self._lock:
+            self._timer = None
+        try:
+            self.fn()
+        except Exception as e:
+            print(f"Debounced task failed: {e}")
+
+    def trigger(self):
+        with self._lock:
+            if self._timer is not None:
+                return
+            self._timer = threading.Timer(self.delay, self._run)
+            self._timer.daemon = True
+            self._timer.start()
+
+
+class ChangeLogBroadcaster:
+    """Publish changes written by other processes, read from the shared change log"""
+
+    def __init__(self, change_log, on_changes, interval=1.0):
+        self.change_log = change_log
+        self.on_changes = on_changes
+        self.interval = interval
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Start polling in this process; safe to call repeatedly and after fork"""
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+        threading.Thread(target=self._poll, name='jkwi-events-broadcast', daemon=True).start()
+
+    def _poll(self):
+        seq = self.change_log.parse_cursor(self.change_log.cursor()) or 0
+        pid = os.getpid()
+        while True:
+            time.sleep(self.interval)
+            try:
+                changes, cursor, has_more = self.change_log.changes_since(seq)
+                seq = self.change_log.parse_cursor(cursor) or seq
+            except Exception as e:
+                print(f"Event broadcast poll failed: {e}")
+                continue
+            by_collection = {}
+            for change in changes:
+                if change['origin'] != pid:
+                    by_collection.setdefault(change['collection'], []).append(
+                        (change['id'], change['op'], None)
+                    )
+            for collection_name, collection_changes in by_collection.items():
+                self.on_changes(collection_name, collection_changes)
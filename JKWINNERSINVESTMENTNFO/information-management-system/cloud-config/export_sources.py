@@ -0,0 +1,398 @@
+"""
+Source adapters for the migration export
+Each adapter streams (collection, record) pairs from one place the local
+system keeps data: the localStorage backup, demo_members.json, the 4-MEMBER
+folder tree of member files, the defaults in js/data.js, and the company
+details in JSON, YAML, XML or CSV. ExportWriter deduplicates records by ID as
+they arrive and writes them as NDJSON, one document per line. The IDs and
+content hashes seen so far go to a temporary SQLite file rather than memory.
+Large JSON files are streamed with ijson when it is installed; demo members
+can also be given as NDJSON (demo_members.ndjson), which always streams.
+"""
+
+import csv
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import xml.etree.ElementTree as ET
+from itertools import groupby
+from pathlib import Path
+
+from firestore_batches import content_hash
+
+try:
+    import yaml
+    YAML_AVAILABLE = True
+except ImportError:
+    YAML_AVAILABLE = False
+
+try:
+    import ijson
+    IJSON_AVAILABLE = True
+except ImportError:
+    IJSON_AVAILABLE = False
+
+EXPORTED_COLLECTIONS = ['directors', 'divisions', 'members', 'partnerships']
+
+
+def json_items(path, prefix):
+    """Items of the array at `prefix` (e.g. 'members') in a JSON file, streamed when ijson is installed"""
+    with open(path, 'rb') as f:
+        if IJSON_AVAILABLE:
+            # use_float keeps numbers as float instead of Decimal, like json.load
+            yield from ijson.items(f, f'{prefix}.item', use_float=True)
+            return
+        data = json.load(f)
+    yield from (data.get(prefix) or []) if isinstance(data, dict) else []
+
+
+def document_id(record):
+    """Firestore ID for a record; records without one get an ID from their content"""
+    if record.get('id') is not None:
+        return str(record['id'])
+    # Stable across runs, so exporting the same data twice gives the same IDs
+    content = json.dumps(record, sort_keys=True, default=str).encode('utf-8')
+    return hashlib.sha1(content).hexdigest()[:20]
+
+
+class SourceAdapter:
+    """Streams (collection, record) pairs from one local data source"""
+
+    name = 'source'
+
+    def __init__(self, path):
+        self.path = Path(path)
+
+    def available(self):
+        return self.path.exists()
+
+    def records(self):
+        raise NotImplementedError
+
+
+class LocalStorageBackupSource(SourceAdapter):
+    """The jkwi_data entry of a saved browser localStorage"""
+
+    name = 'localStorage backup'
+
+    def records(self):
+        with open(self.path, 'r', encoding='utf-8') as f:
+            backup = json.load(f)
+        if 'jkwi_data' not in backup:
+            return
+        data = json.loads(backup['jkwi_data'])
+        if data.get('company'):
+            yield 'company', data['company']
+        for collection_name in EXPORTED_COLLECTIONS:
+            for record in data.get(collection_name, []):
+                yield collection_name, record
+
+
+class DemoMembersSource(SourceAdapter):
+    """Members generated by DemoMemberService (JSON) or create_demo_data.py (NDJSON)"""
+
+    name = 'demo members'
+
+    def records(self):
+        if self.path.suffix != '.ndjson':
+            for member in json_items(self.path, 'members'):
+                yield 'members', member
+            return
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                if 'collection' in entry:
+                    # Export-style lines, as written by create_demo_data.py --format ndjson
+                    if entry['collection'] == 'members':
+                        yield 'members', entry['data']
+                elif 'export_info' not in entry:
+                    yield 'members', entry
+
+
+class MemberTreeSource(SourceAdapter):
+    """One JSON file per member under <country>/<municipality>/ folders"""
+
+    name = 'member folders'
+
+    @staticmethod
+    def member_record(doc):
+        info = doc.get('member_info', {})
+        contact = doc.get('contact_info', {})
+        jkwi = doc.get('jkwi_info', {})
+        address = contact.get('address', {})
+        record = {
+            'id': info.get('member_id'),
+            'username': jkwi.get('username'),
+            'fullName': info.get('full_name') or ' '.join(
+                part for part in (info.get('first_name'), info.get('last_name')) if part),
+            'firstName': info.get('first_name'),
+            'lastName': info.get('last_name'),
+            'email': contact.get('email'),
+            'phone': contact.get('phone_primary'),
+            'country': address.get('country') or info.get('nationality'),
+            'city': address.get('city'),
+            'division': jkwi.get('division'),
+            'position': jkwi.get('position'),
+            'status': jkwi.get('status'),
+            'registrationDate': jkwi.get('registration_date')
+        }
+        return {key: value for key, value in record.items() if value}
+
+    def records(self):
+        for folder, subfolders, files in os.walk(self.path):
+            subfolders.sort()
+            for filename in sorted(files):
+                if not filename.endswith('.json'):
+                    continue
+                try:
+                    with open(os.path.join(folder, filename), 'r', encoding='utf-8') as f:
+                        doc = json.load(f)
+                except (OSError, ValueError):
+                    continue
+                # Municipality templates have an empty member_id
+                if isinstance(doc, dict) and doc.get('member_info', {}).get('member_id'):
+                    yield 'members', self.member_record(doc)
+
+
+class DataJsSource(SourceAdapter):
+    """The default data object literal in js/data.js"""
+
+    name = 'data.js'
+
+    # Strings are matched first so nothing inside them is rewritten
+    TOKEN = re.compile(r'''("(?:[^"\\]|\\.)*")|('(?:[^'\\]|\\.)*')|([A-Za-z_$][\w$]*)(?=\s*:)|,(?=\s*[}\]])''')
+
+    @classmethod
+    def to_json(cls, literal):
+        """Convert a JavaScript object literal of plain values to JSON text"""
+        literal = re.sub(r'new Date\([^)]*\)(?:\.toISOString\(\))?', 'null', literal)
+
+        def convert(match):
+            double_quoted, single_quoted, key = match.group(1), match.group(2), match.group(3)
+            if double_quoted:
+                return double_quoted
+            if single_quoted:
+                return json.dumps(single_quoted[1:-1].replace("\\'", "'"))
+            if key:
+                return json.dumps(key)
+            return ''
+
+        return cls.TOKEN.sub(convert, literal)
+
+    @staticmethod
+    def object_literal(source, start):
+        """The {...} beginning at `start`, skipping braces inside strings"""
+        depth, quote, escaped = 0, None, False
+        for position in range(start, len(source)):
+            char = source[position]
+            if quote:
+                if escaped:
+                    escaped = False
+                elif char == '\\':
+                    escaped = True
+                elif char == quote:
+                    quote = None
+            elif char in '"\'`':
+                quote = char
+            elif char == '{':
+                depth += 1
+            elif char == '}':
+                depth -= 1
+                if depth == 0:
+                    return source[start:position + 1]
+        raise ValueError('unterminated object literal')
+
+    def records(self):
+        source = self.path.read_text(encoding='utf-8')
+        match = re.search(r'this\.data\s*=\s*\{', source)
+        if not match:
+            return
+        data = json.loads(self.to_json(self.object_literal(source, match.end() - 1)))
+        if data.get('company'):
+            yield 'company', {key: value for key, value in data['company'].items() if value is not None}
+        for collection_name in EXPORTED_COLLECTIONS:
+            for record in data.get(collection_name, []):
+                yield collection_name, {key: value for key, value in record.items() if value is not None}
+
+
+class CompanyDetailsSource(SourceAdapter):
+    """company_details.json / .yaml / .yml / .xml / .csv in a folder"""
+
+    name = 'company details'
+    FORMATS = ['json', 'yaml', 'yml', 'xml', 'csv']
+
+    @staticmethod
+    def xml_to_dict(element):
+        children = list(element)
+        if not children:
+            return (element.text or '').strip()
+        result = {}
+        for child in children:
+            value = CompanyDetailsSource.xml_to_dict(child)
+            if child.tag in result:
+                if not isinstance(result[child.tag], list):
+                    result[child.tag] = [result[child.tag]]
+                result[child.tag].append(value)
+            else:
+                result[child.tag] = value
+        return result
+
+    @staticmethod
+    def csv_to_dict(f):
+        rows = [row for row in csv.reader(f) if row]
+        if not rows:
+            return {}
+        # Either field,value rows (optionally under a field,value header) or
+        # a header row followed by one record
+        if [cell.strip().lower() for cell in rows[0]] in (['field', 'value'], ['key', 'value']):
+            return {row[0]: row[1] for row in rows[1:] if len(row) == 2}
+        if len(rows) > 2 and all(len(row) == 2 for row in rows):
+            return {row[0]: row[1] for row in rows}
+        return dict(zip(rows[0], rows[1])) if len(rows) > 1 else {}
+
+    def read(self, file_format, company_file):
+        with open(company_file, 'r', encoding='utf-8', newline='') as f:
+            if file_format == 'json':
+                return json.load(f)
+            if file_format in ('yaml', 'yml'):
+                if not YAML_AVAILABLE:
+                    print(f"⚠️ Skipping {company_file.name}: install PyYAML to read it")
+                    return {}
+                return yaml.safe_load(f) or {}
+            if file_format == 'xml':
+                return self.xml_to_dict(ET.parse(f).getroot())
+            return self.csv_to_dict(f)
+
+    def records(self):
+        for file_format in self.FORMATS:
+            company_file = self.path / f"company_details.{file_format}"
+            if company_file.exists():
+                details = self.read(file_format, company_file)
+                if isinstance(details, dict) and details:
+                    yield 'company', details
+
+
+def local_sources(local_data_path, company_details_path=None):
+    """Every source the local system may hold, highest priority first
+
+    The company details live in `DESIGN SYSTEM/company details` at the repository
+    root, two levels above information-management-system, unless
+    `company_details_path` or COMPANY_DETAILS_PATH points elsewhere.
+    """
+    local_data_path = Path(local_data_path)
+    company_details_path = company_details_path or os.getenv('COMPANY_DETAILS_PATH') or (
+        local_data_path.parent.parent / "DESIGN SYSTEM" / "company details"
+    )
+    return [
+        LocalStorageBackupSource(local_data_path / "localStorage_backup.json"),
+        MemberTreeSource(local_data_path.parent / "4-MEMBER"),
+        MemberTreeSource(local_data_path.parent / "4-MEMBERS"),
+        DemoMembersSource(local_data_path / "data" / "demo_members" / "demo_members.json"),
+        DemoMembersSource(local_data_path / "data" / "demo_members" / "demo_members.ndjson"),
+        CompanyDetailsSource(company_details_path),
+        DataJsSource(local_data_path / "js" / "data.js")
+    ]
+
+
+class ExportWriter:
+    """Writes deduplicated records from several sources to an NDJSON export"""
+
+    def __init__(self, f):
+        self.f = f
+        # IDs and content hashes written so far; '' opens a private temporary
+        # database on disk, so exports of any size fit in a few MB of memory
+        self._index = sqlite3.connect('')
+        self._index.execute(
+            'CREATE TABLE manifest (collection TEXT, doc_id TEXT, digest TEXT, PRIMARY KEY (collection, doc_id))'
+        )
+        self.company = {}
+        self.counts = {name: 0 for name in EXPORTED_COLLECTIONS}
+        self.duplicates = 0
+
+    def write_header(self, export_info):
+        self.f.write(json.dumps({"export_info": export_info}, ensure_ascii=False) + '\n')
+
+    def write(self, collection_name, doc_id, record):
+        """Write a document unless one with the same ID was written; returns whether it was"""
+        cursor = self._index.execute('INSERT OR IGNORE INTO manifest VALUES (?, ?, ?)',
+                                     (collection_name, doc_id, content_hash(record)))
+        if not cursor.rowcount:
+            return False
+        self.f.write(json.dumps({"collection": collection_name, "id": doc_id, "data": record},
+                                ensure_ascii=False, default=str) + '\n')
+        if collection_name in self.counts:
+            self.counts[collection_name] += 1
+        return True
+
+    def add(self, collection_name, record):
+        """Add a record; returns whether it was written (company details are merged, not counted)"""
+        if collection_name == 'company':
+            # Company details from several files are merged, earlier sources first
+            for key, value in record.items():
+                self.company.setdefault(key, value)
+            return False
+        # The first source to provide an ID wins; later copies are dropped
+        if not self.write(collection_name, document_id(record), record):
+            self.duplicates += 1
+            return False
+        return True
+
+    def add_source(self, source):
+        """Add every record of a source; returns how many were written"""
+        return sum(1 for collection_name, record in source.records() if self.add(collection_name, record))
+
+    def finish(self):
+        if self.company:
+            self.write('company', 'main', self.company)
+
+    def manifest_entries(self):
+        """(collection, doc_id, content_hash) of every written document, by collection and ID"""
+        yield from self._index.execute('SELECT collection, doc_id, digest FROM manifest ORDER BY collection, doc_id')
+
+    @property
+    def manifest(self):
+        """{collection: {doc_id: content_hash}}; loads everything, so prefer manifest_entries()"""
+        manifest = {}
+        for collection_name, doc_id, digest in self.manifest_entries():
+            manifest.setdefault(collection_name, {})[doc_id] = digest
+        return manifest
+
+
+def write_manifest_json(f, header, entries):
+    """Write a manifest file from (collection, doc_id, hash) entries sorted by collection, one at a time"""
+    f.write(json.dumps(header)[:-1] + (', ' if header else '') + '"collections": {')
+    for position, (collection_name, group) in enumerate(groupby(entries, key=lambda entry: entry[0])):
+        f.write((', ' if position else '') + json.dumps(collection_name) + ': {')
+        for index, (_, doc_id, digest) in enumerate(group):
+            f.write((', ' if index else '') + json.dumps(doc_id) + ': ' + json.dumps(digest))
+        f.write('}')
+    f.write('}}')
+
+
+def read_export(export_file_path):
+    """(collection, doc_id, data) for every document in an NDJSON or JSON export"""
+    export_file_path = Path(export_file_path)
+    with open(export_file_path, 'r', encoding='utf-8') as f:
+        if export_file_path.suffix == '.ndjson':
+            for line in f:
+                entry = json.loads(line)
+                if 'collection' in entry:
+                    yield entry['collection'], entry['id'], entry['data']
+            return
+        if IJSON_AVAILABLE:
+            company = next(ijson.items(f.buffer, 'company', use_float=True), None)
+        else:
+            data = json.load(f)
+            company = data.get('company')
+    # Exports written before NDJSON: one JSON object holding every collection,
+    # streamed one collection at a time when ijson is installed
+    if company:
+        yield 'company', 'main', company
+    for collection_name in EXPORTED_COLLECTIONS:
+        records = json_items(export_file_path, collection_name) if IJSON_AVAILABLE else data.get(collection_name, [])
+        for record in records:
+            yield collection_name, document_id(record), record
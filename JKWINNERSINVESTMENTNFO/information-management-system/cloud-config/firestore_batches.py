@@ -0,0 +1,299 @@
+"""
+Parallel batched writes to Firestore for the migration tool
+BatchCommitter groups a stream of set/delete operations into batched writes
+of up to 500 operations and commits them from a bounded pool of threads.
+Batches that fail with a transient error (contention, timeouts, quota) are
+retried with exponential backoff. Only a few batches are held in memory at
+a time, so the input can be a generator of any length. Documents whose
+target is already identical are skipped: those matching the content hashes of
+the last completed sync without a read, the rest after reading the target.
+ImportCheckpoint records how far an import got so an interrupted one can resume.
+"""
+
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+FIRESTORE_BATCH_LIMIT = 500
+
+# google.api_core exception names worth retrying; matched by name so this
+# module does not need google-cloud installed to be imported
+RETRYABLE_ERRORS = {
+    'Aborted', 'DeadlineExceeded', 'InternalServerError', 'ResourceExhausted',
+    'ServiceUnavailable', 'TooManyRequests', 'Conflict'
+}
+
+SET, DELETE = 'set', 'delete'
+
+
+def is_retryable(error):
+    return type(error).__name__ in RETRYABLE_ERRORS or isinstance(error, (ConnectionError, TimeoutError))
+
+
+def content_hash(data):
+    """Hash of a document's content, independent of key order"""
+    encoded = json.dumps(data, sort_keys=True, separators=(',', ':'), ensure_ascii=False, default=str)
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def chunked(iterable, size):
+    """Lists of up to `size` items from any iterable"""
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+class ImportProgress:
+    """Counts written documents per collection and prints throughput"""
+
+    def __init__(self, totals=None, interval=2.0, clock=time.monotonic, output=print):
+        self.totals = totals or {}
+        self.interval = interval
+        self._clock = clock
+        self._output = output
+        self._lock = threading.Lock()
+        self.started = clock()
+        self._next_report = self.started + interval
+        self.written = {}
+        self.unchanged = {}
+        self.failed = {}
+        self.retries = 0
+        self.batches = 0
+
+    def record(self, chunk, ok, unchanged=()):
+        with self._lock:
+            for position, (_, collection_name, _, _) in enumerate(chunk):
+                if not ok:
+                    counts = self.failed
+                elif position in unchanged:
+                    counts = self.unchanged
+                else:
+                    counts = self.written
+                counts[collection_name] = counts.get(collection_name, 0) + 1
+            self.batches += 1
+            now = self._clock()
+            if now < self._next_report:
+                return
+            self._next_report = now + self.interval
+        self.report()
+
+    def record_retry(self):
+        with self._lock:
+            self.retries += 1
+
+    def docs_per_second(self):
+        elapsed = max(self._clock() - self.started, 1e-9)
+        return (sum(self.written.values()) + sum(self.unchanged.values())) / elapsed
+
+    def report(self, final=False):
+        with self._lock:
+            parts = []
+            for collection_name in sorted(set(self.written) | set(self.unchanged) | set(self.failed) | set(self.totals)):
+                done = self.written.get(collection_name, 0) + self.unchanged.get(collection_name, 0)
+                total = self.totals.get(collection_name)
+                parts.append(f"{collection_name} {done}/{total}" if total else f"{collection_name} {done}")
+            failed = sum(self.failed.values())
+            unchanged = sum(self.unchanged.values())
+        line = f"{'✅' if final else '📤'} {', '.join(parts)} | {self.docs_per_second():.0f} docs/s"
+        if unchanged:
+            line += f" | {unchanged} unchanged"
+        if self.retries:
+            line += f" | {self.retries} retries"
+        if failed:
+            line += f" | {failed} failed"
+        self._output(line)
+
+    def summary(self):
+        with self._lock:
+            return {
+                'written': dict(self.written),
+                'unchanged': dict(self.unchanged),
+                'failed': dict(self.failed),
+                'batches': self.batches,
+                'retries': self.retries,
+                'seconds': round(self._clock() - self.started, 3),
+                'docs_per_second': round(self.docs_per_second(), 1)
+            }
+
+
+class ImportCheckpoint:
+    """How many operations of an import have been committed, saved after every batch"""
+
+    def __init__(self, path, source_file):
+        self.path = path
+        self.source_file = str(source_file)
+        self.source_hash = file_hash(source_file)
+        self.committed = 0
+        self.position = {}
+        self.completed = False
+        # Batches that finished ahead of an earlier one still in flight
+        self._next_index = 0
+        self._finished = {}
+        self._failed_index = None
+
+    def load(self):
+        """Pick up a saved checkpoint for the same source file; returns False if there is none"""
+        if not os.path.exists(self.path):
+            return False
+        with open(self.path, 'r', encoding='utf-8') as f:
+            saved = json.load(f)
+        if saved.get('source_hash') != self.source_hash:
+            return False
+        self.committed = saved['committed']
+        self.position = saved.get('position', {})
+        self.completed = saved.get('completed', False)
+        return True
+
+    def mark(self, index, chunk, ok):
+        """on_commit callback: advance past every batch committed without a gap"""
+        if not ok:
+            # Nothing after a failed batch counts as done until it is retried
+            if self._failed_index is None or index < self._failed_index:
+                self._failed_index = index
+            return
+        if self._failed_index is not None and index > self._failed_index:
+            return
+        self._finished[index] = chunk
+        advanced = False
+        while self._next_index in self._finished:
+            done = self._finished.pop(self._next_index)
+            self._next_index += 1
+            self.committed += len(done)
+            _, collection_name, _, _ = done[-1]
+            offset = sum(1 for _, name, _, _ in done if name == collection_name)
+            if self.position.get('collection') == collection_name:
+                offset += self.position['offset']
+            self.position = {'collection': collection_name, 'offset': offset}
+            advanced = True
+        if advanced:
+            self.save()
+
+    def finish(self):
+        self.completed = self._failed_index is None
+        self.save()
+
+    def save(self):
+        state = {
+            'source_file': self.source_file,
+            'source_hash': self.source_hash,
+            'committed': self.committed,
+            'position': self.position,
+            'completed': self.completed
+        }
+        tmp_path = f'{self.path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+
+class BatchCommitter:
+    """Commits (op, collection, doc_id, data) operations in parallel batches"""
+
+    def __init__(self, db, batch_size=FIRESTORE_BATCH_LIMIT, max_workers=4, max_retries=5,
+                 backoff=0.5, max_backoff=30.0, progress=None, on_commit=None, skip_identical=True,
+                 known_hashes=None, sleep=time.sleep):
+        self.db = db
+        self.batch_size = min(batch_size, FIRESTORE_BATCH_LIMIT)
+        self.max_workers = max_workers
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.progress = progress or ImportProgress()
+        # on_commit(batch_index, chunk, ok) runs after every batch, e.g. for checkpoints
+        self.on_commit = on_commit
+        # Leave documents that already match alone
+        self.skip_identical = skip_identical
+        # {collection: {doc_id: content_hash}} believed to be in Firestore, e.g. the
+        # manifest of the last completed sync; matching documents are not read
+        self.known_hashes = known_hashes or {}
+        self._sleep = sleep
+
+    def _unchanged(self, refs, chunk):
+        """Positions in the chunk whose target document already has this content"""
+        unchanged = set()
+        hashes = {}
+        for position, (op, collection_name, doc_id, data) in enumerate(chunk):
+            if op == DELETE:
+                continue
+            hashes[position] = content_hash(data)
+            if self.known_hashes.get(collection_name, {}).get(doc_id) == hashes[position]:
+                unchanged.add(position)
+        to_read = [position for position in range(len(chunk)) if position not in unchanged]
+        if not to_read:
+            return unchanged
+        
+        current = {}
+        for snapshot in self.db.get_all([refs[position] for position in to_read]):
+            current[snapshot.reference.path] = content_hash(snapshot.to_dict()) if snapshot.exists else None
+        for position in to_read:
+            target = current.get(refs[position].path)
+            if (target is None) if chunk[position][0] == DELETE else (target == hashes[position]):
+                unchanged.add(position)
+        return unchanged
+
+    def _commit(self, index, chunk):
+        """Commit one batch with retries: (ok, positions skipped as unchanged)"""
+        for attempt in range(self.max_retries + 1):
+            try:
+                refs = [self.db.collection(collection_name).document(doc_id)
+                        for _, collection_name, doc_id, _ in chunk]
+                unchanged = self._unchanged(refs, chunk) if self.skip_identical else set()
+                if len(unchanged) < len(chunk):
+                    batch = self.db.batch()
+                    for position, (op, _, _, data) in enumerate(chunk):
+                        if position in unchanged:
+                            continue
+                        if op == DELETE:
+                            batch.delete(refs[position])
+                        else:
+                            batch.set(refs[position], data)
+                    batch.commit()
+                return True, unchanged
+            except Exception as e:
+                if attempt == self.max_retries or not is_retryable(e):
+                    print(f"❌ Batch {index} failed: {e}")
+                    return False, set()
+                self.progress.record_retry()
+                delay = min(self.max_backoff, self.backoff * 2 ** attempt)
+                # Full jitter keeps retrying committers from colliding again
+                self._sleep(random.uniform(0, delay))
+        return False, set()
+
+    def _finish(self, future, index, chunk):
+        ok, unchanged = future.result()
+        self.progress.record(chunk, ok, unchanged)
+        if self.on_commit is not None:
+            self.on_commit(index, chunk, ok)
+        return ok
+
+    def write(self, operations, start_index=0):
+        """Commit every operation; returns True if all batches succeeded"""
+        all_ok = True
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='jkwi-commit') as pool:
+            pending = {}
+            for index, chunk in enumerate(chunked(operations, self.batch_size), start_index):
+                if len(pending) >= self.max_workers * 2:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        all_ok &= self._finish(future, *pending.pop(future))
+                pending[pool.submit(self._commit, index, chunk)] = (index, chunk)
+            for future in list(pending):
+                all_ok &= self._finish(future, *pending.pop(future))
+        return all_ok
@@ -0,0 +1,81 @@
+"""
+Document ID generator for the JKWI cloud API
+Produces ULIDs: a 48-bit millisecond timestamp followed by 80 random bits,
+encoded as 26 Crockford base32 characters. IDs sort lexicographically in
+creation order, so they can also be used as pagination cursors.
+"""
+
+import os
+import threading
+import time
+
+CROCKFORD_ALPHABET = '0123456789ABCDEFGHJKMNPQRSTVWXYZ'
+ULID_LENGTH = 26
+RANDOM_BITS = 80
+
+
+def encode(value):
+    """Encode a 128-bit integer as a 26 character ULID string"""
+    chars = []
+    for _ in range(ULID_LENGTH):
+        chars.append(CROCKFORD_ALPHABET[value & 0x1F])
+        value >>= 5
+    return ''.join(reversed(chars))
+
+
+def decode(ulid):
+    """Decode a ULID string back into its 128-bit integer value"""
+    value = 0
+    for char in ulid.upper():
+        value = (value << 5) | CROCKFORD_ALPHABET.index(char)
+    return value
+
+
+def is_ulid(value):
+    """Check whether a string looks like an ID issued by this module"""
+    return (
+        isinstance(value, str)
+        and len(value) == ULID_LENGTH
+        and all(char in CROCKFORD_ALPHABET for char in value.upper())
+    )
+
+
+def timestamp_ms(ulid):
+    """Millisecond Unix timestamp embedded in a ULID"""
+    return decode(ulid) >> RANDOM_BITS
+
+
+class ULIDGenerator:
+    """Monotonic ULID generator that is safe to share between request threads"""
+
+    def __init__(self, clock=time.time):
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._last_timestamp = -1
+        self._last_random = 0
+
+    def new_id(self):
+        """Return an ID strictly greater than every ID this generator issued before"""
+        with self._lock:
+            timestamp = int(self._clock() * 1000)
+            if timestamp > self._last_timestamp:
+                randomness = int.from_bytes(os.urandom(RANDOM_BITS // 8), 'big')
+            else:
+                # Same millisecond (or the clock stepped back): keep the last
+                # timestamp and increment the random part to stay ordered
+                timestamp = self._last_timestamp
+                randomness = self._last_random + 1
+                if randomness >> RANDOM_BITS:
+                    timestamp += 1
+                    randomness = int.from_bytes(os.urandom(RANDOM_BITS // 8), 'big')
+            self._last_timestamp = timestamp
+            self._last_random = randomness
+        return encode((timestamp << RANDOM_BITS) | randomness)
+
+
+_default_generator = ULIDGenerator()
+
+
+def new_id():
+    """Issue a new document ID from the process-wide generator"""
+    return _default_generator.new_id()
@@ -0,0 +1,170 @@
+"""
+Idempotency-Key support for create endpoints
+A client that retries a create with the same Idempotency-Key gets the stored
+response of the first attempt instead of creating a second record. Keys are
+scoped to the user and endpoint and remembered for a TTL, in memory or in the
+shared state database, with a bound on the number of keys. A retry that
+arrives while the first attempt is still running is told to retry later, and
+reusing a key with a different request body is rejected.
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from state_store import SQLiteStore
+
+NEW, REPLAY, IN_FLIGHT, MISMATCH = 'new', 'replay', 'in_flight', 'mismatch'
+
+
+def request_fingerprint(body):
+    """Hash of a request body, to detect a key reused for a different request"""
+    return hashlib.sha256(body).hexdigest()
+
+
+class MemoryIdempotencyStore:
+    """Stored responses per idempotency key, for this process"""
+
+    def __init__(self, ttl=86400, max_entries=5000, max_bytes=64 * 1024 * 1024,
+                 lease=60, clock=time.monotonic):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        # How long an attempt may run before its key is considered abandoned
+        self.lease = lease
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self.replays = 0
+
+    def _drop(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None and entry['body'] is not None:
+            self._bytes -= len(entry['body'])
+
+    def begin(self, key, fingerprint):
+        """Claim a key for a new attempt: (state, stored response or None)"""
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry['expires_at'] <= now:
+                self._drop(key)
+                entry = None
+            if entry is None:
+                self._entries[key] = {
+                    'fingerprint': fingerprint, 'body': None, 'response': None,
+                    'expires_at': now + self.lease
+                }
+                return NEW, None
+            if entry['fingerprint'] != fingerprint:
+                return MISMATCH, None
+            if entry['response'] is None:
+                return IN_FLIGHT, None
+            self._entries.move_to_end(key)
+            self.replays += 1
+            return REPLAY, entry['response']
+
+    def complete(self, key, status, body, mimetype):
+        """Store the response of a finished attempt"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return
+            if entry['body'] is not None:
+                self._bytes -= len(entry['body'])
+            entry['body'] = body
+            entry['response'] = (status, body, mimetype)
+            entry['expires_at'] = self._clock() + self.ttl
+            self._bytes += len(body)
+            self._entries.move_to_end(key)
+            while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+                self._drop(next(iter(self._entries)))
+
+    def abandon(self, key):
+        """Release a key whose attempt failed, so a retry runs again"""
+        with self._lock:
+            self._drop(key)
+
+    def stats(self):
+        with self._lock:
+            return {'keys': len(self._entries), 'bytes': self._bytes, 'replays': self.replays}
+
+
+class SQLiteIdempotencyStore(SQLiteStore):
+    """Stored responses per idempotency key, shared by every worker"""
+
+    schema = """
+        CREATE TABLE IF NOT EXISTS idempotency_keys (
+            key TEXT PRIMARY KEY,
+            fingerprint TEXT NOT NULL,
+            status INTEGER,
+            body BLOB,
+            mimetype TEXT,
+            expires_at REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_idempotency_keys_expires ON idempotency_keys (expires_at);
+    """
+
+    def __init__(self, path=None, ttl=86400, max_entries=5000, lease=60, prune_interval=60, clock=time.time):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.lease = lease
+        self.prune_interval = prune_interval
+        self._clock = clock
+        self._next_prune = 0
+        self.replays = 0
+        super().__init__(path)
+
+    def begin(self, key, fingerprint):
+        now = self._clock()
+        conn = self.connection()
+        # IMMEDIATE so two workers cannot both claim the same new key
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            row = conn.execute(
+                'SELECT fingerprint, status, body, mimetype FROM idempotency_keys '
+                'WHERE key = ? AND expires_at > ?', (key, now)
+            ).fetchone()
+            if row is None:
+                conn.execute(
+                    'INSERT OR REPLACE INTO idempotency_keys (key, fingerprint, expires_at) VALUES (?, ?, ?)',
+                    (key, fingerprint, now + self.lease)
+                )
+                result = NEW, None
+            elif row['fingerprint'] != fingerprint:
+                result = MISMATCH, None
+            elif row['status'] is None:
+                result = IN_FLIGHT, None
+            else:
+                self.replays += 1
+                result = REPLAY, (row['status'], bytes(row['body']), row['mimetype'])
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        return result
+
+    def complete(self, key, status, body, mimetype):
+        now = self._clock()
+        with self.connection() as conn:
+            conn.execute(
+                'UPDATE idempotency_keys SET status = ?, body = ?, mimetype = ?, expires_at = ? WHERE key = ?',
+                (status, body, mimetype, now + self.ttl, key)
+            )
+            if now >= self._next_prune:
+                self._next_prune = now + self.prune_interval
+                conn.execute('DELETE FROM idempotency_keys WHERE expires_at <= ?', (now,))
+                conn.execute(
+                    'DELETE FROM idempotency_keys WHERE key IN (SELECT key FROM idempotency_keys '
+                    'ORDER BY expires_at DESC LIMIT -1 OFFSET ?)', (self.max_entries,)
+                )
+
+    def abandon(self, key):
+        with self.connection() as conn:
+            conn.execute('DELETE FROM idempotency_keys WHERE key = ?', (key,))
+
+    def stats(self):
+        keys = self.connection().execute('SELECT COUNT(*) FROM idempotency_keys').fetchone()[0]
+        return {'keys': keys, 'replays': self.replays}
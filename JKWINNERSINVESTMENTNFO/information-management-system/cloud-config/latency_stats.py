@@ -0,0 +1,13 @@
+"""
+Latency statistics shared by the JKWI benchmarks and load tests
+Kept in one place so every tool reports percentiles the same way.
+"""
+
+
+def percentile(samples, pct):
+    """Nearest-rank percentile of a list of numbers"""
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
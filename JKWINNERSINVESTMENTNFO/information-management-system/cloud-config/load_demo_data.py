@@ -1,17 +1,85 @@
 #!/usr/bin/env python3
 """
 Demo Data Loader for JKWI Cloud System
-Loads demo members and data into the cloud system for testing
+Loads demo members and data into the cloud system for testing. Requests go
+through one pooled HTTP session with retries on 5xx responses, and are sent
+from several threads at once. A 429 pauses every thread until the server's
+Retry-After has passed. When the server's health check
+advertises batch endpoints, records are sent in batches. Every create carries
+an Idempotency-Key, so a retried request never creates a record twice.
 """
 
+import argparse
 import json
-import requests
 import sys
+import threading
 import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Collection name, and the field used to name a record in messages
+COLLECTIONS = [
+    ('divisions', 'name'),
+    ('directors', 'fullName'),
+    ('members', 'fullName'),
+    ('partnerships', 'companyName')
+]
+
+# 409 is the server saying an earlier attempt with the same key is still running.
+# 429 is left to the loader, which pauses all threads rather than one.
+RETRY_STATUSES = (409, 500, 502, 503, 504)
+
+def create_session(pool_size=8, max_retries=5, backoff=0.5):
+    """Session that reuses up to pool_size connections and retries failed calls"""
+    retry = Retry(
+        total=max_retries,
+        backoff_factor=backoff,
+        status_forcelist=RETRY_STATUSES,
+        # Creates are safe to retry because each one carries an Idempotency-Key
+        allowed_methods=None,
+        respect_retry_after_header=True,
+        raise_on_status=False
+    )
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+    session = requests.Session()
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+class LoadReport:
+    """Records created and failed per collection, with throughput"""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.collections = {}
+    
+    def record(self, collection_name, created, failed, seconds):
+        with self._lock:
+            entry = self.collections.setdefault(collection_name, {'created': 0, 'failed': 0, 'seconds': 0.0})
+            entry['created'] += created
+            entry['failed'] += failed
+            entry['seconds'] += seconds
+    
+    def print_summary(self):
+        total_created = total_seconds = 0
+        for collection_name, entry in self.collections.items():
+            rate = entry['created'] / entry['seconds'] if entry['seconds'] else 0
+            print(f"📊 {collection_name}: {entry['created']} loaded, {entry['failed']} failed, "
+                  f"{rate:.0f} records/sec")
+            total_created += entry['created']
+            total_seconds += entry['seconds']
+        if total_seconds:
+            print(f"⚡ Overall: {total_created} records in {total_seconds:.1f}s "
+                  f"({total_created / total_seconds:.0f} records/sec)")
+
 class JKWIDemoDataLoader:
-    def __init__(self, base_url="http://localhost:5000"):
+    def __init__(self, base_url="http://localhost:5000", concurrency=8, batch_size=500, max_retries=5,
+                 throttle_timeout=600, session=None):
         self.base_url = base_url
         self.auth_token = None
         self.admin_user = {
@@ -20,6 +88,18 @@ class JKWIDemoDataLoader:
             "email": "admin@jkwi.co.za",
             "division": "Executive"
         }
+        self.concurrency = concurrency
+        self.batch_size = batch_size
+        self.session = session or create_session(pool_size=concurrency, max_retries=max_retries)
+        # Filled from /api/health: collections with a :batch endpoint and its size limit
+        self.batch_collections = set()
+        self.max_batch_items = batch_size
+        self.report = LoadReport()
+        # Longest a create keeps waiting out 429 responses before giving up
+        self.throttle_timeout = throttle_timeout
+        self._throttle_lock = threading.Lock()
+        self._resume_at = 0.0
+        self.throttled = 0
     
     def load_demo_data(self, filename="jkwi_demo_data.json"):
         """Load demo data from JSON file"""
@@ -36,7 +116,7 @@ class JKWIDemoDataLoader:
     def register_admin_user(self):
         """Register admin user for loading data"""
         try:
-            response = requests.post(
+            response = self.session.post(
                 f"{self.base_url}/api/register",
                 json=self.admin_user,
                 timeout=10
@@ -63,7 +143,7 @@ class JKWIDemoDataLoader:
                 "password": self.admin_user["password"]
             }
             
-            response = requests.post(
+            response = self.session.post(
                 f"{self.base_url}/api/login",
                 json=login_data,
                 timeout=10
@@ -81,16 +161,19 @@ class JKWIDemoDataLoader:
             print(f"❌ Admin login error: {str(e)}")
             return False
     
-    def get_auth_headers(self):
-        """Get authorization headers"""
-        if not self.auth_token:
-            return {}
-        return {"Authorization": f"Bearer {self.auth_token}"}
+    def get_auth_headers(self, idempotency_key=None):
+        """Get authorization headers, with an Idempotency-Key for creates"""
+        headers = {}
+        if self.auth_token:
+            headers["Authorization"] = f"Bearer {self.auth_token}"
+        if idempotency_key:
+            headers["Idempotency-Key"] = idempotency_key
+        return headers
     
     def load_company_data(self, company_data):
         """Load company information"""
         try:
-            response = requests.put(
+            response = self.session.put(
                 f"{self.base_url}/api/company",
                 json=company_data,
                 headers=self.get_auth_headers(),
@@ -107,116 +190,92 @@ class JKWIDemoDataLoader:
             print(f"❌ Company data load error: {str(e)}")
             return False
     
-    def load_divisions(self, divisions_data):
-        """Load divisions"""
-        success_count = 0
+    def post_create(self, url, records, timeout):
+        """POST a create, waiting out rate limiting; the Idempotency-Key is kept across attempts"""
+        headers = self.get_auth_headers(str(uuid.uuid4()))
+        deadline = time.monotonic() + self.throttle_timeout
+        while True:
+            with self._throttle_lock:
+                pause = self._resume_at - time.monotonic()
+            if pause > 0:
+                time.sleep(pause)
+            response = self.session.post(url, json=records, headers=headers, timeout=timeout)
+            if response.status_code != 429 or time.monotonic() >= deadline:
+                return response
+            retry_after = float(response.headers.get('Retry-After', 1))
+            with self._throttle_lock:
+                self.throttled += 1
+                self._resume_at = max(self._resume_at, time.monotonic() + retry_after)
+    
+    def post_batch(self, collection_name, chunk):
+        """Create a chunk of records with one batch request; returns how many were created"""
+        response = self.post_create(f"{self.base_url}/api/{collection_name}:batch", chunk, timeout=60)
+        if response.status_code in (201, 207):
+            return response.json()['created']
+        print(f"❌ {collection_name} batch of {len(chunk)} failed ({response.status_code})")
+        return 0
+    
+    def post_record(self, collection_name, record, label_field):
+        """Create one record; returns 1 if it was created"""
+        response = self.post_create(f"{self.base_url}/api/{collection_name}", record, timeout=10)
+        if response.status_code == 201:
+            return 1
+        print(f"❌ {collection_name[:-1].capitalize()} load failed: {record.get(label_field)} ({response.status_code})")
+        return 0
+    
+    def load_collection(self, collection_name, records, label_field='name'):
+        """Create records concurrently, in batches when the server supports them"""
+        if not records:
+            return True
+        started = time.perf_counter()
+        if collection_name in self.batch_collections:
+            size = max(1, min(self.batch_size, self.max_batch_items))
+            tasks = [(self.post_batch, collection_name, records[start:start + size])
+                     for start in range(0, len(records), size)]
+        else:
+            tasks = [(self.post_record, collection_name, record, label_field) for record in records]
         
-        for division in divisions_data:
-            try:
-                response = requests.post(
-                    f"{self.base_url}/api/divisions",
-                    json=division,
-                    headers=self.get_auth_headers(),
-                    timeout=10
-                )
-                
-                if response.status_code == 201:
-                    success_count += 1
-                    print(f"✅ Division loaded: {division['name']}")
-                else:
-                    print(f"❌ Division load failed: {division['name']} ({response.status_code})")
-            except Exception as e:
-                print(f"❌ Division load error: {division['name']} - {str(e)}")
-            
-            time.sleep(0.5)  # Small delay to avoid overwhelming the server
+        created = 0
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            futures = [pool.submit(*task) for task in tasks]
+            for future in as_completed(futures):
+                try:
+                    created += future.result()
+                except requests.RequestException as e:
+                    print(f"❌ {collection_name} request error: {str(e)}")
         
-        print(f"📊 Divisions loaded: {success_count}/{len(divisions_data)}")
-        return success_count > 0
+        self.report.record(collection_name, created, len(records) - created, time.perf_counter() - started)
+        print(f"✅ {collection_name.capitalize()} loaded: {created}/{len(records)}")
+        return created > 0
+    
+    def load_divisions(self, divisions_data):
+        """Load divisions"""
+        return self.load_collection('divisions', divisions_data, 'name')
     
     def load_directors(self, directors_data):
         """Load directors"""
-        success_count = 0
-        
-        for director in directors_data:
-            try:
-                response = requests.post(
-                    f"{self.base_url}/api/directors",
-                    json=director,
-                    headers=self.get_auth_headers(),
-                    timeout=10
-                )
-                
-                if response.status_code == 201:
-                    success_count += 1
-                    print(f"✅ Director loaded: {director['fullName']}")
-                else:
-                    print(f"❌ Director load failed: {director['fullName']} ({response.status_code})")
-            except Exception as e:
-                print(f"❌ Director load error: {director['fullName']} - {str(e)}")
-            
-            time.sleep(0.5)
-        
-        print(f"📊 Directors loaded: {success_count}/{len(directors_data)}")
-        return success_count > 0
+        return self.load_collection('directors', directors_data, 'fullName')
     
     def load_members(self, members_data):
         """Load members"""
-        success_count = 0
-        
-        for member in members_data:
-            try:
-                response = requests.post(
-                    f"{self.base_url}/api/members",
-                    json=member,
-                    headers=self.get_auth_headers(),
-                    timeout=10
-                )
-                
-                if response.status_code == 201:
-                    success_count += 1
-                    print(f"✅ Member loaded: {member['fullName']}")
-                else:
-                    print(f"❌ Member load failed: {member['fullName']} ({response.status_code})")
-            except Exception as e:
-                print(f"❌ Member load error: {member['fullName']} - {str(e)}")
-            
-            time.sleep(0.5)
-        
-        print(f"📊 Members loaded: {success_count}/{len(members_data)}")
-        return success_count > 0
+        return self.load_collection('members', members_data, 'fullName')
     
     def load_partnerships(self, partnerships_data):
         """Load partnerships"""
-        success_count = 0
-        
-        for partnership in partnerships_data:
-            try:
-                response = requests.post(
-                    f"{self.base_url}/api/partnerships",
-                    json=partnership,
-                    headers=self.get_auth_headers(),
-                    timeout=10
-                )
-                
-                if response.status_code == 201:
-                    success_count += 1
-                    print(f"✅ Partnership loaded: {partnership['companyName']}")
-                else:
-                    print(f"❌ Partnership load failed: {partnership['companyName']} ({response.status_code})")
-            except Exception as e:
-                print(f"❌ Partnership load error: {partnership['companyName']} - {str(e)}")
-            
-            time.sleep(0.5)
-        
-        print(f"📊 Partnerships loaded: {success_count}/{len(partnerships_data)}")
-        return success_count > 0
+        return self.load_collection('partnerships', partnerships_data, 'companyName')
     
     def check_server_health(self):
-        """Check if the server is running"""
+        """Check if the server is running, and which bulk endpoints it offers"""
         try:
-            response = requests.get(f"{self.base_url}/api/health", timeout=5)
+            response = self.session.get(f"{self.base_url}/api/health", timeout=5)
             if response.status_code == 200:
+                capabilities = response.json().get('capabilities', {})
+                self.batch_collections = set(capabilities.get('batch', []))
+                self.max_batch_items = capabilities.get('max_batch_items', self.batch_size)
                 print("✅ Server is running and healthy")
+                if self.batch_collections:
+                    print(f"📦 Batch endpoints: {', '.join(sorted(self.batch_collections))} "
+                          f"(up to {self.max_batch_items} per request)")
                 return True
             else:
                 print(f"❌ Server health check failed: {response.status_code}")
@@ -245,28 +304,20 @@ class JKWIDemoDataLoader:
             print("❌ Failed to authenticate admin user")
             return False
         
-        print("\n📥 Loading demo data...")
+        print(f"\n📥 Loading demo data with {self.concurrency} concurrent requests...")
         
         # Load company data
         if 'company' in demo_data:
             self.load_company_data(demo_data['company'])
         
-        # Load divisions
-        if 'divisions' in demo_data:
-            self.load_divisions(demo_data['divisions'])
-        
-        # Load directors
-        if 'directors' in demo_data:
-            self.load_directors(demo_data['directors'])
-        
-        # Load members
-        if 'members' in demo_data:
-            self.load_members(demo_data['members'])
-        
-        # Load partnerships
-        if 'partnerships' in demo_data:
-            self.load_partnerships(demo_data['partnerships'])
+        for collection_name, label_field in COLLECTIONS:
+            if collection_name in demo_data:
+                self.load_collection(collection_name, demo_data[collection_name], label_field)
         
+        print()
+        self.report.print_summary()
+        if self.throttled:
+            print(f"🐢 Rate limited {self.throttled} times; raise the server's RATE_LIMITS for faster bulk loads")
         print("\n🎉 Demo data loading completed!")
         print(f"You can now access the system at: {self.base_url}")
         print("Admin credentials:")
@@ -277,22 +328,21 @@ class JKWIDemoDataLoader:
 
 def main():
     """Main function"""
-    # Get base URL from command line or use default
-    base_url = "http://localhost:5000"
-    if len(sys.argv) > 1:
-        base_url = sys.argv[1]
-    
-    # Get demo data filename
-    filename = "jkwi_demo_data.json"
-    if len(sys.argv) > 2:
-        filename = sys.argv[2]
+    parser = argparse.ArgumentParser(description='Load demo data into a running JKWI cloud system')
+    parser.add_argument('base_url', nargs='?', default='http://localhost:5000')
+    parser.add_argument('filename', nargs='?', default='jkwi_demo_data.json', help='Demo data file')
+    parser.add_argument('--concurrency', type=int, default=8, help='Requests in flight at once (default 8)')
+    parser.add_argument('--batch-size', type=int, default=500, help='Records per batch request (default 500)')
+    parser.add_argument('--retries', type=int, default=5, help='Retries per request on 409 and 5xx (default 5)')
+    args = parser.parse_args()
     
-    print(f"🔗 Loading demo data into: {base_url}")
-    print(f"📁 Using demo data file: {filename}")
+    print(f"🔗 Loading demo data into: {args.base_url}")
+    print(f"📁 Using demo data file: {args.filename}")
     
     # Load demo data
-    loader = JKWIDemoDataLoader(base_url)
-    success = loader.load_all_demo_data(filename)
+    loader = JKWIDemoDataLoader(args.base_url, concurrency=args.concurrency, batch_size=args.batch_size,
+                                max_retries=args.retries)
+    success = loader.load_all_demo_data(args.filename)
     
     if success:
         print("\n✅ Demo data loaded successfully!")
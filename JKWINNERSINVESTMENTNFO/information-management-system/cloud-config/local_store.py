@@ -0,0 +1,112 @@
+"""
+Process-safe local storage for CloudDataManager
+LocalDocumentStore keeps the local-fallback collections in the shared state
+database instead of a per-process dict, so every worker serves the same data
+and writes survive restarts. CollectionVersions holds the per-collection
+version counters behind ETags and cache invalidation, so a write handled by
+one worker is seen by all of them.
+"""
+
+import json
+import os
+
+from state_store import SQLiteStore
+
+
+class LocalDocumentStore(SQLiteStore):
+    """Collections of JSON documents, kept in insertion order"""
+
+    schema = """
+        CREATE TABLE IF NOT EXISTS local_documents (
+            collection TEXT NOT NULL,
+            doc_id TEXT NOT NULL,
+            position INTEGER NOT NULL,
+            data TEXT NOT NULL,
+            PRIMARY KEY (collection, doc_id)
+        );
+        CREATE INDEX IF NOT EXISTS idx_local_documents_position ON local_documents (collection, position);
+        CREATE TABLE IF NOT EXISTS local_store_meta (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            seeded INTEGER NOT NULL
+        );
+    """
+
+    def seed(self, collections):
+        """Load default documents the first time the store is used"""
+        with self.connection() as conn:
+            if conn.execute('INSERT OR IGNORE INTO local_store_meta (id, seeded) VALUES (1, 1)').rowcount:
+                for collection_name, docs in collections.items():
+                    self._upsert(conn, collection_name, [(doc['id'], doc) for doc in docs])
+
+    def _upsert(self, conn, collection_name, items):
+        position = conn.execute(
+            'SELECT COALESCE(MAX(position), 0) FROM local_documents WHERE collection = ?', (collection_name,)
+        ).fetchone()[0]
+        for doc_id, data in items:
+            position += 1
+            # An update keeps the document's original position
+            conn.execute(
+                'INSERT INTO local_documents (collection, doc_id, position, data) VALUES (?, ?, ?, ?) '
+                'ON CONFLICT (collection, doc_id) DO UPDATE SET data = excluded.data',
+                (collection_name, str(doc_id), position, json.dumps(data, default=str))
+            )
+
+    def list(self, collection_name):
+        rows = self.connection().execute(
+            'SELECT data FROM local_documents WHERE collection = ? ORDER BY position', (collection_name,)
+        )
+        return [json.loads(row[0]) for row in rows]
+
+    def upsert_many(self, collection_name, items):
+        """Insert or replace (doc_id, data) pairs in one transaction"""
+        with self.connection() as conn:
+            self._upsert(conn, collection_name, items)
+
+    def delete(self, collection_name, doc_id):
+        with self.connection() as conn:
+            conn.execute('DELETE FROM local_documents WHERE collection = ? AND doc_id = ?',
+                         (collection_name, str(doc_id)))
+
+
+class CollectionVersions(SQLiteStore):
+    """Per-collection write counters shared by every worker"""
+
+    schema = """
+        CREATE TABLE IF NOT EXISTS collection_versions (
+            collection TEXT PRIMARY KEY,
+            version INTEGER NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS collection_versions_meta (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            epoch TEXT NOT NULL
+        );
+    """
+
+    def __init__(self, path=None):
+        super().__init__(path)
+        with self.connection() as conn:
+            conn.execute('INSERT OR IGNORE INTO collection_versions_meta (id, epoch) VALUES (1, ?)',
+                         (os.urandom(4).hex(),))
+        # Distinguishes counters of a recreated database from the old ones
+        self.epoch = self.connection().execute(
+            'SELECT epoch FROM collection_versions_meta WHERE id = 1'
+        ).fetchone()[0]
+
+    def get(self, collection_name):
+        row = self.connection().execute(
+            'SELECT version FROM collection_versions WHERE collection = ?', (collection_name,)
+        ).fetchone()
+        return row[0] if row else 0
+
+    def bump(self, collection_name):
+        """Increment a collection's counter and return the new version"""
+        with self.connection() as conn:
+            conn.execute(
+                'INSERT INTO collection_versions (collection, version) VALUES (?, 1) '
+                'ON CONFLICT (collection) DO UPDATE SET version = version + 1',
+                (collection_name,)
+            )
+            # Still inside the write transaction, so no other bump can interleave
+            return conn.execute(
+                'SELECT version FROM collection_versions WHERE collection = ?', (collection_name,)
+            ).fetchone()[0]
@@ -0,0 +1,325 @@
+"""
+Request and data-layer instrumentation for the JKWI cloud API
+MetricsRegistry keeps counters, gauges and fixed-bucket histograms in memory
+and renders them in the Prometheus text exposition format. init_metrics()
+records latency, status, response size and in-flight requests per route, and
+the time spent serialising JSON. With several workers, each one publishes a
+snapshot of its metrics to the shared state database every few seconds
+(SharedMetricsStore), and a scrape of any worker renders every live worker's
+series labelled with its pid.
+"""
+
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+from state_store import SQLiteStore
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+
+class Histogram:
+    """Fixed-bucket histogram, cheap enough to update on every request"""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def merge(self, other):
+        self.counts = [mine + theirs for mine, theirs in zip(self.counts, other.counts)]
+        self.sum += other.sum
+        self.count += other.count
+
+    def to_dict(self):
+        return {'counts': list(self.counts), 'sum': self.sum, 'count': self.count}
+
+    @classmethod
+    def from_dict(cls, buckets, data):
+        histogram = cls(buckets)
+        if len(data['counts']) == len(histogram.counts):
+            histogram.counts = list(data['counts'])
+            histogram.sum = data['sum']
+            histogram.count = data['count']
+        return histogram
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding the q-th quantile"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float('inf')
+
+
+def _label_key(labels):
+    return tuple(sorted(labels.items()))
+
+
+def _format_labels(key, extra=()):
+    pairs = list(key) + list(extra)
+    if not pairs:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in pairs)
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + '}'
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class SharedMetricsStore(SQLiteStore):
+    """Latest metrics snapshot of every worker on the host"""
+
+    schema = """
+        CREATE TABLE IF NOT EXISTS metric_snapshots (
+            pid INTEGER PRIMARY KEY,
+            snapshot TEXT NOT NULL,
+            updated_at REAL NOT NULL
+        );
+    """
+
+    def __init__(self, path=None, stale_after=60, clock=time.time):
+        self.stale_after = stale_after
+        self._clock = clock
+        super().__init__(path)
+
+    def publish(self, pid, snapshot):
+        with self.connection() as conn:
+            conn.execute('INSERT OR REPLACE INTO metric_snapshots (pid, snapshot, updated_at) VALUES (?, ?, ?)',
+                         (pid, json.dumps(snapshot), self._clock()))
+
+    def collect(self):
+        """{pid: snapshot} of the workers that published recently; older ones are dropped"""
+        cutoff = self._clock() - self.stale_after
+        with self.connection() as conn:
+            # A worker that stopped publishing has exited; its series end with it
+            conn.execute('DELETE FROM metric_snapshots WHERE updated_at < ?', (cutoff,))
+            rows = conn.execute('SELECT pid, snapshot FROM metric_snapshots').fetchall()
+        return {row['pid']: json.loads(row['snapshot']) for row in rows}
+
+
+class MetricsRegistry:
+    """Thread-safe store of labelled counters, gauges and histograms
+
+    With a `shared` store, render() and the summaries cover every worker that
+    published a snapshot in the last `shared.stale_after` seconds.
+    """
+
+    def __init__(self, shared=None, publish_interval=5.0):
+        self.shared = shared
+        self.publish_interval = publish_interval
+        self._lock = threading.Lock()
+        self._types = {}
+        self._help = {}
+        self._buckets = {}
+        self._values = {}
+        self._publisher_pid = None
+        # Other workers' snapshots, reused for a second so /api/health reads them once
+        self._collected = (0.0, {})
+
+    def describe(self, name, metric_type, help_text, buckets=LATENCY_BUCKETS):
+        self._types[name] = metric_type
+        self._help[name] = help_text
+        self._buckets[name] = buckets
+        self._values.setdefault(name, {})
+
+    def inc(self, name, amount=1, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            series = self._values[name]
+            series[key] = series.get(key, 0) + amount
+
+    def observe(self, name, value, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            series = self._values[name]
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = Histogram(self._buckets[name])
+            histogram.observe(value)
+
+    @contextmanager
+    def time(self, name, **labels):
+        """Observe the duration of the with-block in seconds"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started, **labels)
+
+    def snapshot(self):
+        """This process's values in a JSON-serialisable form"""
+        with self._lock:
+            return {
+                name: [[list(key), value.to_dict() if isinstance(value, Histogram) else value]
+                       for key, value in series.items()]
+                for name, series in self._values.items()
+            }
+
+    def start(self):
+        """Publish snapshots every publish_interval seconds; safe to call repeatedly and after fork"""
+        if self.shared is None:
+            return
+        with self._lock:
+            if self._publisher_pid == os.getpid():
+                return
+            self._publisher_pid = os.getpid()
+        threading.Thread(target=self._publish_loop, name='jkwi-metrics-publish', daemon=True).start()
+
+    def _publish_loop(self):
+        while True:
+            try:
+                self.shared.publish(os.getpid(), self.snapshot())
+            except Exception as e:
+                print(f"Metrics publish failed: {e}")
+            time.sleep(self.publish_interval)
+
+    def workers(self):
+        """{pid: {name: {label key: value}}} for this process and, if shared, every live worker"""
+        snapshots = {os.getpid(): self.snapshot()}
+        if self.shared is not None:
+            collected_at, others = self._collected
+            if time.monotonic() - collected_at > 1.0:
+                self.shared.publish(os.getpid(), snapshots[os.getpid()])
+                others = self.shared.collect()
+                self._collected = (time.monotonic(), others)
+            snapshots = {**others, **snapshots}
+        workers = {}
+        for pid, snapshot in snapshots.items():
+            values = workers[pid] = {}
+            for name, series in snapshot.items():
+                if name not in self._types:
+                    continue
+                values[name] = {
+                    tuple(tuple(pair) for pair in key):
+                        Histogram.from_dict(self._buckets[name], value) if isinstance(value, dict) else value
+                    for key, value in series
+                }
+        return workers
+
+    def merged(self, name):
+        """{label key: value} of one metric summed over all workers"""
+        merged = {}
+        for values in self.workers().values():
+            for key, value in values.get(name, {}).items():
+                if isinstance(value, Histogram):
+                    total = merged.setdefault(key, Histogram(value.buckets))
+                    total.merge(value)
+                else:
+                    merged[key] = merged.get(key, 0) + value
+        return merged
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format
+
+        With a shared store every series carries a `pid` label, so each worker's
+        counters stay monotonic; sum without (pid) to aggregate.
+        """
+        workers = self.workers()
+        lines = []
+        for name in list(self._types):
+            lines.append(f'# HELP {name} {self._help[name]}')
+            lines.append(f'# TYPE {name} {self._types[name]}')
+            for pid, values in sorted(workers.items()):
+                extra = [('pid', pid)] if self.shared is not None else []
+                for key, value in sorted(values.get(name, {}).items()):
+                    if isinstance(value, Histogram):
+                        cumulative = 0
+                        for bound, count in zip(value.buckets + (float('inf'),), value.counts):
+                            cumulative += count
+                            labels = _format_labels(key, extra + [('le', _format_value(bound))])
+                            lines.append(f'{name}_bucket{labels} {cumulative}')
+                        lines.append(f'{name}_sum{_format_labels(key, extra)} {_format_value(value.sum)}')
+                        lines.append(f'{name}_count{_format_labels(key, extra)} {value.count}')
+                    else:
+                        lines.append(f'{name}{_format_labels(key, extra)} {_format_value(value)}')
+        return '\n'.join(lines) + '\n'
+
+    def histogram_summary(self, name, *label_names):
+        """count and p50/p95/p99 (ms) of a histogram over all workers, keyed by the given labels"""
+        summary = {}
+        for key, histogram in self.merged(name).items():
+            labels = dict(key)
+            label = ' '.join(str(labels.get(label_name, '')) for label_name in label_names)
+            summary[label or 'all'] = {
+                'count': histogram.count,
+                'avg_ms': round(histogram.sum / histogram.count * 1000, 2),
+                'p50_ms': histogram.quantile(0.5) * 1000,
+                'p95_ms': histogram.quantile(0.95) * 1000,
+                'p99_ms': histogram.quantile(0.99) * 1000
+            }
+        return summary
+
+    def total(self, name):
+        return sum(self.merged(name).values())
+
+
+def init_metrics(app, registry):
+    """Record per-route request metrics and JSON serialisation time for `app`"""
+    from flask import g, request
+
+    registry.describe('jkwi_http_requests_total', 'counter', 'Requests handled, by route and status')
+    registry.describe('jkwi_http_request_duration_seconds', 'histogram',
+                      'Time from request start to response (first byte for streams)')
+    registry.describe('jkwi_http_response_size_bytes', 'histogram', 'Response body size as sent',
+                      buckets=SIZE_BUCKETS)
+    registry.describe('jkwi_http_requests_in_flight', 'gauge', 'Requests currently being handled')
+    registry.describe('jkwi_json_serialise_duration_seconds', 'histogram', 'Time spent serialising JSON responses')
+
+    def route_label():
+        return request.url_rule.rule if request.url_rule is not None else 'unmatched'
+
+    @app.before_request
+    def start_request_timer():
+        registry.start()
+        g.metrics_started = time.perf_counter()
+        g.metrics_route = route_label()
+        registry.inc('jkwi_http_requests_in_flight', route=g.metrics_route)
+
+    # after_request hooks run in reverse order of registration, so calling
+    # this before init_compression() times and sizes the compressed response
+    @app.after_request
+    def record_request(response):
+        started = g.pop('metrics_started', None)
+        if started is None:
+            return response
+        route = g.metrics_route
+        registry.observe('jkwi_http_request_duration_seconds', time.perf_counter() - started,
+                         method=request.method, route=route)
+        registry.inc('jkwi_http_requests_total', method=request.method, route=route,
+                     status=response.status_code)
+        if response.content_length is not None:
+            registry.observe('jkwi_http_response_size_bytes', response.content_length,
+                             method=request.method, route=route)
+        return response
+
+    @app.teardown_request
+    def finish_request(exc):
+        route = g.pop('metrics_route', None)
+        if route is not None:
+            registry.inc('jkwi_http_requests_in_flight', -1, route=route)
+
+    json_response = app.json.response
+
+    def timed_json_response(*args, **kwargs):
+        with registry.time('jkwi_json_serialise_duration_seconds'):
+            return json_response(*args, **kwargs)
+
+    app.json.response = timed_json_response
@@ -5,8 +5,10 @@ This script helps migrate your current JKWI data to the new cloud system
 
 import json
 import os
+import random
 import sys
 import argparse
+from itertools import chain, islice
 from pathlib import Path
 from datetime import datetime
 
@@ -21,24 +23,76 @@ except ImportError:
     FIREBASE_AVAILABLE = False
     print("⚠️ Firebase not available. Install with: pip install firebase-admin")
 
+from export_sources import EXPORTED_COLLECTIONS, ExportWriter, local_sources, read_export, write_manifest_json
+from firestore_batches import (DELETE, FIRESTORE_BATCH_LIMIT, SET, BatchCommitter, ImportCheckpoint,
+                               ImportProgress, content_hash)
+
+MIGRATED_COLLECTIONS = EXPORTED_COLLECTIONS
+
+def diff_manifests(previous, current):
+    """Documents inserted, updated and deleted between two manifests, as (collection, doc_id) lists"""
+    changes = {'insert': [], 'update': [], 'delete': []}
+    for collection_name in sorted(set(previous) | set(current)):
+        old = previous.get(collection_name, {})
+        new = current.get(collection_name, {})
+        for doc_id, digest in new.items():
+            if doc_id not in old:
+                changes['insert'].append((collection_name, doc_id))
+            elif old[doc_id] != digest:
+                changes['update'].append((collection_name, doc_id))
+        changes['delete'].extend((collection_name, doc_id) for doc_id in old if doc_id not in new)
+    return changes
+
+DEFAULT_DIVISIONS = [
+    {"id": 1, "name": "Mining Division", "description": "Mineral extraction and resource development"},
+    {"id": 2, "name": "Infrastructure Division", "description": "Construction and development projects"},
+    {"id": 3, "name": "Farming Division", "description": "Agricultural and agribusiness ventures"},
+    {"id": 4, "name": "Service Division", "description": "Professional and consulting services"},
+    {"id": 5, "name": "Finance Division", "description": "Financial services and investment management"},
+    {"id": 6, "name": "Legal Division", "description": "Legal advisory and compliance services"},
+    {"id": 7, "name": "Media Division", "description": "Communications and media services"},
+    {"id": 8, "name": "Social Division", "description": "Community engagement and social impact"}
+]
+
 class DataMigrationTool:
     """Tool to migrate JKWI data from local storage to cloud database"""
     
-    def __init__(self):
-        self.local_data_path = Path(__file__).parent.parent
+    def __init__(self, firebase_db=None, local_data_path=None, batch_size=None, import_workers=None,
+                 skip_identical=True):
+        self.local_data_path = Path(local_data_path) if local_data_path else Path(__file__).parent.parent
         self.backup_path = self.local_data_path / "migration_backups"
         self.backup_path.mkdir(exist_ok=True)
         
-        # Initialize Firebase if available
-        self.firebase_db = None
-        if FIREBASE_AVAILABLE:
+        # Documents per batched write, and batches committed at the same time
+        self.batch_size = batch_size or int(os.getenv('IMPORT_BATCH_SIZE', FIRESTORE_BATCH_LIMIT))
+        self.import_workers = import_workers or int(os.getenv('IMPORT_WORKERS', 4))
+        # Only write documents that differ from Firestore; those unchanged since the
+        # last completed sync are recognised from its manifest without a read
+        self.skip_identical = skip_identical
+        self.checkpoint_path = self.backup_path / "import_checkpoint.json"
+        # Manifest of the last export that reached the cloud, the baseline for --incremental
+        self.synced_manifest_path = self.backup_path / "last_synced_manifest.json"
+        # Documents per collection whose content verify_migration compares
+        self.verify_sample_size = int(os.getenv('VERIFY_SAMPLE_SIZE', 100))
+        
+        # A client passed in (emulator, tests) is used as is
+        self.firebase_db = firebase_db
+        if self.firebase_db is None and FIREBASE_AVAILABLE:
             self.init_firebase()
     
     def init_firebase(self):
         """Initialize Firebase connection"""
+        emulator_host = os.getenv('FIRESTORE_EMULATOR_HOST')
+        if emulator_host:
+            # The emulator needs no service account; the client reads the host from the environment
+            from google.cloud import firestore as cloud_firestore
+            self.firebase_db = cloud_firestore.Client(project=os.getenv('GOOGLE_CLOUD_PROJECT', 'jkwi-local'))
+            print(f"✅ Using Firestore emulator at {emulator_host}")
+            return
         try:
             # Check if Firebase is already initialized
             firebase_admin.get_app()
+            self.firebase_db = firestore.client()
         except ValueError:
             # Firebase not initialized, let's initialize it
             service_account_path = os.getenv('FIREBASE_SERVICE_ACCOUNT_PATH')
@@ -52,191 +106,272 @@ class DataMigrationTool:
         except Exception as e:
             print(f"❌ Firebase initialization failed: {e}")
     
-    def export_local_data(self):
-        """Export existing local data to JSON file"""
+    def export_local_data(self, sources=None):
+        """Export existing local data to an NDJSON file, one document per line"""
         print("🔍 Scanning for existing JKWI data...")
         
-        exported_data = {
-            "export_info": {
-                "timestamp": datetime.now().isoformat(),
-                "version": "1.0",
-                "source": "local_jkwi_system"
-            },
-            "company": {},
-            "directors": [],
-            "divisions": [],
-            "members": [],
-            "partnerships": [],
-            "activities": []
-        }
-        
-        # Check for existing data in various locations
-        data_sources = [
-            self.local_data_path / "js" / "data.js",
-            self.local_data_path / "data" / "company_data.json",
-            self.local_data_path / "src" / "data",
-            # Add more potential data source paths
-        ]
-        
-        # Extract data from localStorage backup if available
-        localStorage_file = self.local_data_path / "localStorage_backup.json"
-        if localStorage_file.exists():
-            with open(localStorage_file, 'r', encoding='utf-8') as f:
-                localStorage_data = json.load(f)
-                if 'jkwi_data' in localStorage_data:
-                    jkwi_data = json.loads(localStorage_data['jkwi_data'])
-                    exported_data.update(jkwi_data)
-        
-        # Extract data from JavaScript data file
-        data_js_file = self.local_data_path / "js" / "data.js"
-        if data_js_file.exists():
-            print("📁 Found data.js file, extracting data...")
-            # This would require parsing the JavaScript file
-            # For now, we'll use a simplified approach
-        
-        # Extract demo members data
-        demo_members_path = self.local_data_path / "data" / "demo_members"
-        if demo_members_path.exists():
-            print("👥 Found demo members data...")
-            demo_file = demo_members_path / "demo_members.json"
-            if demo_file.exists():
-                with open(demo_file, 'r', encoding='utf-8') as f:
-                    demo_data = json.load(f)
-                    if 'members' in demo_data:
-                        exported_data['members'].extend(demo_data['members'])
-        
-        # Extract company details
-        company_details_path = self.local_data_path.parent / "DESIGN SYSTEM" / "company details"
-        if company_details_path.exists():
-            print("🏢 Found company details...")
-            
-            # Extract from various company detail files
-            for file_type in ['json', 'yaml', 'xml']:
-                company_file = company_details_path / f"company_details.{file_type}"
-                if company_file.exists():
-                    if file_type == 'json':
-                        with open(company_file, 'r', encoding='utf-8') as f:
-                            company_data = json.load(f)
-                            exported_data['company'].update(company_data)
-        
-        # Add default JKWI structure if no data found
-        if not exported_data['divisions']:
-            exported_data['divisions'] = [
-                {"id": 1, "name": "Mining Division", "description": "Mineral extraction and resource development"},
-                {"id": 2, "name": "Infrastructure Division", "description": "Construction and development projects"},
-                {"id": 3, "name": "Farming Division", "description": "Agricultural and agribusiness ventures"},
-                {"id": 4, "name": "Service Division", "description": "Professional and consulting services"},
-                {"id": 5, "name": "Finance Division", "description": "Financial services and investment management"},
-                {"id": 6, "name": "Legal Division", "description": "Legal advisory and compliance services"},
-                {"id": 7, "name": "Media Division", "description": "Communications and media services"},
-                {"id": 8, "name": "Social Division", "description": "Community engagement and social impact"}
-            ]
-        
-        if not exported_data['company']:
-            exported_data['company'] = {
-                "name": "JK Winners Investment",
-                "tradingName": "JKWI",
-                "description": "JK Winners Investment (JKWI) is a comprehensive investment company structured to provide excellence across multiple sectors.",
-                "lastUpdated": datetime.now().isoformat()
-            }
-        
-        # Save exported data
-        export_filename = f"jkwi_data_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+        export_filename = f"jkwi_data_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.ndjson"
         export_path = self.backup_path / export_filename
         
         with open(export_path, 'w', encoding='utf-8') as f:
-            json.dump(exported_data, f, indent=2, ensure_ascii=False)
+            writer = ExportWriter(f)
+            writer.write_header({
+                "timestamp": datetime.now().isoformat(),
+                "version": "2.0",
+                "source": "local_jkwi_system"
+            })
+            for source in local_sources(self.local_data_path) if sources is None else sources:
+                if source.available():
+                    added = writer.add_source(source)
+                    print(f"📁 {source.name}: {added} records from {source.path}")
+            
+            # Add default JKWI structure if no data found
+            if not writer.counts['divisions']:
+                for division in DEFAULT_DIVISIONS:
+                    writer.add('divisions', division)
+            if not writer.company:
+                writer.add('company', {
+                    "name": "JK Winners Investment",
+                    "tradingName": "JKWI",
+                    "description": "JK Winners Investment (JKWI) is a comprehensive investment company structured to provide excellence across multiple sectors.",
+                    "lastUpdated": datetime.now().isoformat()
+                })
+            writer.finish()
+        self.write_manifest(self.manifest_path(export_path), writer.manifest_entries(), export_path)
         
         print(f"✅ Data exported to: {export_path}")
         print(f"📊 Export summary:")
-        print(f"   - Company: {'✓' if exported_data['company'] else '✗'}")
-        print(f"   - Directors: {len(exported_data['directors'])}")
-        print(f"   - Divisions: {len(exported_data['divisions'])}")
-        print(f"   - Members: {len(exported_data['members'])}")
-        print(f"   - Partnerships: {len(exported_data['partnerships'])}")
+        print(f"   - Company: {'✓' if writer.company else '✗'}")
+        print(f"   - Directors: {writer.counts['directors']}")
+        print(f"   - Divisions: {writer.counts['divisions']}")
+        print(f"   - Members: {writer.counts['members']}")
+        print(f"   - Partnerships: {writer.counts['partnerships']}")
+        if writer.duplicates:
+            print(f"   - Duplicates skipped: {writer.duplicates}")
         
         return export_path
     
-    def import_to_cloud(self, export_file_path):
-        """Import data to cloud database"""
+    def iter_operations(self, export_file_path):
+        """Set operations for every document in an export, read lazily"""
+        for collection_name, doc_id, record in read_export(export_file_path):
+            yield SET, collection_name, doc_id, record
+    
+    def build_manifest(self, export_file_path):
+        """Content hash of every document in an export, by collection and ID"""
+        manifest = {}
+        for collection_name, doc_id, record in read_export(export_file_path):
+            manifest.setdefault(collection_name, {})[doc_id] = content_hash(record)
+        return manifest
+    
+    def manifest_path(self, export_file_path):
+        return Path(export_file_path).with_suffix('.manifest.json')
+    
+    def write_manifest(self, path, manifest, export_file_path):
+        """Save a {collection: {doc_id: hash}} manifest, or (collection, doc_id, hash) entries in collection order"""
+        entries = manifest
+        if isinstance(manifest, dict):
+            entries = ((collection_name, doc_id, digest) for collection_name in sorted(manifest)
+                       for doc_id, digest in manifest[collection_name].items())
+        with open(path, 'w', encoding='utf-8') as f:
+            write_manifest_json(f, {
+                "export_file": str(export_file_path),
+                "timestamp": datetime.now().isoformat()
+            }, entries)
+    
+    def load_manifest(self, path):
+        if not Path(path).exists():
+            return None
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)['collections']
+    
+    def import_to_cloud(self, export_file_path, resume=False):
+        """Import data to cloud database, optionally resuming an interrupted import"""
         if not self.firebase_db:
             print("❌ Cloud database not available. Please configure Firebase.")
             return False
         
         print(f"📤 Importing data from {export_file_path} to cloud database...")
         
-        with open(export_file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        manifest = self.load_manifest(self.manifest_path(export_file_path)) or self.build_manifest(export_file_path)
+        totals = {name: len(docs) for name, docs in manifest.items()}
+        
+        operations = self.iter_operations(export_file_path)
+        checkpoint = ImportCheckpoint(self.checkpoint_path, export_file_path)
+        if resume:
+            if not checkpoint.load():
+                print("⚠️ No checkpoint for this file, importing from the start")
+            elif checkpoint.completed:
+                print("✅ This file was already imported completely")
+                return True
+            else:
+                position = checkpoint.position
+                print(f"⏩ Resuming after {checkpoint.committed} documents "
+                      f"({position.get('collection')} offset {position.get('offset')})")
+                for _, collection_name, _, _ in islice(operations, checkpoint.committed):
+                    totals[collection_name] -= 1
+        
+        progress = ImportProgress(totals)
+        known_hashes = self.load_manifest(self.synced_manifest_path) if self.skip_identical else None
+        committer = BatchCommitter(self.firebase_db, batch_size=self.batch_size,
+                                   max_workers=self.import_workers, progress=progress,
+                                   on_commit=checkpoint.mark, skip_identical=self.skip_identical,
+                                   known_hashes=known_hashes)
+        print(f"⚙️ {sum(totals.values())} documents, batches of {committer.batch_size}, "
+              f"{committer.max_workers} concurrent committers")
         
         try:
-            # Import company data
-            if data.get('company'):
-                self.firebase_db.collection('company').document('main').set(data['company'])
-                print("✅ Company data imported")
-            
-            # Import directors
-            for director in data.get('directors', []):
-                doc_id = str(director.get('id', int(datetime.now().timestamp() * 1000)))
-                self.firebase_db.collection('directors').document(doc_id).set(director)
-            print(f"✅ {len(data.get('directors', []))} directors imported")
-            
-            # Import divisions
-            for division in data.get('divisions', []):
-                doc_id = str(division.get('id', int(datetime.now().timestamp() * 1000)))
-                self.firebase_db.collection('divisions').document(doc_id).set(division)
-            print(f"✅ {len(data.get('divisions', []))} divisions imported")
-            
-            # Import members
-            for member in data.get('members', []):
-                doc_id = str(member.get('id', int(datetime.now().timestamp() * 1000)))
-                self.firebase_db.collection('members').document(doc_id).set(member)
-            print(f"✅ {len(data.get('members', []))} members imported")
-            
-            # Import partnerships
-            for partnership in data.get('partnerships', []):
-                doc_id = str(partnership.get('id', int(datetime.now().timestamp() * 1000)))
-                self.firebase_db.collection('partnerships').document(doc_id).set(partnership)
-            print(f"✅ {len(data.get('partnerships', []))} partnerships imported")
+            resumed_from = checkpoint.committed
+            ok = committer.write(operations)
+            checkpoint.finish()
+            progress.report(final=True)
+            summary = progress.summary()
             
             # Log migration activity
             migration_log = {
                 "action": "data_migration",
                 "timestamp": datetime.now().isoformat(),
                 "source_file": str(export_file_path),
-                "imported_counts": {
-                    "directors": len(data.get('directors', [])),
-                    "divisions": len(data.get('divisions', [])),
-                    "members": len(data.get('members', [])),
-                    "partnerships": len(data.get('partnerships', []))
-                }
+                "imported_counts": {name: summary['written'].get(name, 0) for name in MIGRATED_COLLECTIONS},
+                "unchanged_counts": summary['unchanged'],
+                "resumed_from": resumed_from,
+                "failed_counts": summary['failed'],
+                "batches": summary['batches'],
+                "retries": summary['retries'],
+                "seconds": summary['seconds'],
+                "docs_per_second": summary['docs_per_second']
             }
             self.firebase_db.collection('activities').add(migration_log)
             
+            if not ok:
+                print(f"❌ Migration incomplete: {sum(summary['failed'].values())} documents were not written")
+                print(f"   Checkpoint saved after {checkpoint.committed} documents; rerun with --resume")
+                return False
+            self.write_manifest(self.synced_manifest_path, manifest, export_file_path)
             print("🎉 Data migration completed successfully!")
             return True
             
         except Exception as e:
             print(f"❌ Migration failed: {e}")
+            print(f"   Checkpoint saved after {checkpoint.committed} documents; rerun with --resume")
+            return False
+    
+    def import_incremental(self, export_file_path):
+        """Push only the documents inserted, updated or deleted since the last synced export"""
+        if not self.firebase_db:
+            print("❌ Cloud database not available. Please configure Firebase.")
+            return False
+        
+        previous = self.load_manifest(self.synced_manifest_path)
+        if previous is None:
+            print("⚠️ No previous sync recorded, running a full import")
+            return self.import_to_cloud(export_file_path)
+        
+        current = self.load_manifest(self.manifest_path(export_file_path)) or self.build_manifest(export_file_path)
+        changes = diff_manifests(previous, current)
+        print(f"🔄 Changes since last sync: {len(changes['insert'])} inserts, "
+              f"{len(changes['update'])} updates, {len(changes['delete'])} deletes")
+        
+        if not any(changes.values()):
+            print("✅ Cloud data is already up to date")
+            return True
+        
+        changed = set(changes['insert']) | set(changes['update'])
+        operations = chain(
+            (op for op in self.iter_operations(export_file_path) if (op[1], op[2]) in changed),
+            ((DELETE, collection_name, doc_id, None) for collection_name, doc_id in changes['delete'])
+        )
+        totals = {}
+        for collection_name, _ in chain(changed, changes['delete']):
+            totals[collection_name] = totals.get(collection_name, 0) + 1
+        progress = ImportProgress(totals)
+        # The manifests already say what differs, so there is no need to read the targets first
+        committer = BatchCommitter(self.firebase_db, batch_size=self.batch_size,
+                                   max_workers=self.import_workers, progress=progress, skip_identical=False)
+        
+        try:
+            ok = committer.write(operations)
+            progress.report(final=True)
+            summary = progress.summary()
+            self.firebase_db.collection('activities').add({
+                "action": "incremental_sync",
+                "timestamp": datetime.now().isoformat(),
+                "source_file": str(export_file_path),
+                "changes": {kind: len(items) for kind, items in changes.items()},
+                "failed_counts": summary['failed'],
+                "seconds": summary['seconds']
+            })
+        except Exception as e:
+            print(f"❌ Incremental sync failed: {e}")
             return False
+        
+        if not ok:
+            # The baseline stays put, so the next run pushes the same changes again
+            print(f"❌ Incremental sync incomplete: {sum(summary['failed'].values())} changes were not applied")
+            return False
+        self.write_manifest(self.synced_manifest_path, current, export_file_path)
+        print("🎉 Incremental sync completed successfully!")
+        return True
+    
+    def count_documents(self, collection_name):
+        """Number of documents in a collection, without downloading them where possible"""
+        collection = self.firebase_db.collection(collection_name)
+        try:
+            return collection.count().get()[0][0].value
+        except Exception:
+            # Older clients and emulators without aggregation queries: fetch IDs only
+            return sum(1 for _ in collection.select([]).stream())
     
-    def verify_migration(self):
-        """Verify that data was migrated correctly"""
+    def sample_mismatches(self, collection_name, expected, sample_size):
+        """IDs among a random sample of expected documents whose cloud content differs"""
+        doc_ids = sorted(expected)
+        sample = random.sample(doc_ids, min(sample_size, len(doc_ids)))
+        collection = self.firebase_db.collection(collection_name)
+        found = {}
+        for snapshot in self.firebase_db.get_all([collection.document(doc_id) for doc_id in sample]):
+            if snapshot.exists:
+                found[snapshot.id] = content_hash(snapshot.to_dict())
+        return sample, [doc_id for doc_id in sample if found.get(doc_id) != expected[doc_id]]
+    
+    def verify_migration(self, export_file_path=None, sample_size=None):
+        """Check document counts and a sample of document contents against an export"""
         if not self.firebase_db:
             print("❌ Cannot verify - cloud database not available")
             return False
         
+        sample_size = self.verify_sample_size if sample_size is None else sample_size
+        manifest = None
+        if export_file_path:
+            manifest = self.load_manifest(self.manifest_path(export_file_path)) or self.build_manifest(export_file_path)
+        else:
+            # Without an export, compare with the last export that was synced
+            manifest = self.load_manifest(self.synced_manifest_path)
+        
         print("🔍 Verifying migration...")
+        if manifest is None:
+            print("   (no export to compare with, counting documents only)")
         
-        collections = ['company', 'directors', 'divisions', 'members', 'partnerships']
-        for collection_name in collections:
+        all_ok = True
+        for collection_name in ['company'] + MIGRATED_COLLECTIONS:
             try:
-                docs = list(self.firebase_db.collection(collection_name).stream())
-                count = len(docs)
-                print(f"   - {collection_name}: {count} documents")
+                count = self.count_documents(collection_name)
+                if manifest is None:
+                    print(f"   - {collection_name}: {count} documents")
+                    continue
+                expected = manifest.get(collection_name, {})
+                sample, mismatched = self.sample_mismatches(collection_name, expected, sample_size)
+                ok = count == len(expected) and not mismatched
+                all_ok &= ok
+                line = (f"   {'✅' if ok else '❌'} {collection_name}: {count}/{len(expected)} documents, "
+                        f"{len(sample) - len(mismatched)}/{len(sample)} sampled match")
+                if mismatched:
+                    line += f" (differs: {', '.join(mismatched[:5])}{'...' if len(mismatched) > 5 else ''})"
+                print(line)
             except Exception as e:
-                print(f"   - {collection_name}: Error - {e}")
+                all_ok = False
+                print(f"   ❌ {collection_name}: Error - {e}")
         
-        print("✅ Verification completed")
+        print("✅ Verification passed" if all_ok else "❌ Verification failed")
+        return all_ok
     
     def create_backup(self):
         """Create a backup of current local data before migration"""
@@ -267,15 +402,23 @@ class DataMigrationTool:
 
 def main():
     parser = argparse.ArgumentParser(description='JKWI Data Migration Tool')
-    parser.add_argument('--export', action='store_true', help='Export local data to JSON')
-    parser.add_argument('--import', dest='import_file', help='Import data from JSON file to cloud')
+    parser.add_argument('--export', action='store_true', help='Export local data to NDJSON')
+    parser.add_argument('--import', dest='import_file', help='Import data from an NDJSON (or older JSON) export to cloud')
     parser.add_argument('--verify', action='store_true', help='Verify cloud data')
+    parser.add_argument('--verify-against', help='Export file to verify cloud data against (default: last synced export)')
+    parser.add_argument('--sample-size', type=int, help='Documents per collection to compare by content (default 100)')
     parser.add_argument('--backup', action='store_true', help='Create backup of local data')
     parser.add_argument('--full-migration', action='store_true', help='Perform complete migration (export + import)')
+    parser.add_argument('--batch-size', type=int, help=f'Documents per batched write (max {FIRESTORE_BATCH_LIMIT})')
+    parser.add_argument('--import-workers', type=int, help='Batches committed concurrently (default 4)')
+    parser.add_argument('--resume', action='store_true', help='Continue an interrupted import from its checkpoint')
+    parser.add_argument('--overwrite', action='store_true', help='Write every document, even ones already identical in the cloud')
+    parser.add_argument('--incremental', action='store_true', help='Export, then push only changes since the last sync')
     
     args = parser.parse_args()
     
-    migrator = DataMigrationTool()
+    migrator = DataMigrationTool(batch_size=args.batch_size, import_workers=args.import_workers,
+                                 skip_identical=not args.overwrite)
     
     if args.backup:
         migrator.create_backup()
@@ -284,14 +427,17 @@ def main():
         export_path = migrator.export_local_data()
         if args.full_migration:
             migrator.import_to_cloud(export_path)
-            migrator.verify_migration()
+            migrator.verify_migration(export_path, args.sample_size)
+    
+    if args.incremental:
+        migrator.import_incremental(migrator.export_local_data())
     
     if args.import_file:
-        migrator.import_to_cloud(Path(args.import_file))
-        migrator.verify_migration()
+        migrator.import_to_cloud(Path(args.import_file), resume=args.resume)
+        migrator.verify_migration(Path(args.import_file), args.sample_size)
     
-    if args.verify:
-        migrator.verify_migration()
+    if args.verify or args.verify_against:
+        migrator.verify_migration(args.verify_against, args.sample_size)
     
     if not any(vars(args).values()):
         print("🚀 JKWI Data Migration Tool")
@@ -299,8 +445,14 @@ def main():
         print("  --export              Export local data")
         print("  --import <file>       Import data to cloud")
         print("  --verify              Verify cloud data")
+        print("  --verify-against <f>  Verify cloud data against an export file")
         print("  --backup              Create local backup")
         print("  --full-migration      Complete migration process")
+        print("  --incremental         Export and push only what changed since the last sync")
+        print("  --batch-size <n>      Documents per batched write")
+        print("  --import-workers <n>  Concurrent batch committers")
+        print("  --resume              Continue an interrupted import")
+        print("  --overwrite           Rewrite documents that are already identical")
         print("\nExample: python migration_tool.py --full-migration")
 
 if __name__ == "__main__":
@@ -0,0 +1,115 @@
+"""
+Password hashing off the request threads
+werkzeug's password hashes are deliberately CPU heavy. Running them in a
+process pool keeps request threads responsive during a login burst and uses
+every core despite the GIL. A bounded number of pending jobs caps the queue;
+callers past the cap get HasherBusyError instead of waiting indefinitely.
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from werkzeug.security import check_password_hash, generate_password_hash
+
+DEFAULT_METHOD = 'pbkdf2:sha256:600000'
+DEFAULT_SCRYPT_PARAMS = ('32768', '8', '1')
+
+
+class HasherBusyError(RuntimeError):
+    """Raised when the hashing queue is full"""
+
+
+def normalize_method(method):
+    """Spell out werkzeug's implied defaults, matching the prefix stored in hashes"""
+    parts = method.split(':')
+    if parts[0] == 'pbkdf2':
+        hash_name = parts[1] if len(parts) > 1 else 'sha256'
+        iterations = parts[2] if len(parts) > 2 else '600000'
+        return f'pbkdf2:{hash_name}:{iterations}'
+    if parts[0] == 'scrypt':
+        params = parts[1:] + list(DEFAULT_SCRYPT_PARAMS[len(parts) - 1:])
+        return 'scrypt:' + ':'.join(params)
+    return method
+
+
+class PasswordHasher:
+    """Hashes and verifies passwords in a process pool with a bounded queue"""
+
+    def __init__(self, method=DEFAULT_METHOD, salt_length=16, workers=None,
+                 max_pending=None, queue_timeout=2.0, inline=False):
+        self.method = normalize_method(method)
+        self.salt_length = salt_length
+        self.workers = workers or os.cpu_count() or 1
+        self.max_pending = max_pending or self.workers * 4
+        self.queue_timeout = queue_timeout
+        self.inline = inline
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._pool_lock = threading.Lock()
+        self._executor = None
+        self._executor_pid = None
+        # Optional observer(operation, seconds), e.g. for latency metrics
+        self.observer = None
+
+    def _pool(self):
+        # Created lazily and per process, so a pre-forking server gives each
+        # worker its own pool instead of sharing one inherited from the master
+        with self._pool_lock:
+            if self._executor is None or self._executor_pid != os.getpid():
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+                self._executor_pid = os.getpid()
+            return self._executor
+
+    def _run(self, operation, fn, *args):
+        started = time.perf_counter()
+        try:
+            return self._submit(fn, *args)
+        finally:
+            if self.observer is not None:
+                self.observer(operation, time.perf_counter() - started)
+
+    def _submit(self, fn, *args):
+        if self.inline:
+            return fn(*args)
+        if not self._slots.acquire(timeout=self.queue_timeout):
+            raise HasherBusyError('Password hashing queue is full')
+        try:
+            future = self._pool().submit(fn, *args)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future.result()
+
+    def hash(self, password):
+        """Hash a password with the configured method and cost"""
+        return self._run('hash', generate_password_hash, password, self.method, self.salt_length)
+
+    def verify(self, password_hash, password):
+        """Check a password against a stored hash"""
+        return self._run('verify', check_password_hash, password_hash, password)
+
+    def needs_rehash(self, password_hash):
+        """Whether a stored hash was made with a different method or cost"""
+        return password_hash.split('$', 1)[0] != self.method
+
+    def shutdown(self):
+        with self._pool_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+                self._executor = None
+
+
+def hasher_from_env():
+    """Build a PasswordHasher from the PASSWORD_HASH_* and HASH_* settings"""
+    workers = int(os.getenv('HASH_WORKERS', 0)) or None
+    max_pending = int(os.getenv('HASH_QUEUE_SIZE', 0)) or None
+    return PasswordHasher(
+        method=os.getenv('PASSWORD_HASH_METHOD', DEFAULT_METHOD),
+        salt_length=int(os.getenv('PASSWORD_SALT_LENGTH', 16)),
+        workers=workers,
+        max_pending=max_pending,
+        queue_timeout=float(os.getenv('HASH_QUEUE_TIMEOUT', 2.0)),
+        inline=os.getenv('HASH_INLINE', '').lower() in ('1', 'true', 'yes')
+    )
@@ -0,0 +1,309 @@
+"""
+Rate limiting and admission control for the JKWI cloud API
+Every request is charged to a token bucket keyed by its limit group and by
+the caller: the user for authenticated requests, the client IP otherwise.
+Logins are charged to both the client IP and the account being logged into.
+Buckets live in each worker's memory; with RATE_LIMIT_STORE=sqlite the workers
+on a host reconcile their spending through the state database about once a
+second, so together they enforce one budget without a write per request. Separately, a concurrency cap
+sheds requests with 503 once too many are in progress, instead of letting
+them queue up behind a saturated worker.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from state_store import SQLiteStore
+
+PERIODS = {'s': 1, 'sec': 1, 'second': 1, 'm': 60, 'min': 60, 'minute': 60, 'h': 3600, 'hour': 3600}
+
+# Requests per period for each limit group; 'batch' covers the :batch endpoints
+DEFAULT_RATE_LIMITS = {
+    'login': '10/min',
+    'register': '5/min',
+    'batch': '30/min',
+    'write': '120/min',
+    'read': '600/min'
+}
+
+# Longest username used in a per-account login bucket key
+MAX_ACCOUNT_KEY = 150
+
+# Endpoints that are never limited or counted against the concurrency cap
+EXEMPT_ENDPOINTS = {'health_check', 'prometheus_metrics', 'stream_events', 'index', 'static'}
+
+
+def parse_rate(spec):
+    """Parse '10/min' or '5/30' into (requests, seconds); 'off' gives None"""
+    spec = spec.strip().lower()
+    if spec in ('off', 'none', '0', ''):
+        return None
+    count, _, period = spec.partition('/')
+    period = period.strip() or 's'
+    seconds = PERIODS[period] if period in PERIODS else float(period)
+    return int(count), float(seconds)
+
+
+def parse_limits(spec):
+    """Parse 'login=10/min,read=off' into {'login': (10, 60.0), 'read': None}"""
+    limits = {}
+    for entry in (spec or '').split(','):
+        if '=' not in entry:
+            continue
+        name, rate = entry.split('=', 1)
+        limits[name.strip()] = parse_rate(rate)
+    return limits
+
+
+def limits_from_env():
+    """Default limits overridden by the RATE_LIMITS environment variable"""
+    defaults = {name: parse_rate(rate) for name, rate in DEFAULT_RATE_LIMITS.items()}
+    return {**defaults, **parse_limits(os.getenv('RATE_LIMITS'))}
+
+
+def refill(tokens, updated_at, now, rate, capacity):
+    """Tokens in a bucket at `now`, given its state at `updated_at`"""
+    return min(capacity, tokens + (now - updated_at) * rate)
+
+
+class MemoryBucketStore:
+    """Token buckets for this process, evicting the least recently used keys"""
+
+    def __init__(self, max_keys=100000, clock=time.monotonic):
+        self.max_keys = max_keys
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._buckets = OrderedDict()
+
+    def take(self, key, rate, capacity, cost=1):
+        """Spend `cost` tokens; returns (allowed, seconds until enough tokens)"""
+        now = self._clock()
+        with self._lock:
+            tokens, updated_at = self._buckets.get(key, (capacity, now))
+            tokens = refill(tokens, updated_at, now, rate, capacity)
+            allowed = tokens >= cost
+            if allowed:
+                tokens -= cost
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return allowed, 0.0 if allowed else (cost - tokens) / rate
+
+    def charge(self, key, amount, rate, capacity):
+        """Remove tokens spent elsewhere; the bucket may owe up to one burst"""
+        now = self._clock()
+        with self._lock:
+            tokens, updated_at = self._buckets.get(key, (capacity, now))
+            tokens = max(-capacity, refill(tokens, updated_at, now, rate, capacity) - amount)
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+
+
+class SQLiteBucketStore(SQLiteStore):
+    """Token buckets kept per worker and reconciled through the state database
+
+    Each request is decided from this worker's in-memory buckets. Every
+    `sync_interval` seconds the worker appends what it spent per key since the
+    last sync to a shared log and charges its own buckets with what the other
+    workers logged meanwhile, in one short transaction. A caller can overshoot
+    by what the other workers let through during one interval.
+    """
+
+    schema = """
+        CREATE TABLE IF NOT EXISTS rate_spent (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            key TEXT NOT NULL,
+            worker TEXT NOT NULL,
+            spent REAL NOT NULL,
+            rate REAL NOT NULL,
+            capacity REAL NOT NULL,
+            created_at REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS rate_spent_created ON rate_spent (created_at);
+    """
+
+    def __init__(self, path=None, clock=time.time, sync_interval=1.0, prune_interval=60, max_keys=100000):
+        self._clock = clock
+        self.sync_interval = sync_interval
+        self.prune_interval = prune_interval
+        self.buckets = MemoryBucketStore(max_keys=max_keys, clock=clock)
+        self._lock = threading.Lock()
+        self._spent = {}
+        self._pid = None
+        self._next_sync = 0
+        self._next_prune = 0
+        super().__init__(path)
+        # Spending logged before this worker started is not charged again
+        self._last_id = self.connection().execute('SELECT COALESCE(MAX(id), 0) FROM rate_spent').fetchone()[0]
+
+    def _worker(self):
+        """Identity of this process in the log, renewed after a fork"""
+        if self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._worker_id = f'{self._pid}-{os.urandom(4).hex()}'
+            self._spent = {}
+        return self._worker_id
+
+    def take(self, key, rate, capacity, cost=1):
+        self.sync()
+        allowed, retry_after = self.buckets.take(key, rate, capacity, cost)
+        if allowed:
+            with self._lock:
+                spent = self._spent.get(key, (0, rate, capacity))[0]
+                self._spent[key] = (spent + cost, rate, capacity)
+        return allowed, retry_after
+
+    def sync(self, force=False):
+        """Publish this worker's spending and charge what the others spent"""
+        worker = self._worker()
+        now = self._clock()
+        with self._lock:
+            if not force and now < self._next_sync:
+                return
+            self._next_sync = now + self.sync_interval
+            spent, self._spent = self._spent, {}
+            last_id = self._last_id
+        conn = self.connection()
+        with conn:
+            conn.executemany(
+                'INSERT INTO rate_spent (key, worker, spent, rate, capacity, created_at) VALUES (?, ?, ?, ?, ?, ?)',
+                [(key, worker, amount, rate, capacity, now) for key, (amount, rate, capacity) in spent.items()]
+            )
+            rows = conn.execute(
+                'SELECT id, key, spent, rate, capacity FROM rate_spent WHERE id > ? AND worker != ? ORDER BY id',
+                (last_id, worker)
+            ).fetchall()
+            if now >= self._next_prune:
+                # Spending this old has been charged by every live worker already
+                self._next_prune = now + self.prune_interval
+                conn.execute('DELETE FROM rate_spent WHERE created_at < ?', (now - self.prune_interval,))
+        for row in rows:
+            self.buckets.charge(row['key'], row['spent'], row['rate'], row['capacity'])
+        if rows:
+            with self._lock:
+                self._last_id = max(self._last_id, rows[-1]['id'])
+
+
+class RateLimiter:
+    """Per-group token-bucket limits on top of a bucket store"""
+
+    def __init__(self, limits, store=None):
+        self.limits = limits
+        self.store = store or MemoryBucketStore()
+        self._lock = threading.Lock()
+        self.allowed = 0
+        self.limited = 0
+
+    def check(self, names, caller):
+        """Charge the first configured limit among `names` to `caller`
+
+        Returns (allowed, retry_after_seconds, limit_name).
+        """
+        for name in names:
+            if name not in self.limits:
+                continue
+            limit = self.limits[name]
+            if limit is None:
+                break
+            count, seconds = limit
+            allowed, retry_after = self.store.take(f'{name}:{caller}', count / seconds, count)
+            with self._lock:
+                if allowed:
+                    self.allowed += 1
+                else:
+                    self.limited += 1
+            return allowed, retry_after, name
+        return True, 0.0, None
+
+    def stats(self):
+        with self._lock:
+            return {'allowed': self.allowed, 'limited': self.limited}
+
+
+class ConcurrencyLimiter:
+    """Caps requests in progress; callers past the cap are turned away"""
+
+    def __init__(self, max_concurrent, wait=0.0):
+        self.max_concurrent = max_concurrent
+        self.wait = wait
+        self._slots = threading.BoundedSemaphore(max_concurrent)
+        self._lock = threading.Lock()
+        self.shed = 0
+
+    def acquire(self):
+        if self.wait > 0:
+            acquired = self._slots.acquire(timeout=self.wait)
+        else:
+            acquired = self._slots.acquire(blocking=False)
+        if acquired:
+            return True
+        with self._lock:
+            self.shed += 1
+        return False
+
+    def release(self):
+        self._slots.release()
+
+    def stats(self):
+        with self._lock:
+            return {'max_concurrent': self.max_concurrent, 'shed': self.shed}
+
+
+def limit_names(endpoint, method):
+    """Limit groups for a request, most specific first"""
+    if endpoint in ('login', 'register'):
+        return [endpoint]
+    if endpoint.endswith('_batch'):
+        return [endpoint, 'batch']
+    return [endpoint, 'read' if method in ('GET', 'HEAD', 'OPTIONS') else 'write']
+
+
+def init_rate_limiting(app, limiter, concurrency=None, identify=None):
+    """Apply the optional `limiter` and `concurrency` cap to every request of `app`
+
+    ``identify`` returns the authenticated user for the request, or None to
+    fall back to the client address.
+    """
+    from flask import g, jsonify, request
+
+    def reject(status, message, retry_after):
+        response = jsonify({'error': message})
+        response.status_code = status
+        response.headers['Retry-After'] = str(max(1, int(retry_after + 0.999)))
+        return response
+
+    @app.before_request
+    def admit_request():
+        endpoint = request.endpoint
+        if endpoint is None or endpoint in EXEMPT_ENDPOINTS or request.method == 'OPTIONS':
+            return None
+
+        user = identify() if identify is not None else None
+        callers = [f'user:{user}' if user else f'ip:{request.remote_addr}']
+        if endpoint == 'login':
+            # Also charge the account, so guesses spread over many IPs still run out
+            body = request.get_json(silent=True)
+            username = body.get('username') if isinstance(body, dict) else None
+            if isinstance(username, str) and username:
+                callers.append(f'user:{username[:MAX_ACCOUNT_KEY]}')
+        if limiter is not None:
+            for caller in callers:
+                allowed, retry_after, name = limiter.check(limit_names(endpoint, request.method), caller)
+                if not allowed:
+                    return reject(429, f'Rate limit exceeded for {name}, retry later', retry_after)
+
+        if concurrency is not None:
+            if not concurrency.acquire():
+                return reject(503, 'Server busy, please retry shortly', 1)
+            g.rate_limit_slot = True
+        return None
+
+    @app.teardown_request
+    def release_slot(exc):
+        if g.pop('rate_limit_slot', False):
+            concurrency.release()
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Production entry point for the JKWI cloud API
+Runs app.py under gunicorn with several worker processes, each serving
+requests on a pool of threads. Shared state (users, local collections,
+versions, change log, revocations, idempotency keys) lives in the SQLite state
+database, so every worker sees the same data. Without gunicorn (for example on
+Windows) it falls back to Werkzeug's threaded server in a single process.
+
+Usage (from information-management-system):
+    python cloud-config/serve.py
+    WEB_CONCURRENCY=4 THREADS=8 python cloud-config/serve.py
+    python cloud-config/serve.py --print-config
+
+Reloading code depends on PRELOAD. Without preload, SIGHUP to the master
+starts new workers on fresh code while old ones finish their requests. With
+preload (the default outside Firebase mode) the app is imported once in the
+master, so HUP would restart workers on the old code; deploy with USR2 (start
+a new master on the new code), then WINCH and QUIT to the old master, or do a
+full restart. --print-config shows which applies.
+"""
+
+import argparse
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+try:
+    from gunicorn.app.base import BaseApplication
+    GUNICORN_AVAILABLE = True
+except ImportError:
+    GUNICORN_AVAILABLE = False
+
+
+def env_flag(name, default):
+    value = os.getenv(name)
+    if value is None or value.lower() == 'auto':
+        return default
+    return value.lower() in ('1', 'true', 'yes')
+
+
+def server_options():
+    """gunicorn settings from the environment"""
+    cpus = os.cpu_count() or 1
+    workers = int(os.getenv('WEB_CONCURRENCY', min(cpus, 8)))
+    return {
+        'bind': f"{os.getenv('HOST', '0.0.0.0')}:{os.getenv('PORT', 5000)}",
+        'workers': workers,
+        # Threads suit this app: request time is mostly Firestore and SQLite I/O,
+        # and password hashing already runs in its own process pool
+        'worker_class': 'gthread',
+        'threads': int(os.getenv('THREADS', 8)),
+        # Loading the app once before forking saves memory and startup time.
+        # gRPC (Firestore) is not fork-safe, so cloud mode loads it per worker.
+        'preload_app': env_flag('PRELOAD', not os.getenv('FIREBASE_SERVICE_ACCOUNT_PATH')),
+        'timeout': int(os.getenv('TIMEOUT', 30)),
+        'graceful_timeout': int(os.getenv('GRACEFUL_TIMEOUT', 30)),
+        'keepalive': int(os.getenv('KEEPALIVE', 5)),
+        # Recycle workers after this many requests (0 disables)
+        'max_requests': int(os.getenv('MAX_REQUESTS', 0)),
+        'max_requests_jitter': int(os.getenv('MAX_REQUESTS_JITTER', 0)),
+        'accesslog': '-' if env_flag('ACCESS_LOG', False) else None,
+        'errorlog': '-'
+    }
+
+
+def apply_worker_defaults(options):
+    """Settings that only make sense once there is more than one worker"""
+    workers = options['workers']
+    cpus = os.cpu_count() or 1
+    # Keep the hashing pools of all workers together at about one process per core
+    os.environ.setdefault('HASH_WORKERS', str(max(1, cpus // workers)))
+    # Event streams hold a thread each; keep at least half the threads for requests
+    os.environ.setdefault('EVENTS_MAX_SUBSCRIBERS', str(max(1, options['threads'] // 2)))
+    if workers > 1:
+        # One rate-limit budget for the host, live events and metrics from every worker
+        os.environ.setdefault('RATE_LIMIT_STORE', 'sqlite')
+        os.environ.setdefault('EVENTS_BROADCAST', 'true')
+        os.environ.setdefault('METRICS_SHARED', 'true')
+
+
+if GUNICORN_AVAILABLE:
+    class JKWIApplication(BaseApplication):
+        """Embedded gunicorn application for app.py"""
+
+        def __init__(self, options):
+            self.options = options
+            super().__init__()
+
+        def load_config(self):
+            for key, value in self.options.items():
+                if value is not None:
+                    self.cfg.set(key, value)
+
+        def load(self):
+            from app import app
+            return app
+
+
+def reload_path(options):
+    """How to pick up new code with these settings"""
+    if not GUNICORN_AVAILABLE:
+        return 'restart the process (Werkzeug fallback)'
+    if options['preload_app']:
+        return 'preload on: kill -USR2 <master>, then -WINCH and -QUIT the old master (HUP keeps old code)'
+    return 'kill -HUP <master> (workers restart on fresh code)'
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve the JKWI cloud API')
+    parser.add_argument('--print-config', action='store_true', help='Show the server settings and exit')
+    args = parser.parse_args()
+
+    options = server_options()
+    apply_worker_defaults(options)
+    if args.print_config:
+        for key, value in options.items():
+            print(f'{key} = {value}')
+        print(f"gunicorn = {'available' if GUNICORN_AVAILABLE else 'not installed'}")
+        print(f'code reload = {reload_path(options)}')
+        return
+
+    if GUNICORN_AVAILABLE:
+        JKWIApplication(options).run()
+        return
+
+    print("⚠️ gunicorn not installed, using the single-process Werkzeug server")
+    from app import app
+    host, port = options['bind'].rsplit(':', 1)
+    app.run(host=host, port=int(port), threaded=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,169 @@
+"""
+Bulk SQL output for demo data and load-test fixtures
+SQLBulkWriter streams rows to a file as multi-row INSERT statements, or for
+PostgreSQL as COPY ... FROM stdin data, inside one transaction so the script
+loads at bulk-import speed with `sqlite3 db < file.sql` or `psql -f file.sql`.
+Values are escaped for the chosen dialect, and only one batch of rows is held
+in memory at a time.
+"""
+
+import ast
+import json
+import math
+import os
+from datetime import date, datetime
+from pathlib import Path
+
+DIALECTS = ('sqlite', 'postgresql')
+# Rows per INSERT statement; large enough to amortise parsing, small enough
+# to stay within SQLite's default statement limits
+DEFAULT_BATCH_ROWS = 500
+SETTINGS_PATH = Path(__file__).resolve().parent.parent / 'src' / 'config' / 'settings.py'
+
+
+def dialect_from_url(database_url):
+    """'sqlite' or 'postgresql' for a DATABASE_URL like the one in src/config/settings.py"""
+    scheme = database_url.split(':', 1)[0].split('+', 1)[0].lower()
+    if scheme == 'sqlite':
+        return 'sqlite'
+    if scheme in ('postgres', 'postgresql'):
+        return 'postgresql'
+    raise ValueError(f'Unsupported database URL: {database_url}')
+
+
+def configured_database_url(settings_path=SETTINGS_PATH):
+    """DATABASE_URL from the environment, else from src/config/settings.py, else None"""
+    if os.getenv('DATABASE_URL'):
+        return os.getenv('DATABASE_URL')
+    try:
+        # Parsed rather than imported, so the settings module is never executed
+        tree = ast.parse(Path(settings_path).read_text(encoding='utf-8'))
+    except (OSError, SyntaxError):
+        return None
+    for node in tree.body:
+        if (isinstance(node, ast.Assign) and isinstance(node.value, ast.Constant)
+                and any(isinstance(target, ast.Name) and target.id == 'DATABASE_URL' for target in node.targets)):
+            return node.value.value
+    return None
+
+
+class SQLBulkWriter:
+    """Writes tables of rows to an SQL script for SQLite or PostgreSQL"""
+
+    def __init__(self, f, dialect='postgresql', batch_rows=DEFAULT_BATCH_ROWS, copy=False):
+        if dialect not in DIALECTS:
+            raise ValueError(f'Unknown SQL dialect: {dialect}')
+        if copy and dialect != 'postgresql':
+            raise ValueError('COPY output is only supported for postgresql')
+        self.f = f
+        self.dialect = dialect
+        self.batch_rows = batch_rows
+        self.copy = copy
+        self.rows_written = 0
+        self._table = None
+        self._columns = None
+        self._pending = []
+
+    def literal(self, value):
+        """A value as an SQL literal for this dialect"""
+        if value is None:
+            return 'NULL'
+        if isinstance(value, bool):
+            if self.dialect == 'sqlite':
+                return '1' if value else '0'
+            return 'TRUE' if value else 'FALSE'
+        if isinstance(value, int):
+            return str(value)
+        if isinstance(value, float):
+            return repr(value) if math.isfinite(value) else 'NULL'
+        if isinstance(value, (datetime, date)):
+            value = value.isoformat()
+        elif not isinstance(value, str):
+            value = json.dumps(value, ensure_ascii=False)
+        # PostgreSQL text cannot hold NUL, and with standard_conforming_strings
+        # (the default) only quotes need escaping
+        return "'" + value.replace('\x00', '').replace("'", "''") + "'"
+
+    @staticmethod
+    def copy_value(value):
+        """A value in PostgreSQL's COPY text format"""
+        if value is None:
+            return '\\N'
+        if isinstance(value, bool):
+            return 't' if value else 'f'
+        if isinstance(value, float) and not math.isfinite(value):
+            return '\\N'
+        if isinstance(value, (int, float)):
+            return str(value)
+        if isinstance(value, (datetime, date)):
+            value = value.isoformat()
+        elif not isinstance(value, str):
+            value = json.dumps(value, ensure_ascii=False)
+        return (value.replace('\x00', '').replace('\\', '\\\\').replace('\t', '\\t')
+                .replace('\n', '\\n').replace('\r', '\\r'))
+
+    def comment(self, text):
+        for line in str(text).splitlines() or ['']:
+            self.f.write(f'-- {line}\n')
+
+    def begin(self):
+        self.f.write('BEGIN;\n')
+
+    def commit(self):
+        self.end_table()
+        self.f.write('COMMIT;\n')
+
+    def create_table(self, table, columns):
+        """CREATE TABLE IF NOT EXISTS from (name, type) pairs"""
+        definitions = ',\n    '.join(f'{name} {column_type}' for name, column_type in columns)
+        self.f.write(f'CREATE TABLE IF NOT EXISTS {table} (\n    {definitions}\n);\n')
+
+    def start_table(self, table, columns):
+        """Rows written from now on go into `table`"""
+        self.end_table()
+        self._table = table
+        self._columns = list(columns)
+        if self.copy:
+            self.f.write(f"COPY {table} ({', '.join(self._columns)}) FROM stdin;\n")
+
+    def write_row(self, values):
+        if self._table is None:
+            raise RuntimeError('start_table() must be called before writing rows')
+        values = list(values)
+        if len(values) != len(self._columns):
+            raise ValueError(f'Expected {len(self._columns)} values for {self._table}, got {len(values)}')
+        self.rows_written += 1
+        if self.copy:
+            self.f.write('\t'.join(self.copy_value(value) for value in values) + '\n')
+            return
+        self._pending.append('(' + ', '.join(self.literal(value) for value in values) + ')')
+        if len(self._pending) >= self.batch_rows:
+            self.flush()
+
+    def write_rows(self, rows):
+        for values in rows:
+            self.write_row(values)
+
+    def flush(self):
+        """Write the pending rows as one INSERT statement"""
+        if not self._pending:
+            return
+        self.f.write(f"INSERT INTO {self._table} ({', '.join(self._columns)}) VALUES\n")
+        self.f.write(',\n'.join(self._pending))
+        self.f.write(';\n')
+        self._pending = []
+
+    def end_table(self):
+        if self._table is None:
+            return
+        if self.copy:
+            self.f.write('\\.\n')
+        else:
+            self.flush()
+        self._table = None
+        self._columns = None
+
+    def write_table(self, table, columns, rows):
+        self.start_table(table, columns)
+        self.write_rows(rows)
+        self.end_table()
@@ -0,0 +1,54 @@
+"""
+Shared local state for the JKWI cloud API
+A single SQLite file (STATE_DB_PATH) holds state that must survive restarts
+and be visible to every worker process on the host, such as user accounts.
+Without STATE_DB_PATH it lives in the instance/ folder during development;
+production (FLASK_ENV=production) refuses to start until the path is set.
+Connections are opened per thread and per process, so stores are safe to use
+from request threads and after a pre-forking server forks its workers.
+"""
+
+import os
+import sqlite3
+import threading
+from pathlib import Path
+
+# Flask-style instance folder for files written at runtime
+INSTANCE_DIR = Path(__file__).parent / 'instance'
+DEFAULT_STATE_DB_PATH = INSTANCE_DIR / 'jkwi_state.db'
+
+
+def state_db_path():
+    """Location of the shared state database"""
+    path = os.getenv('STATE_DB_PATH')
+    if path:
+        return path
+    if os.getenv('FLASK_ENV') == 'production':
+        raise RuntimeError('STATE_DB_PATH must point to persistent storage when FLASK_ENV=production')
+    INSTANCE_DIR.mkdir(exist_ok=True)
+    return str(DEFAULT_STATE_DB_PATH)
+
+
+class SQLiteStore:
+    """Base class for stores kept in the shared SQLite state database"""
+
+    schema = ''
+
+    def __init__(self, path=None):
+        self.path = path or state_db_path()
+        self._local = threading.local()
+        with self.connection() as conn:
+            conn.executescript(self.schema)
+
+    def connection(self):
+        """Connection for the calling thread, reopened after a fork"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.row_factory = sqlite3.Row
+            # WAL lets readers in other workers proceed while one worker writes
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
@@ -3,6 +3,83 @@ Enhanced web client for cloud-ready JKWI Information Management System
 This replaces the existing JavaScript-only frontend with a more robust, cloud-integrated solution
 */
 
+function idbRequest(request) {
+    return new Promise((resolve, reject) => {
+        request.onsuccess = () => resolve(request.result);
+        request.onerror = () => reject(request.error);
+    });
+}
+
+class SyncStore {
+    // Local copy of the collections kept current through /api/sync. IndexedDB
+    // holds far more than localStorage's few megabytes and is read one
+    // collection at a time instead of parsing everything on startup.
+    constructor(name = 'jkwi_sync') {
+        this.name = name;
+        this.db = null;
+    }
+
+    open() {
+        if (!this.db) {
+            const request = indexedDB.open(this.name, 1);
+            request.onupgradeneeded = () => {
+                request.result.createObjectStore('documents', { keyPath: ['collection', 'id'] });
+                request.result.createObjectStore('meta');
+            };
+            this.db = idbRequest(request);
+        }
+        return this.db;
+    }
+
+    async write(fn) {
+        const db = await this.open();
+        return new Promise((resolve, reject) => {
+            const tx = db.transaction(['documents', 'meta'], 'readwrite');
+            fn(tx.objectStore('documents'), tx.objectStore('meta'));
+            tx.oncomplete = () => resolve();
+            tx.onerror = () => reject(tx.error);
+            tx.onabort = () => reject(tx.error);
+        });
+    }
+
+    async getCursor() {
+        const db = await this.open();
+        return idbRequest(db.transaction('meta').objectStore('meta').get('cursor'));
+    }
+
+    applyPage(page) {
+        // One transaction per page, so the cursor never runs ahead of the documents
+        return this.write((documents, meta) => {
+            if (page.reset) {
+                documents.clear();
+            }
+            for (const change of page.changes) {
+                if (change.op === 'delete') {
+                    documents.delete([change.collection, change.id]);
+                } else {
+                    documents.put({ collection: change.collection, id: change.id, data: change.data });
+                }
+            }
+            meta.put(page.cursor, 'cursor');
+        });
+    }
+
+    async getCollection(name) {
+        const db = await this.open();
+        // Arrays sort after strings, so [name, []] bounds every [name, id] key
+        const range = IDBKeyRange.bound([name], [name, []]);
+        const records = await idbRequest(db.transaction('documents').objectStore('documents').getAll(range));
+        return records.map(record => ({ ...record.data, id: record.id }));
+    }
+
+    clear() {
+        return this.write((documents, meta) => {
+            documents.clear();
+            meta.clear();
+        });
+    }
+}
+
 class CloudJKWIApp {
     constructor() {
         this.apiBaseUrl = this.getApiBaseUrl();
@@ -10,6 +87,9 @@ class CloudJKWIApp {
         this.currentUser = JSON.parse(localStorage.getItem('jkwi_current_user') || '{}');
         this.isOnline = navigator.onLine;
         this.offlineQueue = JSON.parse(localStorage.getItem('jkwi_offline_queue') || '[]');
+        this.syncStore = window.indexedDB ? new SyncStore() : null;
+        // Earlier versions kept the synced copy here, where it could fill the quota
+        localStorage.removeItem('jkwi_sync_state');
         
         this.init();
         this.setupNetworkListeners();
@@ -56,14 +136,74 @@ class CloudJKWIApp {
     }
 
     setupAutoSync() {
-        // Sync data every 30 seconds when online
+        // Live updates over server-sent events; polling is the fallback when the
+        // server has no stream to spare (503) or the browser lacks EventSource
+        this.connectEvents();
         setInterval(() => {
-            if (this.isOnline && this.authToken) {
+            if (this.isOnline && this.authToken && !this.eventsConnected()) {
+                this.connectEvents();
                 this.syncData();
             }
         }, 30000);
     }
 
+    eventsConnected() {
+        return this.eventSource && this.eventSource.readyState !== EventSource.CLOSED;
+    }
+
+    async connectEvents() {
+        if (!window.EventSource || !this.isOnline || !this.authToken || this.eventsConnected() || this.connectingEvents) {
+            return;
+        }
+        // EventSource cannot send an Authorization header, so the URL carries a
+        // short-lived token that only opens the stream instead of the login token
+        this.connectingEvents = true;
+        let streamToken;
+        try {
+            streamToken = (await this.apiCall('/events/token', 'POST')).token;
+        } catch (error) {
+            return;
+        } finally {
+            this.connectingEvents = false;
+        }
+        if (!streamToken || this.eventsConnected()) {
+            return;
+        }
+        this.eventSource = new EventSource(`${this.apiBaseUrl}/events?jwt=${encodeURIComponent(streamToken)}`);
+        
+        this.eventSource.addEventListener('stats', (event) => {
+            this.renderStats(JSON.parse(event.data));
+        });
+        this.eventSource.addEventListener('change', (event) => {
+            // Sections render from the synced copy, so one delta pull is all a change costs
+            if (JSON.parse(event.data).collection === this.currentSection) {
+                this.loadSectionData(this.currentSection);
+            } else {
+                this.pullChanges().catch(error => console.error('Sync failed:', error));
+            }
+        });
+        this.eventSource.addEventListener('resync', () => this.syncData());
+        // The server ends each stream after a while; reconnect with a fresh token
+        this.eventSource.addEventListener('reconnect', () => {
+            this.disconnectEvents();
+            this.connectEvents();
+        });
+        this.eventSource.addEventListener('error', () => {
+            // A refused stream (503, expired token) is not retried by the browser;
+            // the auto-sync timer polls until a stream can be opened again
+            if (this.eventSource && this.eventSource.readyState === EventSource.CLOSED) {
+                this.eventSource = null;
+            }
+        });
+    }
+
+    disconnectEvents() {
+        if (this.eventSource) {
+            this.eventSource.close();
+            this.eventSource = null;
+        }
+    }
+
     async validateToken() {
         try {
             const response = await this.apiCall('/health', 'GET');
@@ -296,6 +436,10 @@ class CloudJKWIApp {
         this.currentUser = {};
         localStorage.removeItem('jkwi_auth_token');
         localStorage.removeItem('jkwi_current_user');
+        this.disconnectEvents();
+        if (this.syncStore) {
+            this.syncStore.clear().catch(error => console.error('Failed to clear synced data:', error));
+        }
         this.showLoginForm();
     }
 
@@ -432,6 +576,7 @@ class CloudJKWIApp {
         this.setupEventListeners();
         this.loadDashboard();
         this.showNetworkStatus();
+        this.connectEvents();
     }
 
     setupEventListeners() {
@@ -460,6 +605,7 @@ class CloudJKWIApp {
         document.querySelector(`[data-section="${sectionName}"]`).classList.add('active');
 
         // Load section data
+        this.currentSection = sectionName;
         this.loadSectionData(sectionName);
     }
 
@@ -492,35 +638,42 @@ class CloudJKWIApp {
 
     async loadDashboard() {
         try {
-            const stats = await this.apiCall('/stats');
-            document.getElementById('statsGrid').innerHTML = `
-                <div class="stat-card">
-                    <h3>Total Members</h3>
-                    <span class="stat-number">${stats.totalMembers}</span>
-                </div>
-                <div class="stat-card">
-                    <h3>Active Divisions</h3>
-                    <span class="stat-number">${stats.totalDivisions}</span>
-                </div>
-                <div class="stat-card">
-                    <h3>Directors</h3>
-                    <span class="stat-number">${stats.totalDirectors}</span>
-                </div>
-                <div class="stat-card">
-                    <h3>System Status</h3>
-                    <span class="stat-number status-active">${stats.systemStatus}</span>
-                </div>
-            `;
-            
-            document.getElementById('lastSyncTime').textContent = new Date().toLocaleString();
+            this.renderStats(await this.apiCall('/stats'));
         } catch (error) {
             console.error('Failed to load dashboard:', error);
         }
     }
 
+    renderStats(stats) {
+        const statsGrid = document.getElementById('statsGrid');
+        if (!statsGrid) {
+            return;
+        }
+        statsGrid.innerHTML = `
+            <div class="stat-card">
+                <h3>Total Members</h3>
+                <span class="stat-number">${stats.totalMembers}</span>
+            </div>
+            <div class="stat-card">
+                <h3>Active Divisions</h3>
+                <span class="stat-number">${stats.totalDivisions}</span>
+            </div>
+            <div class="stat-card">
+                <h3>Directors</h3>
+                <span class="stat-number">${stats.totalDirectors}</span>
+            </div>
+            <div class="stat-card">
+                <h3>System Status</h3>
+                <span class="stat-number status-active">${stats.systemStatus}</span>
+            </div>
+        `;
+        
+        document.getElementById('lastSyncTime').textContent = new Date().toLocaleString();
+    }
+
     async loadMembers() {
         try {
-            const members = await this.apiCall('/members');
+            const members = await this.getCollectionData('members');
             const tbody = document.querySelector('#membersTable tbody');
             tbody.innerHTML = members.map(member => `
                 <tr>
@@ -543,7 +696,7 @@ class CloudJKWIApp {
 
     async loadCompany() {
         try {
-            const company = await this.apiCall('/company');
+            const company = (await this.getCollectionData('company'))[0] || await this.apiCall('/company');
             document.getElementById('companyForm').innerHTML = `
                 <div class="form-group">
                     <label for="companyName">Company Name:</label>
@@ -587,7 +740,7 @@ class CloudJKWIApp {
 
     async loadDirectors() {
         try {
-            const directors = await this.apiCall('/directors');
+            const directors = await this.getCollectionData('directors');
             const tbody = document.querySelector('#directorsTable tbody');
             tbody.innerHTML = directors.map(director => `
                 <tr>
@@ -609,7 +762,7 @@ class CloudJKWIApp {
 
     async loadDivisions() {
         try {
-            const divisions = await this.apiCall('/divisions');
+            const divisions = await this.getCollectionData('divisions');
             const grid = document.getElementById('divisionsGrid');
             grid.innerHTML = divisions.map(division => `
                 <div class="division-card">
@@ -629,7 +782,7 @@ class CloudJKWIApp {
 
     async loadPartnerships() {
         try {
-            const partnerships = await this.apiCall('/partnerships') || [];
+            const partnerships = await this.getCollectionData('partnerships') || [];
             const grid = document.getElementById('partnershipsGrid');
             grid.innerHTML = partnerships.map(partnership => `
                 <div class="partnership-card">
@@ -929,8 +1082,59 @@ class CloudJKWIApp {
         this.showNotification('Backup history feature coming soon!', 'info');
     }
 
+    pullChanges() {
+        // One pull at a time, so two pages never race to move the cursor
+        const pull = (this.pulling || Promise.resolve()).catch(() => {}).then(() => this.fetchChanges());
+        this.pulling = pull;
+        return pull;
+    }
+
+    async fetchChanges() {
+        // Fetch only what changed since the stored cursor and apply it to the local copy;
+        // returns the names of the collections that changed
+        const changed = new Set();
+        if (!this.syncStore) {
+            return changed;
+        }
+        let cursor = await this.syncStore.getCursor();
+        let hasMore = true;
+        while (hasMore) {
+            const since = cursor ? `?since=${encodeURIComponent(cursor)}` : '';
+            const result = await this.apiCall(`/sync${since}`);
+            await this.syncStore.applyPage(result);
+            if (result.reset && this.currentSection) {
+                // A snapshot may also have emptied the collection on screen
+                changed.add(this.currentSection);
+            }
+            result.changes.forEach(change => changed.add(change.collection));
+            cursor = result.cursor;
+            hasMore = result.has_more;
+        }
+        return changed;
+    }
+
+    async getCollectionData(name) {
+        // Without IndexedDB every view fetches its collection in full
+        if (!this.syncStore) {
+            return this.apiCall(`/${name}`);
+        }
+        try {
+            await this.pullChanges();
+        } catch (error) {
+            // Offline or unreachable: show the last synced copy
+            console.error('Sync failed:', error);
+        }
+        return this.syncStore.getCollection(name);
+    }
+
     async syncData() {
         try {
+            if (this.syncStore) {
+                const changed = await this.pullChanges();
+                if (changed.has(this.currentSection)) {
+                    await this.loadSectionData(this.currentSection);
+                }
+            }
             await this.loadSectionData('dashboard');
             document.getElementById('lastSyncTime').textContent = new Date().toLocaleString();
         } catch (error) {
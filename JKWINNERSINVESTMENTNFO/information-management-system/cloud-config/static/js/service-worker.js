@@ -1,7 +1,7 @@
 // Service Worker for offline functionality and PWA support
-const CACHE_NAME = 'jkwi-v1.0.0';
-const STATIC_CACHE = 'jkwi-static-v1.0.0';
-const DYNAMIC_CACHE = 'jkwi-dynamic-v1.0.0';
+const CACHE_NAME = 'jkwi-v1.1.0';
+const STATIC_CACHE = 'jkwi-static-v1.1.0';
+const DYNAMIC_CACHE = 'jkwi-dynamic-v1.1.0';
 
 // Files to cache for offline access
 const STATIC_FILES = [
@@ -17,6 +17,8 @@ const API_CACHE_PATTERNS = [
     /\/api\/stats/,
     /\/api\/company/,
     /\/api\/divisions/,
+    /\/api\/members/,
+    /\/api\/partnerships/,
     /\/api\/health/
 ];
 
@@ -98,14 +100,22 @@ self.addEventListener('fetch', event => {
 // Handle API requests with network-first strategy
 async function handleAPIRequest(request) {
     const url = new URL(request.url);
+    const cacheable = shouldCacheAPI(url.pathname);
     
     try {
-        // Try network first
-        const networkResponse = await fetch(request);
+        const cache = await caches.open(DYNAMIC_CACHE);
+        const cachedResponse = cacheable ? await cache.match(request) : undefined;
+        const etag = cachedResponse && cachedResponse.headers.get('ETag');
+        
+        // Revalidate with the stored ETag so unchanged data comes back as an empty 304
+        const networkResponse = await fetch(etag ? withHeader(request, 'If-None-Match', etag) : request);
+        
+        if (networkResponse.status === 304 && cachedResponse) {
+            return cachedResponse;
+        }
         
         // Cache successful API responses
-        if (networkResponse.ok && shouldCacheAPI(url.pathname)) {
-            const cache = await caches.open(DYNAMIC_CACHE);
+        if (networkResponse.ok && cacheable) {
             cache.put(request, networkResponse.clone());
         }
         
@@ -190,6 +200,13 @@ async function handleOtherRequest(request) {
     }
 }
 
+// Copy a request with one extra header
+function withHeader(request, name, value) {
+    const headers = new Headers(request.headers);
+    headers.set(name, value);
+    return new Request(request, { headers });
+}
+
 // Check if API endpoint should be cached
 function shouldCacheAPI(pathname) {
     return API_CACHE_PATTERNS.some(pattern => pattern.test(pathname));
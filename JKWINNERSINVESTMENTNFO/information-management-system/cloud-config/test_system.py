@@ -1,20 +1,44 @@
 #!/usr/bin/env python3
 """
 Simple test script to verify the JKWI cloud system is working correctly
-Run this after setting up the cloud system to ensure everything is functioning
+Run this after setting up the cloud system to ensure everything is functioning.
+With --load it also drives a mix of requests from concurrent virtual users at
+a target rate and reports latency percentiles, error rates and throughput per
+endpoint, optionally compared against an earlier report.
 """
 
+import argparse
 import requests
 import json
+import random
+import threading
 import time
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from latency_stats import percentile
+
+# Relative weights of the operations virtual users perform. Every virtual user
+# has its own account, so per-user rate limits apply to each one separately.
+DEFAULT_MIX = {
+    'login': 1,
+    'list_members': 5,
+    'stats': 2,
+    'create_member': 2,
+    'update_member': 1,
+    'delete_member': 1
+}
 
 class JKWITestSuite:
     def __init__(self, base_url="http://localhost:5000"):
         self.base_url = base_url
         self.auth_token = None
         self.test_results = []
+        self.load_results = None
     
     def log_test(self, test_name, passed, message=""):
         """Log test results"""
@@ -48,10 +72,12 @@ class JKWITestSuite:
     def test_user_registration(self):
         """Test user registration"""
         try:
+            username = f"test_user_{int(time.time())}"
             test_user = {
-                "username": f"test_user_{int(time.time())}",
+                "username": username,
                 "password": "test_password_123",
-                "email": "test@jkwi.com",
+                # Emails must be unique, so repeated runs need their own
+                "email": f"{username}@jkwi.com",
                 "division": "Finance Division"
             }
             
@@ -321,27 +347,300 @@ class JKWITestSuite:
             },
             'results': self.test_results
         }
+        if self.load_results is not None:
+            report['load_test'] = self.load_results
         
         with open(filename, 'w') as f:
             json.dump(report, f, indent=2)
         
         print(f"📄 Test report saved to: {filename}")
 
+class EndpointStats:
+    """Latencies and outcomes of the requests to one endpoint"""
+    
+    def __init__(self):
+        self.latencies = []
+        self.errors = 0
+        self.throttled = 0
+        self.statuses = {}
+    
+    def record(self, latency, status):
+        self.latencies.append(latency)
+        self.statuses[status] = self.statuses.get(status, 0) + 1
+        if status == 429:
+            # Rejected by the rate limiter, which measures the limits rather than the server
+            self.throttled += 1
+        elif not (isinstance(status, int) and status < 400):
+            self.errors += 1
+    
+    def merge(self, other):
+        self.latencies.extend(other.latencies)
+        self.errors += other.errors
+        self.throttled += other.throttled
+        for status, count in other.statuses.items():
+            self.statuses[status] = self.statuses.get(status, 0) + count
+    
+    def summary(self, elapsed):
+        count = len(self.latencies)
+        return {
+            'requests': count,
+            'errors': self.errors,
+            'error_rate': round(self.errors / count, 4) if count else 0.0,
+            'throttled': self.throttled,
+            'throttled_rate': round(self.throttled / count, 4) if count else 0.0,
+            'throughput_rps': round(count / elapsed, 2) if elapsed else 0.0,
+            'mean_ms': round(sum(self.latencies) / count * 1000, 2) if count else 0.0,
+            'p50_ms': round(percentile(self.latencies, 50) * 1000, 2),
+            'p90_ms': round(percentile(self.latencies, 90) * 1000, 2),
+            'p95_ms': round(percentile(self.latencies, 95) * 1000, 2),
+            'p99_ms': round(percentile(self.latencies, 99) * 1000, 2),
+            'max_ms': round(max(self.latencies, default=0) * 1000, 2),
+            'statuses': {str(status): count for status, count in sorted(self.statuses.items(), key=str)}
+        }
+
+class JKWILoadTest:
+    """Concurrent virtual users sending a weighted mix of requests at a target rate
+    
+    With a target rate, request start times follow a fixed schedule shared by
+    all users, and latency is measured from the scheduled time, so a server
+    that falls behind shows up as latency instead of as a lower request rate.
+    """
+    
+    def __init__(self, suite, users=10, rate=None, duration=30, mix=None, report_interval=10, timeout=10):
+        self.suite = suite
+        self.base_url = suite.base_url
+        self.users = users
+        self.rate = rate
+        self.duration = duration
+        self.mix = mix or DEFAULT_MIX
+        self.report_interval = report_interval
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._next_slot = 0
+        self.endpoints = {}
+        self.intervals = []
+    
+    def register_users(self):
+        """Register one account per virtual user: [{'username', 'password', ..., 'token'}]"""
+        run_id = int(time.time())
+        
+        def register(index):
+            username = f"load_user_{run_id}_{index}"
+            account = {
+                "username": username,
+                "password": "load_password_123",
+                "email": f"{username}@jkwi.com",
+                "division": "Finance Division"
+            }
+            for _ in range(30):
+                response = requests.post(f"{self.base_url}/api/register", json=account, timeout=self.timeout)
+                if response.status_code != 429:
+                    break
+                # Registrations are rate limited per address when limits are on
+                time.sleep(float(response.headers.get('Retry-After', 1)))
+            if response.status_code != 201:
+                raise RuntimeError(f"Registering {username} failed with status {response.status_code}")
+            return {**account, 'token': response.json()['access_token']}
+        
+        with ThreadPoolExecutor(max_workers=min(self.users, 8)) as pool:
+            return list(pool.map(register, range(self.users)))
+    
+    def next_start(self, started):
+        """Scheduled start of this user's next request, or None once the test is over"""
+        with self._lock:
+            slot = self._next_slot
+            self._next_slot += 1
+        scheduled = started + slot / self.rate if self.rate else time.perf_counter()
+        return scheduled if scheduled < started + self.duration else None
+    
+    def perform(self, session, operation, member_ids, account):
+        """Send one operation as `account`: (endpoint label, status code)"""
+        url = f"{self.base_url}/api"
+        if operation in ('update_member', 'delete_member') and not member_ids:
+            operation = 'create_member'
+        if operation == 'login':
+            credentials = {key: account[key] for key in ('username', 'password')}
+            return 'POST /api/login', session.post(f"{url}/login", json=credentials, timeout=self.timeout).status_code
+        if operation == 'list_members':
+            return 'GET /api/members', session.get(f"{url}/members?limit=50", timeout=self.timeout).status_code
+        if operation == 'stats':
+            return 'GET /api/stats', session.get(f"{url}/stats", timeout=self.timeout).status_code
+        if operation == 'create_member':
+            member = {"fullName": "Load Test Member", "email": "load@jkwi.com", "division": "Mining Division",
+                      "status": "Active"}
+            response = session.post(f"{url}/members", json=member, timeout=self.timeout)
+            if response.status_code == 201:
+                member_ids.append(response.json().get('data', {}).get('id'))
+            return 'POST /api/members', response.status_code
+        member_id = random.choice(member_ids)
+        if operation == 'update_member':
+            response = session.put(f"{url}/members/{member_id}", json={"status": "Pending"}, timeout=self.timeout)
+            return 'PUT /api/members/<id>', response.status_code
+        member_ids.remove(member_id)
+        return 'DELETE /api/members/<id>', session.delete(f"{url}/members/{member_id}", timeout=self.timeout).status_code
+    
+    def virtual_user(self, started, results, account):
+        session = requests.Session()
+        session.headers.update({'Authorization': f"Bearer {account['token']}",
+                                'Content-Type': 'application/json'})
+        operations, weights = zip(*self.mix.items())
+        rng = random.Random()
+        member_ids = []
+        stats = {}
+        while True:
+            scheduled = self.next_start(started)
+            if scheduled is None:
+                break
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            operation = rng.choices(operations, weights)[0]
+            try:
+                endpoint, status = self.perform(session, operation, member_ids, account)
+            except requests.RequestException as e:
+                endpoint, status = operation, type(e).__name__
+            stats.setdefault(endpoint, EndpointStats()).record(time.perf_counter() - scheduled, status)
+        results.append(stats)
+    
+    def run(self, accounts):
+        """Run the load test with one of `accounts` per virtual user and summarise it"""
+        rate = f"{self.rate} req/s" if self.rate else "unthrottled"
+        print(f"\n🔥 Load test: {self.users} virtual users, {rate}, {self.duration}s")
+        results = []
+        started = time.perf_counter()
+        threads = [threading.Thread(target=self.virtual_user, args=(started, results, account), daemon=True)
+                   for account in accounts]
+        for thread in threads:
+            thread.start()
+        while any(thread.is_alive() for thread in threads):
+            for thread in threads:
+                thread.join(timeout=self.report_interval)
+                if thread.is_alive():
+                    break
+            self.record_interval(started)
+        elapsed = time.perf_counter() - started
+        
+        for stats in results:
+            for endpoint, endpoint_stats in stats.items():
+                self.endpoints.setdefault(endpoint, EndpointStats()).merge(endpoint_stats)
+        total = EndpointStats()
+        for endpoint_stats in self.endpoints.values():
+            total.merge(endpoint_stats)
+        return {
+            'config': {'users': self.users, 'rate': self.rate, 'duration': self.duration, 'mix': self.mix},
+            'elapsed_seconds': round(elapsed, 2),
+            'totals': total.summary(elapsed),
+            'endpoints': {endpoint: endpoint_stats.summary(elapsed)
+                          for endpoint, endpoint_stats in sorted(self.endpoints.items())},
+            'intervals': self.intervals
+        }
+    
+    def record_interval(self, started):
+        """Progress line for soak runs: requests sent so far and the current rate"""
+        with self._lock:
+            sent = self._next_slot
+        elapsed = time.perf_counter() - started
+        self.intervals.append({'elapsed_seconds': round(elapsed, 1), 'requests_scheduled': sent})
+        print(f"   ⏱️ {elapsed:.0f}s: {sent} requests scheduled ({sent / max(elapsed, 1e-9):.1f} req/s)")
+
+def parse_mix(text):
+    """'login=1,list_members=5' -> {'login': 1.0, 'list_members': 5.0}"""
+    return {name.strip(): float(weight) for name, weight in (item.split('=') for item in text.split(','))}
+
+def compare_with_baseline(current, baseline, threshold):
+    """Endpoints whose p95 grew, or whose throughput fell, by more than threshold (a fraction)"""
+    regressions = []
+    for endpoint, before in baseline.get('endpoints', {}).items():
+        after = current['endpoints'].get(endpoint)
+        if after is None:
+            continue
+        if before['p95_ms'] and after['p95_ms'] > before['p95_ms'] * (1 + threshold):
+            regressions.append(f"{endpoint}: p95 {before['p95_ms']}ms -> {after['p95_ms']}ms")
+        if before['throughput_rps'] and after['throughput_rps'] < before['throughput_rps'] * (1 - threshold):
+            regressions.append(f"{endpoint}: {before['throughput_rps']} -> {after['throughput_rps']} req/s")
+    return regressions
+
+def run_load_test(suite, args):
+    """Register the virtual users, run the load test, and log per-endpoint results to the suite"""
+    mix = dict(DEFAULT_MIX)
+    if args.mix:
+        mix = parse_mix(args.mix)
+        unknown = set(mix) - set(DEFAULT_MIX)
+        if unknown:
+            print(f"❌ Unknown operations in --mix: {', '.join(sorted(unknown))}")
+            return False
+    
+    baseline = None
+    if args.baseline:
+        # Read before the run, since the baseline may be the report about to be overwritten
+        with open(args.baseline, 'r') as f:
+            baseline = json.load(f).get('load_test')
+    
+    if not suite.test_health_check():
+        return False
+    
+    load_test = JKWILoadTest(suite, users=args.users, rate=args.rate, duration=args.duration, mix=mix,
+                             report_interval=args.report_interval)
+    try:
+        accounts = load_test.register_users()
+    except (requests.RequestException, RuntimeError) as e:
+        suite.log_test("Load: register virtual users", False, str(e))
+        return False
+    suite.log_test("Load: register virtual users", True, f"{len(accounts)} accounts")
+    suite.load_results = results = load_test.run(accounts)
+    
+    print(f"\n{'endpoint':<28} {'reqs':>7} {'req/s':>8} {'err %':>6} {'429 %':>6} {'p50 ms':>8} {'p95 ms':>8} "
+          f"{'p99 ms':>8}")
+    for endpoint, summary in results['endpoints'].items():
+        print(f"{endpoint:<28} {summary['requests']:>7} {summary['throughput_rps']:>8.1f} "
+              f"{summary['error_rate'] * 100:>6.1f} {summary['throttled_rate'] * 100:>6.1f} "
+              f"{summary['p50_ms']:>8.1f} {summary['p95_ms']:>8.1f} {summary['p99_ms']:>8.1f}")
+        passed = summary['error_rate'] <= args.max_error_rate
+        if args.p95_budget is not None:
+            passed = passed and summary['p95_ms'] <= args.p95_budget
+        suite.log_test(f"Load: {endpoint}", passed,
+                       f"{summary['requests']} requests, {summary['error_rate'] * 100:.1f}% errors, "
+                       f"{summary['throttled']} rate limited, p95 {summary['p95_ms']}ms, "
+                       f"{summary['throughput_rps']} req/s")
+    if results['totals']['throttled']:
+        print(f"⚠️ {results['totals']['throttled']} requests were rate limited (429); they are not counted as "
+              f"errors but show the server's limits, not its capacity")
+    
+    if baseline:
+        regressions = compare_with_baseline(results, baseline, args.regression_threshold)
+        suite.log_test("Load: no regressions against baseline", not regressions, '; '.join(regressions))
+    
+    return all(result['passed'] for result in suite.test_results)
+
 def main():
     """Main test function"""
-    # Check command line arguments
-    base_url = "http://localhost:5000"
-    if len(sys.argv) > 1:
-        base_url = sys.argv[1]
+    parser = argparse.ArgumentParser(description='Test a running JKWI cloud system')
+    parser.add_argument('base_url', nargs='?', default='http://localhost:5000')
+    parser.add_argument('--load', action='store_true', help='Run the load test instead of the functional tests')
+    parser.add_argument('--users', type=int, default=10, help='Concurrent virtual users (default 10)')
+    parser.add_argument('--rate', type=float, help='Target requests/sec across all users (default: as fast as possible)')
+    parser.add_argument('--duration', type=float, default=30, help='Seconds to run; use hours for a soak test')
+    parser.add_argument('--mix', help='Operation weights, e.g. login=1,list_members=5,create_member=2')
+    parser.add_argument('--report-interval', type=float, default=10, help='Seconds between progress lines')
+    parser.add_argument('--max-error-rate', type=float, default=0.01, help='Highest passing error rate (default 0.01)')
+    parser.add_argument('--p95-budget', type=float, help='Highest passing p95 latency in ms')
+    parser.add_argument('--baseline', help='Earlier jkwi_test_report.json to check for regressions')
+    parser.add_argument('--regression-threshold', type=float, default=0.2,
+                        help='Allowed p95 increase or throughput drop against the baseline (default 0.2)')
+    parser.add_argument('--report', default='jkwi_test_report.json', help='Where to save the report')
+    args = parser.parse_args()
     
-    print(f"🔗 Testing JKWI system at: {base_url}")
+    print(f"🔗 Testing JKWI system at: {args.base_url}")
     
     # Run tests
-    test_suite = JKWITestSuite(base_url)
-    success = test_suite.run_all_tests()
+    test_suite = JKWITestSuite(args.base_url)
+    if args.load:
+        success = run_load_test(test_suite, args)
+    else:
+        success = test_suite.run_all_tests()
     
     # Save report
-    test_suite.save_test_report()
+    test_suite.save_test_report(args.report)
     
     # Exit with appropriate code
     sys.exit(0 if success else 1)
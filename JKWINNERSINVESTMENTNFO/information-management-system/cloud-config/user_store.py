@@ -0,0 +1,367 @@
+"""
+User repository for the JKWI cloud API
+Accounts live in the shared SQLite state database by default, or in Firestore
+when USER_STORE=firestore and Firebase is configured. Both backends enforce
+unique usernames and emails and count login attempts. CachedUserRepository
+keeps recently used active accounts in memory so logins skip the store; every
+change bumps a counter in the state database so the other workers on the host
+drop their cached accounts within USER_CACHE_SYNC seconds.
+
+Administrators are granted from the command line (SQLite store):
+    python user_store.py grant-admin <username>
+    python user_store.py revoke-admin <username>
+"""
+
+import argparse
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+
+from local_store import CollectionVersions
+from state_store import SQLiteStore
+
+# Counter in CollectionVersions bumped whenever an account changes
+USERS_VERSION_KEY = 'users'
+# Fields returned by the user admin API
+PUBLIC_USER_FIELDS = ('username', 'email', 'division', 'is_active', 'is_admin', 'created_at', 'last_login_at')
+
+
+class DuplicateUserError(ValueError):
+    """Raised when a username or email is already registered"""
+
+    def __init__(self, field):
+        super().__init__(f'{field} already exists')
+        self.field = field
+
+
+def public_user(user):
+    """User fields that are safe to return from the API"""
+    return {key: user.get(key) for key in PUBLIC_USER_FIELDS}
+
+
+class UserRepository:
+    """Interface shared by the user store backends"""
+
+    def create_user(self, user):
+        """Store a new user, raising DuplicateUserError on a clash"""
+        raise NotImplementedError
+
+    def get_user(self, username):
+        """Return the user dict, or None if it does not exist"""
+        raise NotImplementedError
+
+    def update_user(self, username, fields):
+        """Update some fields of a user, returning False if it does not exist"""
+        raise NotImplementedError
+
+    def record_login_attempt(self, username, success):
+        """Count a failed login, or reset the counter after a successful one"""
+        raise NotImplementedError
+
+    def list_users(self, query=None, limit=50, offset=0):
+        """List users ordered by username, optionally filtered by a prefix"""
+        raise NotImplementedError
+
+
+class SQLiteUserRepository(SQLiteStore, UserRepository):
+    """User accounts in the shared SQLite state database"""
+
+    schema = """
+        CREATE TABLE IF NOT EXISTS users (
+            username TEXT PRIMARY KEY,
+            email TEXT UNIQUE COLLATE NOCASE,
+            password_hash TEXT NOT NULL,
+            division TEXT NOT NULL DEFAULT '',
+            created_at TEXT NOT NULL,
+            is_active INTEGER NOT NULL DEFAULT 1,
+            is_admin INTEGER NOT NULL DEFAULT 0,
+            failed_login_attempts INTEGER NOT NULL DEFAULT 0,
+            last_login_at TEXT,
+            last_failed_login_at TEXT
+        );
+        CREATE INDEX IF NOT EXISTS idx_users_division ON users (division);
+    """
+
+    columns = ('email', 'password_hash', 'division', 'is_active', 'is_admin')
+
+    def __init__(self, path=None):
+        super().__init__(path)
+        existing = {row['name'] for row in self.connection().execute('PRAGMA table_info(users)')}
+        if 'is_admin' not in existing:
+            # Databases created before administrators existed
+            with self.connection() as conn:
+                conn.execute('ALTER TABLE users ADD COLUMN is_admin INTEGER NOT NULL DEFAULT 0')
+
+    @staticmethod
+    def _to_user(row):
+        if row is None:
+            return None
+        user = dict(row)
+        user['is_active'] = bool(user['is_active'])
+        user['is_admin'] = bool(user['is_admin'])
+        return user
+
+    def create_user(self, user):
+        try:
+            with self.connection() as conn:
+                conn.execute(
+                    'INSERT INTO users (username, email, password_hash, division, created_at, is_active) '
+                    'VALUES (?, ?, ?, ?, ?, ?)',
+                    (user['username'], user.get('email') or None, user['password_hash'],
+                     user.get('division') or '', user['created_at'], int(user.get('is_active', True)))
+                )
+        except sqlite3.IntegrityError as e:
+            raise DuplicateUserError('email' if 'email' in str(e) else 'username') from e
+
+    def get_user(self, username):
+        row = self.connection().execute(
+            'SELECT * FROM users WHERE username = ?', (username,)
+        ).fetchone()
+        return self._to_user(row)
+
+    def update_user(self, username, fields):
+        fields = {key: value for key, value in fields.items() if key in self.columns}
+        if not fields:
+            return self.get_user(username) is not None
+        for flag in ('is_active', 'is_admin'):
+            if flag in fields:
+                fields[flag] = int(fields[flag])
+        assignments = ', '.join(f'{key} = ?' for key in fields)
+        try:
+            with self.connection() as conn:
+                cursor = conn.execute(
+                    f'UPDATE users SET {assignments} WHERE username = ?',
+                    (*fields.values(), username)
+                )
+        except sqlite3.IntegrityError as e:
+            raise DuplicateUserError('email') from e
+        return cursor.rowcount > 0
+
+    def record_login_attempt(self, username, success):
+        now = datetime.now().isoformat()
+        with self.connection() as conn:
+            if success:
+                conn.execute(
+                    'UPDATE users SET failed_login_attempts = 0, last_login_at = ? WHERE username = ?',
+                    (now, username)
+                )
+            else:
+                conn.execute(
+                    'UPDATE users SET failed_login_attempts = failed_login_attempts + 1, '
+                    'last_failed_login_at = ? WHERE username = ?',
+                    (now, username)
+                )
+
+    def list_users(self, query=None, limit=50, offset=0):
+        if query:
+            pattern = query.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+            rows = self.connection().execute(
+                "SELECT * FROM users WHERE username LIKE ? ESCAPE '\\' OR email LIKE ? ESCAPE '\\' "
+                'ORDER BY username LIMIT ? OFFSET ?',
+                (pattern, pattern, limit, offset)
+            ).fetchall()
+        else:
+            rows = self.connection().execute(
+                'SELECT * FROM users ORDER BY username LIMIT ? OFFSET ?', (limit, offset)
+            ).fetchall()
+        return [self._to_user(row) for row in rows]
+
+
+class FirestoreUserRepository(UserRepository):
+    """User accounts in Firestore, with emails claimed in a companion collection"""
+
+    def __init__(self, firestore_db):
+        from firebase_admin import firestore
+        self._firestore = firestore
+        self.db = firestore_db
+        self.users = firestore_db.collection('users')
+        self.emails = firestore_db.collection('user_emails')
+
+    def create_user(self, user):
+        user_ref = self.users.document(user['username'])
+        email = (user.get('email') or '').lower()
+        email_ref = self.emails.document(email) if email else None
+
+        @self._firestore.transactional
+        def create(transaction):
+            if user_ref.get(transaction=transaction).exists:
+                raise DuplicateUserError('username')
+            if email_ref is not None and email_ref.get(transaction=transaction).exists:
+                raise DuplicateUserError('email')
+            transaction.create(user_ref, {**user, 'failed_login_attempts': 0})
+            if email_ref is not None:
+                transaction.create(email_ref, {'username': user['username']})
+
+        create(self.db.transaction())
+
+    def get_user(self, username):
+        snapshot = self.users.document(username).get()
+        return {'username': username, **snapshot.to_dict()} if snapshot.exists else None
+
+    def update_user(self, username, fields):
+        user = self.get_user(username)
+        if user is None:
+            return False
+        new_email = (fields.get('email') or '').lower()
+        old_email = (user.get('email') or '').lower()
+        if 'email' in fields and new_email != old_email:
+            batch = self.db.batch()
+            if new_email:
+                # create() fails if another account already claimed the email
+                batch.create(self.emails.document(new_email), {'username': username})
+            if old_email:
+                batch.delete(self.emails.document(old_email))
+            batch.update(self.users.document(username), fields)
+            try:
+                batch.commit()
+            except Exception as e:
+                if 'already exists' in str(e).lower():
+                    raise DuplicateUserError('email') from e
+                raise
+        else:
+            self.users.document(username).update(fields)
+        return True
+
+    def record_login_attempt(self, username, success):
+        now = datetime.now().isoformat()
+        if success:
+            fields = {'failed_login_attempts': 0, 'last_login_at': now}
+        else:
+            fields = {'failed_login_attempts': self._firestore.Increment(1), 'last_failed_login_at': now}
+        self.users.document(username).update(fields)
+
+    def list_users(self, query=None, limit=50, offset=0):
+        ref = self.users.order_by('username')
+        if query:
+            ref = ref.start_at([query]).end_at([query + '\uf8ff'])
+        docs = ref.offset(offset).limit(limit).stream()
+        return [{'username': doc.id, **doc.to_dict()} for doc in docs]
+
+
+class CachedUserRepository(UserRepository):
+    """Keeps recently used active accounts in memory in front of another repository"""
+
+    def __init__(self, repository, ttl=60, max_size=1024, versions=None, sync_interval=1.0,
+                 clock=time.monotonic):
+        self.repository = repository
+        self.ttl = ttl
+        self.max_size = max_size
+        self.versions = versions
+        self.sync_interval = sync_interval
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._users = OrderedDict()
+        self._version = None
+        self._next_sync = 0
+        self.hits = 0
+        self.misses = 0
+
+    def sync(self, force=False):
+        """Drop every cached account once another worker has changed a user"""
+        if self.versions is None:
+            return
+        now = self._clock()
+        if not force and now < self._next_sync:
+            return
+        self._next_sync = now + self.sync_interval
+        version = self.versions.get(USERS_VERSION_KEY)
+        if version != self._version:
+            with self._lock:
+                self._users.clear()
+            self._version = version
+
+    def _cached(self, username):
+        self.sync()
+        with self._lock:
+            entry = self._users.get(username)
+            if entry is None or entry[0] <= self._clock():
+                self._users.pop(username, None)
+                self.misses += 1
+                return None
+            self._users.move_to_end(username)
+            self.hits += 1
+            return entry[1]
+
+    def _remember(self, user):
+        if not user or not user.get('is_active', True):
+            return
+        with self._lock:
+            self._users[user['username']] = (self._clock() + self.ttl, user)
+            self._users.move_to_end(user['username'])
+            while len(self._users) > self.max_size:
+                self._users.popitem(last=False)
+
+    def _forget(self, username):
+        with self._lock:
+            self._users.pop(username, None)
+
+    def create_user(self, user):
+        self.repository.create_user(user)
+
+    def get_user(self, username):
+        user = self._cached(username)
+        if user is None:
+            user = self.repository.get_user(username)
+            self._remember(user)
+        return dict(user) if user else None
+
+    def update_user(self, username, fields):
+        try:
+            return self.repository.update_user(username, fields)
+        finally:
+            self._forget(username)
+            if self.versions is not None:
+                self.versions.bump(USERS_VERSION_KEY)
+
+    def record_login_attempt(self, username, success):
+        # Counters are bookkeeping only, so the cached account stays valid
+        self.repository.record_login_attempt(username, success)
+
+    def list_users(self, query=None, limit=50, offset=0):
+        return self.repository.list_users(query, limit, offset)
+
+    def stats(self):
+        """Cache counters for the health endpoint"""
+        with self._lock:
+            return {'cached_users': len(self._users), 'hits': self.hits, 'misses': self.misses}
+
+
+def create_user_repository(firestore_db=None):
+    """Build the repository selected by USER_STORE (sqlite or firestore)"""
+    backend = os.getenv('USER_STORE', 'sqlite').lower()
+    if backend == 'firestore' and firestore_db is not None:
+        repository = FirestoreUserRepository(firestore_db)
+    else:
+        if backend == 'firestore':
+            print("⚠️ USER_STORE=firestore but Firebase is not configured, using SQLite")
+        repository = SQLiteUserRepository()
+    return CachedUserRepository(
+        repository,
+        ttl=float(os.getenv('USER_CACHE_TTL', 60)),
+        max_size=int(os.getenv('USER_CACHE_SIZE', 1024)),
+        versions=CollectionVersions(),
+        sync_interval=float(os.getenv('USER_CACHE_SYNC', 1.0))
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Manage JKWI administrator accounts')
+    parser.add_argument('action', choices=['grant-admin', 'revoke-admin'])
+    parser.add_argument('username')
+    args = parser.parse_args()
+
+    # Through the cache wrapper so running workers see the change
+    repository = create_user_repository()
+    if not repository.update_user(args.username, {'is_admin': args.action == 'grant-admin'}):
+        print(f"❌ User not found: {args.username}")
+        return 1
+    verb = 'is now' if args.action == 'grant-admin' else 'is no longer'
+    print(f"✅ {args.username} {verb} an administrator")
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,249 @@
+import gzip
+import json
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), 'cloud-config'))
+
+PASSWORD = 'Route-Test-Password-1'
+STATE_DIR = tempfile.TemporaryDirectory()
+jkwi_app = None
+
+def setUpModule():
+    """Import the app once, in local mode against a private state database"""
+    global jkwi_app
+    os.environ['STATE_DB_PATH'] = os.path.join(STATE_DIR.name, 'state.db')
+    os.environ['RATE_LIMITING'] = 'false'
+    # A cheap hash on the request thread keeps registrations fast
+    os.environ['PASSWORD_HASH_METHOD'] = 'pbkdf2:sha256:1000'
+    os.environ['HASH_INLINE'] = 'true'
+    os.environ.pop('FIREBASE_SERVICE_ACCOUNT_PATH', None)
+    import app
+    jkwi_app = app
+
+class AppTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.client = jkwi_app.app.test_client()
+
+    def register(self, username, admin=False):
+        """Register a user and return the Authorization header for its token"""
+        response = self.client.post('/api/register', json={
+            'username': username, 'password': PASSWORD, 'email': f'{username}@example.com'
+        })
+        self.assertEqual(response.status_code, 201, response.get_json())
+        if admin:
+            jkwi_app.users.update_user(username, {'is_admin': True})
+        return {'Authorization': f"Bearer {response.get_json()['access_token']}"}
+
+class TestUserAdminRoutes(AppTestCase):
+
+    def test_normal_user_cannot_deactivate_or_activate(self):
+        headers = self.register('plain_user')
+        self.register('plain_target')
+        for action in ('deactivate', 'activate'):
+            response = self.client.post(f'/api/users/plain_target/{action}', headers=headers)
+            self.assertEqual(response.status_code, 403)
+        self.assertTrue(jkwi_app.users.get_user('plain_target')['is_active'])
+
+    def test_admin_can_deactivate_and_activate(self):
+        headers = self.register('admin_user', admin=True)
+        self.register('admin_target')
+        response = self.client.post('/api/users/admin_target/deactivate', headers=headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(jkwi_app.users.get_user('admin_target')['is_active'])
+        response = self.client.post('/api/users/admin_target/activate', headers=headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(jkwi_app.users.get_user('admin_target')['is_active'])
+        response = self.client.post('/api/users/nobody/deactivate', headers=headers)
+        self.assertEqual(response.status_code, 404)
+
+    def test_revoked_admin_is_refused(self):
+        headers = self.register('former_admin', admin=True)
+        self.register('former_target')
+        jkwi_app.users.update_user('former_admin', {'is_admin': False})
+        response = self.client.post('/api/users/former_target/deactivate', headers=headers)
+        self.assertEqual(response.status_code, 403)
+
+    def test_list_users_is_admin_only_and_allow_listed(self):
+        headers = self.register('listing_user')
+        self.assertEqual(self.client.get('/api/users', headers=headers).status_code, 403)
+        headers = self.register('listing_admin', admin=True)
+        response = self.client.get('/api/users?q=listing_', headers=headers)
+        self.assertEqual(response.status_code, 200)
+        users = response.get_json()
+        self.assertEqual([user['username'] for user in users], ['listing_admin', 'listing_user'])
+        self.assertEqual(set(users[0]), {'username', 'email', 'division', 'is_active', 'is_admin',
+                                         'created_at', 'last_login_at'})
+
+class TestAuthTokens(AppTestCase):
+
+    def test_token_is_rejected_after_logout(self):
+        headers = self.register('logout_user')
+        self.assertEqual(self.client.get('/api/company', headers=headers).status_code, 200)
+        self.assertEqual(self.client.post('/api/logout', headers=headers).status_code, 200)
+        self.assertEqual(self.client.get('/api/company', headers=headers).status_code, 401)
+
+    def test_tokens_are_rejected_after_deactivation(self):
+        admin = self.register('revoking_admin', admin=True)
+        headers = self.register('revoked_user')
+        self.assertEqual(self.client.get('/api/company', headers=headers).status_code, 200)
+        self.client.post('/api/users/revoked_user/deactivate', headers=admin)
+        self.assertEqual(self.client.get('/api/company', headers=headers).status_code, 401)
+        response = self.client.post('/api/login', json={'username': 'revoked_user', 'password': PASSWORD})
+        self.assertEqual(response.status_code, 401)
+
+    def test_reactivated_user_can_log_in_straight_away(self):
+        admin = self.register('reactivating_admin', admin=True)
+        self.register('reactivated_user')
+        self.client.post('/api/users/reactivated_user/deactivate', headers=admin)
+        self.client.post('/api/users/reactivated_user/activate', headers=admin)
+        response = self.client.post('/api/login', json={'username': 'reactivated_user', 'password': PASSWORD})
+        self.assertEqual(response.status_code, 200)
+        headers = {'Authorization': f"Bearer {response.get_json()['access_token']}"}
+        self.assertEqual(self.client.get('/api/company', headers=headers).status_code, 200)
+
+    def test_login_rehashes_outdated_password_hash(self):
+        self.register('rehash_user')
+        old_hash = jkwi_app.password_hasher.__class__(method='pbkdf2:sha256:500', inline=True).hash(PASSWORD)
+        jkwi_app.users.update_user('rehash_user', {'password_hash': old_hash})
+        response = self.client.post('/api/login', json={'username': 'rehash_user', 'password': PASSWORD})
+        self.assertEqual(response.status_code, 200)
+        stored = jkwi_app.users.get_user('rehash_user')['password_hash']
+        self.assertTrue(stored.startswith('pbkdf2:sha256:1000$'), stored)
+        response = self.client.post('/api/login', json={'username': 'rehash_user', 'password': PASSWORD})
+        self.assertEqual(response.status_code, 200)
+
+class TestEventStreamTokens(AppTestCase):
+
+    def stream_token(self, headers):
+        response = self.client.post('/api/events/token', headers=headers)
+        self.assertEqual(response.status_code, 200)
+        return response.get_json()['token']
+
+    def test_stream_requires_a_stream_token(self):
+        headers = self.register('stream_user')
+        access_token = headers['Authorization'].split()[1]
+        self.assertEqual(self.client.get(f'/api/events?jwt={access_token}').status_code, 401)
+        response = self.client.get(f'/api/events?jwt={self.stream_token(headers)}')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, 'text/event-stream')
+        response.close()
+
+    def test_stream_token_is_refused_elsewhere(self):
+        token = self.stream_token(self.register('stream_scope_user'))
+        response = self.client.get('/api/company', headers={'Authorization': f'Bearer {token}'})
+        self.assertEqual(response.status_code, 401)
+        response = self.client.post('/api/events/token', headers={'Authorization': f'Bearer {token}'})
+        self.assertEqual(response.status_code, 401)
+
+    def test_full_worker_refuses_streams(self):
+        token = self.stream_token(self.register('stream_cap_user'))
+        with mock.patch.object(jkwi_app.event_broker, 'subscribe', return_value=None):
+            response = self.client.get(f'/api/events?jwt={token}')
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.headers['Retry-After'], '30')
+
+class TestBatchRoutes(AppTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.headers = self.register(f'batch_user_{self._testMethodName}')
+
+    def test_invalid_items_fail_alone(self):
+        response = self.client.post('/api/members:batch', headers=self.headers,
+                                    json=[{'fullName': 'Batch One'}, 'not an object', {'fullName': 'Batch Two'}])
+        self.assertEqual(response.status_code, 207)
+        body = response.get_json()
+        self.assertEqual((body['created'], body['failed']), (2, 1))
+        self.assertEqual([result['success'] for result in body['results']], [True, False, True])
+        self.assertEqual(body['results'][1]['error'], 'Item must be a JSON object')
+
+    def test_failed_writes_are_reported_per_item(self):
+        with mock.patch.object(jkwi_app.cloud_data, 'save_many_to_collection_sync', return_value=[True, False]):
+            response = self.client.post('/api/directors:batch', headers=self.headers,
+                                        json=[{'name': 'Saved'}, {'name': 'Lost'}])
+        self.assertEqual(response.status_code, 207)
+        results = response.get_json()['results']
+        self.assertTrue(results[0]['success'])
+        self.assertEqual(results[1]['error'], 'Failed to add director')
+
+    def test_non_array_body_is_rejected(self):
+        response = self.client.post('/api/members:batch', headers=self.headers, json={'fullName': 'x'})
+        self.assertEqual(response.status_code, 400)
+
+class TestPagination(AppTestCase):
+
+    def test_pages_follow_creation_time_across_id_formats(self):
+        headers = self.register('paging_user')
+        jkwi_app.cloud_data.save_many_to_collection_sync('directors', [
+            # Legacy timestamp IDs sort after ULIDs as strings but were created earlier
+            ('1700000000001', {'name': 'Legacy B', 'createdAt': '2023-11-14T22:13:20.002'}),
+            ('1700000000000', {'name': 'Legacy A', 'createdAt': '2023-11-14T22:13:20.001'}),
+        ])
+        self.client.post('/api/directors:batch', headers=headers,
+                         json=[{'name': f'Director {i}'} for i in range(5)])
+        
+        names, cursor = [], None
+        while True:
+            query = f'?limit=2&after={cursor}' if cursor else '?limit=2'
+            body = self.client.get(f'/api/directors{query}', headers=headers).get_json()
+            names.extend(director['name'] for director in body['items'])
+            cursor = body['next_cursor']
+            if cursor is None:
+                break
+        everything = self.client.get('/api/directors', headers=headers).get_json()
+        self.assertEqual(len(names), len(everything))
+        mine = [name for name in names if name.startswith(('Legacy', 'Director '))]
+        self.assertEqual(mine, ['Legacy A', 'Legacy B'] + [f'Director {i}' for i in range(5)])
+
+    def test_invalid_cursor_is_rejected(self):
+        headers = self.register('bad_cursor_user')
+        response = self.client.get('/api/members?limit=2&after=not-a-cursor', headers=headers)
+        self.assertEqual(response.status_code, 400)
+
+class TestConditionalGet(AppTestCase):
+
+    def test_etag_round_trip(self):
+        headers = self.register('etag_user')
+        first = self.client.get('/api/divisions', headers=headers)
+        self.assertEqual(first.status_code, 200)
+        etag = first.headers['ETag']
+        unchanged = self.client.get('/api/divisions', headers={**headers, 'If-None-Match': etag})
+        self.assertEqual(unchanged.status_code, 304)
+        self.assertEqual(unchanged.get_data(), b'')
+        self.client.post('/api/divisions', headers=headers, json={'name': 'ETag Division'})
+        changed = self.client.get('/api/divisions', headers={**headers, 'If-None-Match': etag})
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed.headers['ETag'], etag)
+        self.assertIn('ETag Division', [division['name'] for division in changed.get_json()])
+
+class TestCompression(AppTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.headers = self.register(f'gzip_user_{self._testMethodName}')
+        self.client.post('/api/partnerships:batch', headers=self.headers,
+                         json=[{'name': f'Compressed partnership {i}', 'description': 'x' * 40} for i in range(40)])
+
+    def test_gzip_when_accepted(self):
+        response = self.client.get('/api/partnerships', headers={**self.headers, 'Accept-Encoding': 'gzip'})
+        self.assertEqual(response.headers.get('Content-Encoding'), 'gzip')
+        self.assertIn('Accept-Encoding', response.headers['Vary'])
+        self.assertGreaterEqual(len(json.loads(gzip.decompress(response.get_data()))), 40)
+
+    def test_identity_without_accept_encoding(self):
+        response = self.client.get('/api/partnerships', headers=self.headers)
+        self.assertNotIn('Content-Encoding', response.headers)
+        self.assertGreaterEqual(len(response.get_json()), 40)
+
+    def test_small_responses_are_not_compressed(self):
+        response = self.client.get('/api/company', headers={**self.headers, 'Accept-Encoding': 'gzip'})
+        self.assertLess(len(response.get_data()), 1024)
+        self.assertNotIn('Content-Encoding', response.headers)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,43 @@
+import asyncio
+import os
+import sys
+import threading
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), 'cloud-config'))
+
+from async_data import AsyncCloudDataManager
+
+class SlowDataManager:
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.calls = []
+
+    def get_collection_sync(self, collection_name):
+        self.calls.append(collection_name)
+        self.release.wait(5)
+        return [{'id': collection_name}]
+
+class TestAsyncCloudDataManager(unittest.TestCase):
+
+    def test_concurrent_reads_of_a_collection_share_one_fetch(self):
+        data_manager = SlowDataManager()
+        manager = AsyncCloudDataManager(data_manager, max_concurrency=2)
+
+        async def read_all():
+            reads = asyncio.gather(manager.get_collection('members'), manager.get_collection('members'),
+                                   manager.get_collections('divisions'))
+            await asyncio.sleep(0.05)
+            data_manager.release.set()
+            return await reads
+
+        first, second, others = asyncio.run(read_all())
+        self.assertEqual(first, second)
+        self.assertEqual(others, {'divisions': [{'id': 'divisions'}]})
+        self.assertEqual(sorted(data_manager.calls), ['divisions', 'members'])
+        self.assertEqual(manager.stats()['coalesced_reads'], 1)
+        self.assertEqual(manager.stats()['in_flight'], 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,50 @@
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), 'cloud-config'))
+
+from auth_tokens import TokenDenylist
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 1000.25
+
+    def __call__(self):
+        return self.now
+
+class TestTokenDenylist(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.clock = FakeClock()
+        self.denylist = TokenDenylist(os.path.join(self.tmp.name, 'state.db'), clock=self.clock)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_deactivation_revokes_tokens_issued_in_the_same_second(self):
+        self.denylist.revoke_identity('alice')
+        self.assertTrue(self.denylist.is_revoked({'sub': 'alice', 'iat': 999}))
+        self.assertTrue(self.denylist.is_revoked({'sub': 'alice', 'iat': 1000}))
+        self.assertFalse(self.denylist.is_revoked({'sub': 'bob', 'iat': 1000}))
+
+    def test_activation_accepts_logins_in_the_same_second(self):
+        self.denylist.revoke_identity('alice')
+        self.clock.now = 1000.75
+        self.denylist.restore_identity('alice')
+        self.assertFalse(self.denylist.is_revoked({'sub': 'alice', 'iat': 1000}))
+        self.assertTrue(self.denylist.is_revoked({'sub': 'alice', 'iat': 999}))
+
+    def test_restore_is_shared_with_other_workers(self):
+        other = TokenDenylist(self.denylist.path, clock=self.clock, sync_interval=0)
+        self.denylist.revoke_identity('alice')
+        self.clock.now = 1005.0
+        self.denylist.restore_identity('alice')
+        self.assertFalse(other.is_revoked({'sub': 'alice', 'iat': 1005}))
+        self.assertTrue(other.is_revoked({'sub': 'alice', 'iat': 1000}))
+
+if __name__ == '__main__':
+    unittest.main()
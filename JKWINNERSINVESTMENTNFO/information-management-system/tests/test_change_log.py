@@ -0,0 +1,55 @@
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), 'cloud-config'))
+
+from change_log import ChangeLog
+
+class TestChangeLog(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.now = 1700000000.0
+        self.log = ChangeLog(os.path.join(self.tmp.name, 'state.db'), tombstone_retention=60,
+                             clock=lambda: self.now)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_only_latest_change_per_document_is_returned(self):
+        start = self.log.parse_cursor(self.log.cursor())
+        self.log.append('members', 'a', 'upsert', {'name': 'first'})
+        self.log.append('members', 'b', 'upsert', {'name': 'other'})
+        self.log.append('members', 'a', 'upsert', {'name': 'second'})
+        changes, cursor, has_more = self.log.changes_since(start)
+        self.assertEqual([(c['id'], c['data']['name']) for c in changes], [('b', 'other'), ('a', 'second')])
+        self.assertFalse(has_more)
+        self.assertEqual(self.log.changes_since(self.log.parse_cursor(cursor))[0], [])
+
+    def test_paging_with_limit(self):
+        self.log.append_many('members', [(str(i), 'upsert', {}) for i in range(5)])
+        changes, cursor, has_more = self.log.changes_since(0, limit=3)
+        self.assertEqual(len(changes), 3)
+        self.assertTrue(has_more)
+        changes, _, has_more = self.log.changes_since(self.log.parse_cursor(cursor), limit=3)
+        self.assertEqual([c['id'] for c in changes], ['3', '4'])
+        self.assertFalse(has_more)
+
+    def test_cursor_before_pruned_tombstones_is_rejected(self):
+        old_cursor = self.log.cursor()
+        self.log.append('members', 'a', 'delete')
+        self.now += 120
+        self.log.prune()
+        self.assertIsNone(self.log.parse_cursor(old_cursor))
+        self.assertIsNotNone(self.log.parse_cursor(self.log.cursor()))
+
+    def test_reset_invalidates_cursors(self):
+        cursor = self.log.cursor()
+        self.log.reset()
+        self.assertIsNone(self.log.parse_cursor(cursor))
+        self.assertIsNone(self.log.parse_cursor('not-a-cursor'))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), 'cloud-config'))
+
+from collection_cache import CollectionCache, parse_ttls
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+class TestCollectionCache(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.cache = CollectionCache({'divisions': 10}, clock=self.clock)
+
+    def test_entries_expire_after_ttl(self):
+        hit, generation = self.cache.get('divisions')
+        self.assertFalse(hit)
+        self.cache.put('divisions', [{'id': 1}], generation)
+        self.assertEqual(self.cache.get('divisions'), (True, [{'id': 1}]))
+        self.clock.now += 10
+        self.assertFalse(self.cache.get('divisions')[0])
+
+    def test_write_during_read_discards_stale_result(self):
+        _, generation = self.cache.get('divisions')
+        self.cache.invalidate('divisions')
+        self.cache.put('divisions', [{'id': 'stale'}], generation)
+        hit, generation = self.cache.get('divisions')
+        self.assertFalse(hit)
+        self.cache.put('divisions', [{'id': 'fresh'}], generation)
+        self.assertEqual(self.cache.get('divisions'), (True, [{'id': 'fresh'}]))
+
+    def test_refreshed_entries_do_not_expire(self):
+        self.assertFalse(self.cache.is_cached('members'))
+        self.cache.refresh('members', [{'id': 'a'}])
+        self.assertTrue(self.cache.is_cached('members'))
+        self.clock.now += 1000
+        self.assertEqual(self.cache.get('members'), (True, [{'id': 'a'}]))
+        self.assertEqual(self.cache.stats()['listening'], ['members'])
+
+    def test_parse_ttls(self):
+        self.assertEqual(parse_ttls('divisions=300, members=10,bad'), {'divisions': 300.0, 'members': 10.0})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+import contextlib
+import io
+import os
+import sqlite3
+import sys
+import tempfile
+import unittest
+from datetime import date
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), 'cloud-config'))
+
+from create_demo_data import NUMPY_AVAILABLE, StreamingMemberGenerator, generate_members
+from export_sources import MemberTreeSource, read_export
+
+AS_OF = date(2026, 1, 1)
+
+class TestStreamingMemberGenerator(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def generate(self, name, count, **kwargs):
+        output = os.path.join(self.tmp.name, name)
+        with contextlib.redirect_stdout(io.StringIO()):
+            generate_members(count, output, seed=7, as_of=AS_OF, **kwargs)
+        return output
+
+    def test_output_does_not_depend_on_worker_count(self):
+        one = self.generate('one.ndjson', 250, workers=1, shard_size=100)
+        two = self.generate('two.ndjson', 250, workers=2, shard_size=100)
+        one_records, two_records = list(read_export(one)), list(read_export(two))
+        self.assertEqual(one_records, two_records)
+        self.assertEqual(len({doc_id for _, doc_id, _ in one_records}), 250)
+        self.assertEqual(one_records[-1][2]['membershipNumber'], 'JKWI-2026-0250')
+
+    def test_blocks_differ_and_fields_are_in_range(self):
+        generator = StreamingMemberGenerator(seed=7, as_of=AS_OF, block_size=50, use_numpy=False)
+        members = list(generator.shard(0, 0, 200))
+        self.assertGreater(len({member['fullName'] for member in members}), 50)
+        for member in members:
+            self.assertTrue('2023-01-02' <= member['joinDate'] <= '2025-12-02', member['joinDate'])
+            self.assertTrue(2 <= len(set(member['skills'])) == len(member['skills']) <= 5)
+            self.assertRegex(member['phone'], r'^\+27-\d{3}-\d{3}-\d{4}$')
+
+    def test_usernames_and_emails_are_unique_at_scale(self):
+        generator = StreamingMemberGenerator(seed=7, as_of=AS_OF, use_numpy=False)
+        usernames, emails, count = set(), set(), 0
+        for shard in range(3):
+            for member in generator.shard(shard, shard * 100000, 100000):
+                usernames.add(member['username'])
+                emails.add(member['email'].lower())
+                count += 1
+        self.assertEqual((len(usernames), len(emails)), (count, count))
+
+    @unittest.skipUnless(NUMPY_AVAILABLE, 'numpy is not installed')
+    def test_numpy_sampler_is_deterministic(self):
+        first = list(StreamingMemberGenerator(seed=7, as_of=AS_OF).shard(3, 300, 100))
+        second = list(StreamingMemberGenerator(seed=7, as_of=AS_OF).shard(3, 300, 100))
+        self.assertEqual(first, second)
+
+    def test_member_tree_is_readable_by_the_export(self):
+        root = self.generate('4-MEMBER', 30, workers=1, output_format='member-tree')
+        records = [record for _, record in MemberTreeSource(root).records()]
+        self.assertEqual(len(records), 30)
+        self.assertTrue(all(record['id'].startswith('00') and record['email'] for record in records))
+
+    def test_sql_output_loads_into_sqlite(self):
+        output = self.generate('members.sql', 1200, workers=1, shard_size=700, output_format='sql',
+                               dialect='sqlite')
+        with open(output, encoding='utf-8') as f:
+            script = f.read()
+        # Multi-row INSERTs of up to 500 rows: 500 + 200 for the first shard, 500 for the second
+        self.assertEqual(script.count('INSERT INTO members'), 3)
+        connection = sqlite3.connect(':memory:')
+        connection.executescript(script)
+        self.assertEqual(connection.execute('SELECT COUNT(DISTINCT membership_number) FROM members').fetchone(),
+                         (1200,))
+
+if __name__ == '__main__':
+    unittest.main()
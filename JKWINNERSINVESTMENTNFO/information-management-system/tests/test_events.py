@@ -0,0 +1,60 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), 'cloud-config'))
+
+from events import EventBroker, format_sse
+
+class TestEventBroker(unittest.TestCase):
+
+    def test_format_sse(self):
+        self.assertEqual(format_sse('change', {'a': 1}, event_id=7), 'id: 7\nevent: change\ndata: {"a": 1}\n\n')
+
+    def test_publish_reaches_every_subscriber(self):
+        broker = EventBroker()
+        first, second = broker.subscribe(), broker.subscribe()
+        broker.publish('change', {'collection': 'members'})
+        self.assertIn('event: change', first.queue.get_nowait())
+        self.assertIn('event: change', second.queue.get_nowait())
+
+    def test_sticky_event_is_replayed_to_new_subscribers(self):
+        broker = EventBroker()
+        broker.publish('stats', {'totalMembers': 1}, sticky=True)
+        broker.publish('stats', {'totalMembers': 2}, sticky=True)
+        self.assertIn('"totalMembers": 2', broker.subscribe().queue.get_nowait())
+
+    def test_slow_subscriber_gets_one_resync_event(self):
+        broker = EventBroker(max_pending=2)
+        subscription = broker.subscribe()
+        for i in range(5):
+            broker.publish('change', {'n': i})
+        self.assertIn('event: resync', subscription.queue.get_nowait())
+        self.assertLessEqual(subscription.queue.qsize(), 1)
+
+    def test_stream_unsubscribes_when_closed(self):
+        broker = EventBroker(heartbeat=0.01)
+        stream = broker.stream(broker.subscribe())
+        self.assertTrue(next(stream).startswith('retry:'))
+        self.assertEqual(next(stream), ': keepalive\n\n')
+        stream.close()
+        self.assertFalse(broker.has_subscribers())
+
+    def test_subscribers_are_capped(self):
+        broker = EventBroker(max_subscribers=1)
+        subscription = broker.subscribe()
+        self.assertIsNone(broker.subscribe())
+        broker.unsubscribe(subscription)
+        self.assertIsNotNone(broker.subscribe())
+        self.assertEqual(broker.stats()['rejected'], 1)
+
+    def test_expired_stream_asks_client_to_reconnect(self):
+        broker = EventBroker(max_duration=0)
+        stream = broker.stream(broker.subscribe())
+        next(stream)
+        self.assertIn('event: reconnect', next(stream))
+        self.assertEqual(list(stream), [])
+        self.assertFalse(broker.has_subscribers())
+
+if __name__ == '__main__':
+    unittest.main()
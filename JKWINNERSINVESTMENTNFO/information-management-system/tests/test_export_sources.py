@@ -0,0 +1,146 @@
+import io
+import json
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), 'cloud-config'))
+
+from export_sources import (CompanyDetailsSource, DataJsSource, DemoMembersSource, ExportWriter,
+                            LocalStorageBackupSource, MemberTreeSource, local_sources, read_export)
+
+# information-management-system, as MigrationTool uses it by default
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+class TestSources(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, relative_path, content):
+        path = self.root / relative_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content, encoding='utf-8')
+        return path
+
+    def test_data_js_object_literal(self):
+        path = self.write('data.js', '''
+class DataManager {
+    constructor() {
+        this.data = {
+            company: { name: "JK {Winners}", motto: 'It\\'s ours', lastUpdated: new Date().toISOString() },
+            members: [
+                { id: 1, fullName: "Jane: Smith", tags: ["a", "b",], },
+            ],
+        };
+    }
+}''')
+        self.assertEqual(list(DataJsSource(path).records()), [
+            ('company', {'name': 'JK {Winners}', 'motto': "It's ours"}),
+            ('members', {'id': 1, 'fullName': 'Jane: Smith', 'tags': ['a', 'b']})
+        ])
+
+    def test_member_tree_skips_templates(self):
+        member = {'member_info': {'member_id': 'ZW00100000001', 'first_name': 'Tendai', 'last_name': 'Moyo'},
+                  'contact_info': {'email': 't@example.com', 'address': {'country': 'Zimbabwe'}},
+                  'jkwi_info': {'status': 'Pending', 'division': ''}}
+        self.write('ZW-Zimbabwe/ZW001-Harare/ZW001.json', json.dumps({'member_info': {'member_id': ''}}))
+        self.write('ZW-Zimbabwe/ZW001-Harare/ZW00100000001.json', json.dumps(member))
+        self.write('ZW-Zimbabwe/ZW001-Harare/notes.txt', 'not a member')
+        self.assertEqual(list(MemberTreeSource(self.root).records()), [('members', {
+            'id': 'ZW00100000001', 'fullName': 'Tendai Moyo', 'firstName': 'Tendai', 'lastName': 'Moyo',
+            'email': 't@example.com', 'country': 'Zimbabwe', 'status': 'Pending'
+        })])
+
+    def test_company_details_formats(self):
+        self.write('company_details.xml', '<company><name>JKWI</name><sectors><sector>Mining</sector>'
+                                          '<sector>Farming</sector></sectors></company>')
+        self.write('company_details.csv', 'field,value\nname,Other\nfounded,2020\n')
+        records = list(CompanyDetailsSource(self.root).records())
+        self.assertEqual(records, [
+            ('company', {'name': 'JKWI', 'sectors': {'sector': ['Mining', 'Farming']}}),
+            ('company', {'name': 'Other', 'founded': '2020'})
+        ])
+        self.assertEqual(CompanyDetailsSource.csv_to_dict(io.StringIO('name,tradingName\nJK,JKWI\n')),
+                         {'name': 'JK', 'tradingName': 'JKWI'})
+
+    def test_demo_members_json_and_ndjson(self):
+        path = self.write('demo_members.json', json.dumps({'members': [{'id': 1}, {'id': 2}], 'total_count': 2}))
+        self.assertEqual(list(DemoMembersSource(path).records()), [('members', {'id': 1}), ('members', {'id': 2})])
+        path = self.write('demo_members.ndjson', '\n'.join([
+            json.dumps({'export_info': {}}),
+            json.dumps({'collection': 'members', 'id': '3', 'data': {'id': '3'}}),
+            json.dumps({'id': 4}),
+            ''
+        ]))
+        self.assertEqual(list(DemoMembersSource(path).records()), [('members', {'id': '3'}), ('members', {'id': 4})])
+
+class TestLocalSources(unittest.TestCase):
+
+    def test_company_details_found_in_checked_in_layout(self):
+        sources = [source for source in local_sources(PROJECT_ROOT) if isinstance(source, CompanyDetailsSource)]
+        self.assertEqual(len(sources), 1)
+        self.assertTrue(sources[0].available(), sources[0].path)
+        records = list(sources[0].records())
+        self.assertTrue(records)
+        self.assertEqual(records[0][0], 'company')
+        self.assertIn('JK WINNERS', json.dumps(records[0][1]))
+
+    def test_member_folders_found_in_checked_in_layout(self):
+        trees = [source for source in local_sources(PROJECT_ROOT) if isinstance(source, MemberTreeSource)]
+        self.assertTrue(any(source.available() for source in trees))
+
+class TestExportWriter(unittest.TestCase):
+
+    def test_dedupes_by_id_and_round_trips(self):
+        output = io.StringIO()
+        writer = ExportWriter(output)
+        writer.write_header({'version': '2.0'})
+        writer.add('members', {'id': 1, 'fullName': 'First'})
+        writer.add('members', {'id': '1', 'fullName': 'Later copy'})
+        writer.add('members', {'fullName': 'No ID'})
+        writer.add('company', {'name': 'JKWI'})
+        writer.add('company', {'name': 'Ignored', 'founded': 2020})
+        writer.finish()
+        self.assertEqual((writer.counts['members'], writer.duplicates), (2, 1))
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'export.ndjson')
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(output.getvalue())
+            records = list(read_export(path))
+        self.assertEqual(records[0], ('members', '1', {'id': 1, 'fullName': 'First'}))
+        self.assertEqual(records[-1], ('company', 'main', {'name': 'JKWI', 'founded': 2020}))
+        self.assertEqual(sorted(writer.manifest['members']), ['1', records[1][1]])
+        self.assertEqual([entry[:2] for entry in writer.manifest_entries()],
+                         [('company', 'main')] + sorted(('members', doc_id) for doc_id in writer.manifest['members']))
+
+    def test_added_count_excludes_duplicates(self):
+        class Source:
+            def records(self):
+                yield 'members', {'id': 1}
+                yield 'members', {'id': 1}
+                yield 'company', {'name': 'JKWI'}
+                yield 'directors', {'id': 1}
+        writer = ExportWriter(io.StringIO())
+        self.assertEqual(writer.add_source(Source()), 2)
+        self.assertEqual(writer.add_source(Source()), 0)
+        self.assertEqual(writer.duplicates, 4)
+
+    def test_local_storage_backup(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'localStorage_backup.json')
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump({'jkwi_data': json.dumps({'company': {'name': 'JKWI'}, 'activities': [{}],
+                                                    'directors': [{'id': 3}]})}, f)
+            self.assertEqual(list(LocalStorageBackupSource(path).records()),
+                             [('company', {'name': 'JKWI'}), ('directors', {'id': 3})])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,35 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), 'cloud-config'))
+
+from id_generator import ULIDGenerator, decode, encode, is_ulid, timestamp_ms
+
+class TestULIDGenerator(unittest.TestCase):
+
+    def test_ids_are_unique_and_sorted_within_one_millisecond(self):
+        generator = ULIDGenerator(clock=lambda: 1700000000.0)
+        ids = [generator.new_id() for _ in range(1000)]
+        self.assertEqual(len(set(ids)), len(ids))
+        self.assertEqual(ids, sorted(ids))
+
+    def test_ids_stay_ordered_when_clock_steps_back(self):
+        times = iter([1700000000.5, 1700000000.0])
+        generator = ULIDGenerator(clock=lambda: next(times))
+        first, second = generator.new_id(), generator.new_id()
+        self.assertLess(first, second)
+
+    def test_timestamp_round_trip(self):
+        generator = ULIDGenerator(clock=lambda: 1700000000.123)
+        ulid = generator.new_id()
+        self.assertTrue(is_ulid(ulid))
+        self.assertEqual(timestamp_ms(ulid), 1700000000123)
+
+    def test_encode_decode(self):
+        value = (1 << 127) + 12345
+        self.assertEqual(decode(encode(value)), value)
+        self.assertFalse(is_ulid('1700000000123'))
+
+if __name__ == '__main__':
+    unittest.main()
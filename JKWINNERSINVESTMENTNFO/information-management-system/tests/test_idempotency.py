@@ -0,0 +1,61 @@
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), 'cloud-config'))
+
+from idempotency import IN_FLIGHT, MISMATCH, NEW, REPLAY, MemoryIdempotencyStore, SQLiteIdempotencyStore
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+class TestIdempotencyStore(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.store = MemoryIdempotencyStore(ttl=100, max_entries=2, lease=10, clock=self.clock)
+
+    def test_completed_response_is_replayed(self):
+        self.assertEqual(self.store.begin('k', 'f'), (NEW, None))
+        self.assertEqual(self.store.begin('k', 'f'), (IN_FLIGHT, None))
+        self.store.complete('k', 201, b'{}', 'application/json')
+        self.assertEqual(self.store.begin('k', 'f'), (REPLAY, (201, b'{}', 'application/json')))
+        self.assertEqual(self.store.begin('k', 'other'), (MISMATCH, None))
+
+    def test_abandoned_and_expired_keys_run_again(self):
+        self.store.begin('k', 'f')
+        self.store.abandon('k')
+        self.assertEqual(self.store.begin('k', 'f')[0], NEW)
+        self.clock.now += 11
+        self.assertEqual(self.store.begin('k', 'f')[0], NEW)
+        self.store.complete('k', 201, b'{}', 'application/json')
+        self.clock.now += 101
+        self.assertEqual(self.store.begin('k', 'f')[0], NEW)
+
+    def test_least_recently_used_keys_are_evicted(self):
+        for key in ('a', 'b', 'c'):
+            self.store.begin(key, 'f')
+            self.store.complete(key, 201, b'x', 'application/json')
+        self.assertEqual(self.store.stats()['keys'], 2)
+        self.assertEqual(self.store.begin('a', 'f')[0], NEW)
+
+class TestSQLiteIdempotencyStore(unittest.TestCase):
+
+    def test_keys_are_shared_between_stores(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'state.db')
+            first, second = SQLiteIdempotencyStore(path), SQLiteIdempotencyStore(path)
+            self.assertEqual(first.begin('k', 'f'), (NEW, None))
+            self.assertEqual(second.begin('k', 'f'), (IN_FLIGHT, None))
+            first.complete('k', 201, b'{"id": 1}', 'application/json')
+            self.assertEqual(second.begin('k', 'f'), (REPLAY, (201, b'{"id": 1}', 'application/json')))
+            self.assertEqual(second.begin('k', 'g'), (MISMATCH, None))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+import contextlib
+import io
+import os
+import sys
+import threading
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), 'cloud-config'))
+
+from load_demo_data import RETRY_STATUSES, JKWIDemoDataLoader, create_session
+
+class FakeResponse:
+
+    def __init__(self, status_code, body=None, headers=None):
+        self.status_code = status_code
+        self._body = body or {}
+        self.headers = headers or {}
+
+    def json(self):
+        return self._body
+
+class FakeSession:
+    """Records requests and answers like the cloud API"""
+
+    def __init__(self, capabilities=None):
+        self.capabilities = capabilities
+        self.lock = threading.Lock()
+        self.posts = []
+        # Creates answered with 429 before the server accepts them
+        self.throttle = 0
+
+    def get(self, url, timeout=None):
+        body = {'status': 'healthy'}
+        if self.capabilities is not None:
+            body['capabilities'] = self.capabilities
+        return FakeResponse(200, body)
+
+    def post(self, url, json=None, headers=None, timeout=None):
+        with self.lock:
+            self.posts.append((url, json, headers or {}))
+        if url.endswith('/api/register'):
+            return FakeResponse(201, {'access_token': 'token'})
+        with self.lock:
+            if self.throttle:
+                self.throttle -= 1
+                return FakeResponse(429, headers={'Retry-After': '0.01'})
+        if url.endswith(':batch'):
+            return FakeResponse(201, {'created': len(json), 'failed': 0})
+        return FakeResponse(201 if 'fail' not in json else 500)
+
+class TestDemoDataLoader(unittest.TestCase):
+
+    def load(self, session, members, **kwargs):
+        loader = JKWIDemoDataLoader('http://api', session=session, **kwargs)
+        with contextlib.redirect_stdout(io.StringIO()):
+            loader.check_server_health()
+            loader.register_admin_user()
+            loader.load_members(members)
+        return loader
+
+    def test_uses_advertised_batch_endpoints(self):
+        session = FakeSession({'batch': ['members'], 'max_batch_items': 300})
+        members = [{'fullName': f'Member {i}'} for i in range(1000)]
+        loader = self.load(session, members, batch_size=500, concurrency=4)
+        batches = [post for post in session.posts if post[0].endswith('members:batch')]
+        self.assertEqual(sorted(len(body) for _, body, _ in batches), [100, 300, 300, 300])
+        keys = {headers['Idempotency-Key'] for _, _, headers in batches}
+        self.assertEqual(len(keys), 4)
+        self.assertTrue(all(headers['Authorization'] == 'Bearer token' for _, _, headers in batches))
+        self.assertEqual(loader.report.collections['members']['created'], 1000)
+
+    def test_falls_back_to_single_creates(self):
+        session = FakeSession()
+        members = [{'fullName': 'A'}, {'fullName': 'B', 'fail': True}, {'fullName': 'C'}]
+        loader = self.load(session, members, concurrency=2)
+        singles = [post for post in session.posts if post[0] == 'http://api/api/members']
+        self.assertEqual(len(singles), 3)
+        self.assertTrue(all('Idempotency-Key' in headers for _, _, headers in singles))
+        members_report = loader.report.collections['members']
+        self.assertEqual((members_report['created'], members_report['failed']), (2, 1))
+
+    def test_rate_limited_creates_wait_and_keep_their_key(self):
+        session = FakeSession({'batch': ['members'], 'max_batch_items': 1000})
+        session.throttle = 3
+        loader = self.load(session, [{'fullName': 'A'}])
+        batches = [post for post in session.posts if post[0].endswith('members:batch')]
+        self.assertEqual(len(batches), 4)
+        self.assertEqual(len({headers['Idempotency-Key'] for _, _, headers in batches}), 1)
+        self.assertEqual((loader.throttled, loader.report.collections['members']['created']), (3, 1))
+
+    def test_session_retries_failed_creates(self):
+        session = create_session(pool_size=4, max_retries=3)
+        retry = session.get_adapter('http://api').max_retries
+        self.assertEqual(retry.total, 3)
+        # Every create carries an Idempotency-Key, so POST is retried too
+        self.assertIsNone(retry.allowed_methods)
+        self.assertEqual(set(RETRY_STATUSES), {409, 500, 502, 503, 504})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), 'cloud-config'))
+
+from test_system import EndpointStats, compare_with_baseline, parse_mix
+
+class TestLoadMode(unittest.TestCase):
+
+    def test_endpoint_summary(self):
+        stats = EndpointStats()
+        for i in range(1, 101):
+            stats.record(i / 1000, 200)
+        stats.record(0.5, 429)
+        stats.record(0.2, 'ConnectionError')
+        summary = stats.summary(elapsed=2.0)
+        self.assertEqual((summary['requests'], summary['errors'], summary['throttled']), (102, 1, 1))
+        self.assertEqual(summary['throttled_rate'], round(1 / 102, 4))
+        self.assertEqual(summary['throughput_rps'], 51.0)
+        self.assertEqual((summary['p50_ms'], summary['max_ms']), (51.0, 500.0))
+        self.assertEqual(summary['statuses'], {'200': 100, '429': 1, 'ConnectionError': 1})
+
+    def test_merge(self):
+        first, second = EndpointStats(), EndpointStats()
+        first.record(0.1, 200)
+        second.record(0.2, 500)
+        second.record(0.3, 429)
+        first.merge(second)
+        self.assertEqual((len(first.latencies), first.errors, first.throttled), (3, 1, 1))
+        self.assertEqual(first.statuses, {200: 1, 500: 1, 429: 1})
+
+    def test_parse_mix(self):
+        self.assertEqual(parse_mix('login=1, list_members=5'), {'login': 1.0, 'list_members': 5.0})
+
+    def test_regressions_against_baseline(self):
+        baseline = {'endpoints': {
+            'GET /api/members': {'p95_ms': 100.0, 'throughput_rps': 50.0},
+            'GET /api/stats': {'p95_ms': 20.0, 'throughput_rps': 10.0},
+            'POST /api/login': {'p95_ms': 300.0, 'throughput_rps': 1.0}
+        }}
+        current = {'endpoints': {
+            'GET /api/members': {'p95_ms': 130.0, 'throughput_rps': 49.0},
+            'GET /api/stats': {'p95_ms': 21.0, 'throughput_rps': 7.0}
+        }}
+        self.assertEqual(compare_with_baseline(current, baseline, 0.2), [
+            'GET /api/members: p95 100.0ms -> 130.0ms',
+            'GET /api/stats: 10.0 -> 7.0 req/s'
+        ])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), 'cloud-config'))
+
+from local_store import CollectionVersions, LocalDocumentStore
+
+class TestLocalStore(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'state.db')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_documents_keep_insertion_order_across_updates(self):
+        store = LocalDocumentStore(self.path)
+        store.upsert_many('members', [('a', {'id': 'a', 'n': 1}), ('b', {'id': 'b', 'n': 2})])
+        store.upsert_many('members', [('a', {'id': 'a', 'n': 3})])
+        self.assertEqual(store.list('members'), [{'id': 'a', 'n': 3}, {'id': 'b', 'n': 2}])
+        store.delete('members', 'a')
+        self.assertEqual([doc['id'] for doc in LocalDocumentStore(self.path).list('members')], ['b'])
+
+    def test_seed_runs_once(self):
+        LocalDocumentStore(self.path).seed({'divisions': [{'id': 1, 'name': 'Mining'}]})
+        store = LocalDocumentStore(self.path)
+        store.delete('divisions', 1)
+        store.seed({'divisions': [{'id': 1, 'name': 'Mining'}]})
+        self.assertEqual(store.list('divisions'), [])
+
+    def test_versions_are_shared(self):
+        first, second = CollectionVersions(self.path), CollectionVersions(self.path)
+        self.assertEqual(first.bump('members'), 1)
+        self.assertEqual(second.bump('members'), 2)
+        self.assertEqual(second.get('members'), 2)
+        self.assertEqual(second.get('directors'), 0)
+        self.assertEqual(first.epoch, second.epoch)
+
+    def test_state_db_path_is_required_in_production(self):
+        import state_store
+        with mock.patch.dict(os.environ, {'FLASK_ENV': 'production'}):
+            os.environ.pop('STATE_DB_PATH', None)
+            with self.assertRaises(RuntimeError):
+                state_store.state_db_path()
+            os.environ['STATE_DB_PATH'] = self.path
+            self.assertEqual(state_store.state_db_path(), self.path)
+
+if __name__ == '__main__':
+    unittest.main()
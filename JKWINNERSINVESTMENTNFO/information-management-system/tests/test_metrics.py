@@ -0,0 +1,81 @@
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), 'cloud-config'))
+
+from metrics import Histogram, MetricsRegistry, SharedMetricsStore
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+class TestMetrics(unittest.TestCase):
+
+    def test_histogram_quantiles_use_bucket_upper_bounds(self):
+        histogram = Histogram((0.01, 0.1, 1.0))
+        for value in [0.005] * 90 + [0.5] * 10:
+            histogram.observe(value)
+        self.assertEqual(histogram.quantile(0.5), 0.01)
+        self.assertEqual(histogram.quantile(0.95), 1.0)
+        histogram.observe(5.0)
+        self.assertEqual(histogram.quantile(1.0), float('inf'))
+
+    def test_render_prometheus_text(self):
+        registry = MetricsRegistry()
+        registry.describe('requests_total', 'counter', 'Requests')
+        registry.describe('latency_seconds', 'histogram', 'Latency', buckets=(0.1, 1.0))
+        registry.inc('requests_total', route='/api/members', status=200)
+        registry.observe('latency_seconds', 0.5, route='/api/"x"')
+        text = registry.render()
+        self.assertIn('# TYPE requests_total counter', text)
+        self.assertIn('requests_total{route="/api/members",status="200"} 1', text)
+        self.assertIn('latency_seconds_bucket{route="/api/\\"x\\"",le="0.1"} 0', text)
+        self.assertIn('latency_seconds_bucket{route="/api/\\"x\\"",le="+Inf"} 1', text)
+        self.assertIn('latency_seconds_count{route="/api/\\"x\\""} 1', text)
+
+    def test_time_records_duration(self):
+        registry = MetricsRegistry()
+        registry.describe('op_seconds', 'histogram', 'Operations')
+        with registry.time('op_seconds', operation='get'):
+            pass
+        self.assertEqual(registry.histogram_summary('op_seconds', 'operation')['get']['count'], 1)
+
+    def test_shared_metrics_cover_every_worker(self):
+        clock = FakeClock()
+        with tempfile.TemporaryDirectory() as tmp:
+            shared = SharedMetricsStore(os.path.join(tmp, 'state.db'), stale_after=60, clock=clock)
+            registry = MetricsRegistry(shared=shared)
+            registry.describe('requests_total', 'counter', 'Requests')
+            registry.describe('latency_seconds', 'histogram', 'Latency', buckets=(0.1, 1.0))
+            registry.inc('requests_total', 2, route='/api/members')
+            registry.observe('latency_seconds', 0.05, route='/api/members')
+            # Another worker's last snapshot, as its publisher thread writes it
+            shared.publish(1, {'requests_total': [[[['route', '/api/members']], 3]],
+                               'latency_seconds': [[[['route', '/api/members']],
+                                                    {'counts': [0, 1, 0], 'sum': 0.5, 'count': 1}]]})
+            text = registry.render()
+            self.assertIn('requests_total{route="/api/members",pid="1"} 3', text)
+            self.assertIn(f'requests_total{{route="/api/members",pid="{os.getpid()}"}} 2', text)
+            self.assertIn('latency_seconds_bucket{route="/api/members",pid="1",le="0.1"} 0', text)
+            self.assertEqual(registry.total('requests_total'), 5)
+            summary = registry.histogram_summary('latency_seconds', 'route')['/api/members']
+            self.assertEqual((summary['count'], summary['p95_ms']), (2, 1000.0))
+
+    def test_stale_workers_are_dropped(self):
+        clock = FakeClock()
+        with tempfile.TemporaryDirectory() as tmp:
+            shared = SharedMetricsStore(os.path.join(tmp, 'state.db'), stale_after=60, clock=clock)
+            shared.publish(1, {})
+            clock.now += 30
+            shared.publish(2, {})
+            clock.now += 45
+            self.assertEqual(list(shared.collect()), [2])
+
+if __name__ == '__main__':
+    unittest.main()
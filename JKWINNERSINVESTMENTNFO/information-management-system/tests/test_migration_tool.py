@@ -0,0 +1,431 @@
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import threading
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), 'cloud-config'))
+
+from firestore_batches import DELETE, SET, BatchCommitter, ImportCheckpoint, ImportProgress, chunked, content_hash
+from migration_tool import DataMigrationTool, diff_manifests
+
+class Aborted(Exception):
+    """Named like google.api_core.exceptions.Aborted"""
+
+class FakeSnapshot:
+
+    def __init__(self, reference, data):
+        self.reference = reference
+        self.id = reference.id
+        self.exists = data is not None
+        self._data = data
+
+    def to_dict(self):
+        return dict(self._data) if self.exists else None
+
+class FakeDocument:
+
+    def __init__(self, db, collection_name, doc_id):
+        self.db = db
+        self.collection_name = collection_name
+        self.id = doc_id
+        self.path = f'{collection_name}/{doc_id}'
+
+    def get(self):
+        with self.db.lock:
+            return FakeSnapshot(self, self.db.data.get(self.collection_name, {}).get(self.id))
+
+    def set(self, data):
+        with self.db.lock:
+            self.db.data.setdefault(self.collection_name, {})[self.id] = dict(data)
+
+    def delete(self):
+        with self.db.lock:
+            self.db.data.get(self.collection_name, {}).pop(self.id, None)
+
+class FakeCollection:
+
+    def __init__(self, db, name):
+        self.db = db
+        self.name = name
+
+    def document(self, doc_id):
+        return FakeDocument(self.db, self.name, doc_id)
+
+    def count(self):
+        if not self.db.supports_count:
+            raise AttributeError('count')
+        return FakeAggregation(len(self.db.data.get(self.name, {})))
+
+    def select(self, field_paths):
+        return self
+
+    def stream(self):
+        self.db.streamed += 1
+        return [FakeDocument(self.db, self.name, doc_id).get() for doc_id in list(self.db.data.get(self.name, {}))]
+
+    def add(self, data):
+        with self.db.lock:
+            docs = self.db.data.setdefault(self.name, {})
+            doc_id = f'auto{len(docs)}'
+        FakeDocument(self.db, self.name, doc_id).set(data)
+
+class FakeAggregation:
+
+    def __init__(self, value):
+        self.value = value
+
+    def get(self):
+        return [[self]]
+
+class FakeBatch:
+
+    def __init__(self, db):
+        self.db = db
+        self.writes = []
+
+    def set(self, ref, data):
+        self.writes.append((ref, data))
+
+    def delete(self, ref):
+        self.writes.append((ref, None))
+
+    def commit(self):
+        if len(self.writes) > 500:
+            raise ValueError('too many writes in one batch')
+        with self.db.lock:
+            self.db.commits += 1
+            self.db.writes += len(self.writes)
+            if self.db.fatal or self.db.commits == self.db.fail_at:
+                raise ValueError('permission denied')
+            if self.db.failures:
+                self.db.failures -= 1
+                raise Aborted('contention')
+        for ref, data in self.writes:
+            ref.set(data) if data is not None else ref.delete()
+
+class FakeFirestore:
+    """In-memory stand-in for the parts of the Firestore client the tool uses"""
+
+    def __init__(self, failures=0):
+        self.lock = threading.Lock()
+        self.data = {}
+        self.commits = 0
+        # The next `failures` commits raise a retryable error
+        self.failures = failures
+        self.fatal = False
+        # This commit (1-based) fails without retry
+        self.fail_at = None
+        self.writes = 0
+        self.reads = 0
+        self.supports_count = True
+        self.streamed = 0
+
+    def collection(self, name):
+        return FakeCollection(self, name)
+
+    def batch(self):
+        return FakeBatch(self)
+
+    def get_all(self, refs):
+        refs = list(refs)
+        self.reads += len(refs)
+        # Like Firestore, results do not come back in request order
+        return [ref.get() for ref in reversed(refs)]
+
+def quiet():
+    return contextlib.redirect_stdout(io.StringIO())
+
+class TestBatchCommitter(unittest.TestCase):
+
+    def test_chunked_splits_any_iterable(self):
+        self.assertEqual(list(chunked(iter(range(5)), 2)), [[0, 1], [2, 3], [4]])
+
+    def test_writes_and_deletes_in_batches(self):
+        db = FakeFirestore()
+        db.data['members'] = {'gone': {}}
+        operations = [(SET, 'members', str(i), {'n': i}) for i in range(1200)]
+        operations.append((DELETE, 'members', 'gone', None))
+        committed = []
+        committer = BatchCommitter(db, max_workers=3, progress=ImportProgress(output=lambda line: None),
+                                   on_commit=lambda index, chunk, ok: committed.append((index, len(chunk), ok)))
+        self.assertTrue(committer.write(iter(operations)))
+        self.assertEqual(len(db.data['members']), 1200)
+        self.assertEqual(db.commits, 3)
+        self.assertEqual(sorted(committed), [(0, 500, True), (1, 500, True), (2, 201, True)])
+        self.assertEqual(committer.progress.summary()['written'], {'members': 1201})
+
+    def test_contention_is_retried_with_backoff(self):
+        db = FakeFirestore(failures=2)
+        delays = []
+        committer = BatchCommitter(db, backoff=1, progress=ImportProgress(output=lambda line: None),
+                                   sleep=delays.append)
+        self.assertTrue(committer.write([(SET, 'members', 'a', {})]))
+        self.assertEqual(db.data['members'], {'a': {}})
+        self.assertEqual(committer.progress.retries, 2)
+        self.assertTrue(0 <= delays[0] <= 1 and 0 <= delays[1] <= 2)
+
+    def test_batch_fails_after_max_retries(self):
+        db = FakeFirestore(failures=10)
+        committer = BatchCommitter(db, max_retries=2, progress=ImportProgress(output=lambda line: None),
+                                   sleep=lambda delay: None)
+        with quiet():
+            self.assertFalse(committer.write([(SET, 'members', 'a', {})]))
+        self.assertEqual(db.commits, 3)
+        self.assertEqual(committer.progress.summary()['failed'], {'members': 1})
+
+    def test_identical_documents_are_not_written(self):
+        db = FakeFirestore()
+        db.data['members'] = {'a': {'n': 1, 'm': 2}, 'b': {'n': 1}}
+        committer = BatchCommitter(db, progress=ImportProgress(output=lambda line: None))
+        self.assertTrue(committer.write([(SET, 'members', 'a', {'m': 2, 'n': 1}), (SET, 'members', 'b', {'n': 2}),
+                                         (DELETE, 'members', 'missing', None)]))
+        self.assertEqual(db.writes, 1)
+        self.assertEqual(committer.progress.summary()['unchanged'], {'members': 2})
+        self.assertTrue(committer.write([(SET, 'members', 'a', {'m': 2, 'n': 1})]))
+        self.assertEqual(db.commits, 1)
+
+    def test_known_hashes_skip_reads(self):
+        db = FakeFirestore()
+        db.data['members'] = {'a': {'n': 1}, 'b': {'n': 1}}
+        known = {'members': {'a': content_hash({'n': 1}), 'b': content_hash({'n': 0})}}
+        committer = BatchCommitter(db, known_hashes=known, progress=ImportProgress(output=lambda line: None))
+        self.assertTrue(committer.write([(SET, 'members', 'a', {'n': 1}), (SET, 'members', 'b', {'n': 1}),
+                                         (SET, 'members', 'c', {'n': 3})]))
+        # Only the documents whose hash differs from the manifest are read
+        self.assertEqual(db.reads, 2)
+        self.assertEqual(db.writes, 1)
+        self.assertEqual(committer.progress.summary()['unchanged'], {'members': 2})
+
+class TestImportCheckpoint(unittest.TestCase):
+
+    def test_only_advances_past_contiguous_batches(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            source = os.path.join(tmp, 'export.json')
+            with open(source, 'w') as f:
+                f.write('{}')
+            path = os.path.join(tmp, 'checkpoint.json')
+            checkpoint = ImportCheckpoint(path, source)
+            members = [(SET, 'members', 'x', {})] * 2
+            checkpoint.mark(1, members, True)
+            self.assertEqual(checkpoint.committed, 0)
+            checkpoint.mark(0, [(SET, 'company', 'main', {})] + members, True)
+            self.assertEqual((checkpoint.committed, checkpoint.position), (5, {'collection': 'members', 'offset': 4}))
+            checkpoint.mark(3, members, True)
+            checkpoint.mark(2, members, False)
+            checkpoint.finish()
+
+            saved = ImportCheckpoint(path, source)
+            self.assertTrue(saved.load())
+            self.assertEqual((saved.committed, saved.completed), (5, False))
+            with open(source, 'w') as f:
+                f.write('{"members": []}')
+            self.assertFalse(ImportCheckpoint(path, source).load())
+
+class TestImportToCloud(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db = FakeFirestore()
+        self.tool = DataMigrationTool(firebase_db=self.db, local_data_path=self.tmp.name, import_workers=2)
+        self.export_path = os.path.join(self.tmp.name, 'export.json')
+        export = {
+            'company': {'name': 'JKWI'},
+            'directors': [{'id': 1, 'name': 'A'}],
+            'divisions': [{'id': 2, 'name': 'Mining Division'}],
+            'members': [{'id': f'm{i}', 'fullName': f'Member {i}'} for i in range(1100)] + [{'fullName': 'No ID'}],
+            'partnerships': []
+        }
+        with open(self.export_path, 'w', encoding='utf-8') as f:
+            json.dump(export, f)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_import_writes_every_collection_and_logs(self):
+        with quiet():
+            self.assertTrue(self.tool.import_to_cloud(self.export_path))
+        self.assertEqual(self.db.data['company']['main'], {'name': 'JKWI'})
+        self.assertEqual(len(self.db.data['members']), 1101)
+        self.assertIn('1', self.db.data['directors'])
+        log = list(self.db.data['activities'].values())[0]
+        self.assertEqual(log['imported_counts'], {'directors': 1, 'divisions': 1, 'members': 1101, 'partnerships': 0})
+        self.assertEqual(log['batches'], 3)
+
+    def test_records_without_id_keep_the_same_id_on_reimport(self):
+        with quiet():
+            self.tool.import_to_cloud(self.export_path)
+            self.tool.import_to_cloud(self.export_path)
+        self.assertEqual(len(self.db.data['members']), 1101)
+
+    def test_import_reports_failure(self):
+        self.db.fatal = True
+        with quiet():
+            self.assertFalse(self.tool.import_to_cloud(self.export_path))
+        log = list(self.db.data['activities'].values())[0]
+        self.assertEqual(log['failed_counts']['members'], 1101)
+
+    def test_resume_continues_after_the_last_committed_batch(self):
+        self.tool.import_workers = 1
+        self.db.fail_at = 2
+        with quiet():
+            self.assertFalse(self.tool.import_to_cloud(self.export_path))
+        # The batch after the failed one went through, but the checkpoint stops at the gap
+        self.assertEqual(len(self.db.data['members']), 601)
+        self.db.fail_at = None
+        self.db.writes = 0
+        with quiet():
+            self.assertTrue(self.tool.import_to_cloud(self.export_path, resume=True))
+        self.assertEqual(len(self.db.data['members']), 1101)
+        self.assertEqual(self.db.writes, 500)
+        log = list(self.db.data['activities'].values())[-1]
+        self.assertEqual((log['resumed_from'], log['unchanged_counts']), (500, {'members': 104}))
+        with quiet():
+            self.assertTrue(self.tool.import_to_cloud(self.export_path, resume=True))
+        self.assertEqual(self.db.writes, 500)
+
+    def test_rerun_skips_documents_already_in_the_cloud(self):
+        with quiet():
+            self.tool.import_to_cloud(self.export_path)
+        commits = self.db.commits
+        with quiet():
+            self.assertTrue(self.tool.import_to_cloud(self.export_path))
+        self.assertEqual(self.db.commits, commits)
+        log = list(self.db.data['activities'].values())[-1]
+        self.assertEqual(log['unchanged_counts']['members'], 1101)
+
+    def test_rerun_reads_only_documents_changed_since_the_last_sync(self):
+        with quiet():
+            self.tool.import_to_cloud(self.export_path)
+        with open(self.export_path, 'r', encoding='utf-8') as f:
+            export = json.load(f)
+        export['members'][0]['fullName'] = 'Renamed'
+        with open(self.export_path, 'w', encoding='utf-8') as f:
+            json.dump(export, f)
+        self.db.reads = self.db.writes = 0
+        with quiet():
+            self.assertTrue(self.tool.import_to_cloud(self.export_path))
+        self.assertEqual((self.db.reads, self.db.writes), (1, 1))
+        self.assertEqual(self.db.data['members']['m0']['fullName'], 'Renamed')
+
+class TestIncrementalSync(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db = FakeFirestore()
+        self.tool = DataMigrationTool(firebase_db=self.db, local_data_path=self.tmp.name)
+        self.members = [{'id': f'm{i}', 'fullName': f'Member {i}'} for i in range(50)]
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def export(self, name):
+        path = os.path.join(self.tmp.name, name)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'company': {'name': 'JKWI'}, 'members': self.members}, f)
+        return path
+
+    def test_diff_manifests(self):
+        previous = {'members': {'a': '1', 'b': '2'}, 'directors': {'d': '3'}}
+        current = {'members': {'a': '1', 'b': '9', 'c': '4'}}
+        self.assertEqual(diff_manifests(previous, current), {
+            'insert': [('members', 'c')], 'update': [('members', 'b')], 'delete': [('directors', 'd')]
+        })
+
+    def test_export_writes_a_manifest(self):
+        with open(os.path.join(self.tmp.name, 'localStorage_backup.json'), 'w', encoding='utf-8') as f:
+            json.dump({'jkwi_data': json.dumps({'members': self.members[:3]})}, f)
+        with quiet():
+            export_path = self.tool.export_local_data()
+        manifest = self.tool.load_manifest(self.tool.manifest_path(export_path))
+        self.assertEqual(sorted(manifest['members']), ['m0', 'm1', 'm2'])
+        self.assertEqual(len(manifest['divisions']), 8)
+        self.assertTrue(export_path.name.endswith('.ndjson'))
+        with quiet():
+            self.assertTrue(self.tool.import_to_cloud(export_path))
+        self.assertEqual(sorted(self.db.data['members']), ['m0', 'm1', 'm2'])
+
+    def test_only_changes_are_pushed(self):
+        with quiet():
+            self.assertTrue(self.tool.import_incremental(self.export('first.json')))
+        self.assertEqual(len(self.db.data['members']), 50)
+
+        self.members[0] = {'id': 'm0', 'fullName': 'Renamed'}
+        del self.members[1]
+        self.members.append({'id': 'm50', 'fullName': 'New'})
+        self.db.writes = 0
+        with quiet():
+            self.assertTrue(self.tool.import_incremental(self.export('second.json')))
+        self.assertEqual(self.db.writes, 3)
+        self.assertEqual(self.db.data['members']['m0']['fullName'], 'Renamed')
+        self.assertNotIn('m1', self.db.data['members'])
+        self.assertIn('m50', self.db.data['members'])
+        log = list(self.db.data['activities'].values())[-1]
+        self.assertEqual(log['changes'], {'insert': 1, 'update': 1, 'delete': 1})
+
+        with quiet():
+            self.assertTrue(self.tool.import_incremental(self.export('third.json')))
+        self.assertEqual(self.db.writes, 3)
+
+    def test_failed_sync_keeps_the_baseline(self):
+        with quiet():
+            self.tool.import_incremental(self.export('first.json'))
+        del self.members[0]
+        self.db.fatal = True
+        with quiet():
+            self.assertFalse(self.tool.import_incremental(self.export('second.json')))
+        self.db.fatal = False
+        with quiet():
+            self.assertTrue(self.tool.import_incremental(self.export('third.json')))
+        self.assertNotIn('m0', self.db.data['members'])
+
+class TestVerifyMigration(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db = FakeFirestore()
+        self.tool = DataMigrationTool(firebase_db=self.db, local_data_path=self.tmp.name)
+        self.export_path = os.path.join(self.tmp.name, 'export.json')
+        with open(self.export_path, 'w', encoding='utf-8') as f:
+            json.dump({'company': {'name': 'JKWI'}, 'members': [{'id': f'm{i}'} for i in range(300)]}, f)
+        with quiet():
+            self.tool.import_to_cloud(self.export_path)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def verify(self, *args, **kwargs):
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            ok = self.tool.verify_migration(*args, **kwargs)
+        return ok, output.getvalue()
+
+    def test_matching_cloud_passes_without_streaming(self):
+        ok, output = self.verify(self.export_path, sample_size=300)
+        self.assertTrue(ok)
+        self.assertIn('members: 300/300 documents, 300/300 sampled match', output)
+        self.assertEqual(self.db.streamed, 0)
+        # Without an export it compares with the last synced one
+        self.assertTrue(self.verify()[0])
+
+    def test_changed_and_missing_documents_fail(self):
+        self.db.data['members']['m7'] = {'id': 'm7', 'fullName': 'Edited'}
+        ok, output = self.verify(self.export_path, sample_size=300)
+        self.assertFalse(ok)
+        self.assertIn('❌ members: 300/300 documents, 299/300 sampled match (differs: m7)', output)
+        del self.db.data['members']['m8']
+        ok, output = self.verify(self.export_path, sample_size=0)
+        self.assertFalse(ok)
+        self.assertIn('members: 299/300 documents', output)
+        self.assertIn('✅ company', output)
+
+    def test_falls_back_to_id_only_stream_without_count(self):
+        self.db.supports_count = False
+        self.assertTrue(self.verify(self.export_path)[0])
+        self.assertGreater(self.db.streamed, 0)
+
+if __name__ == '__main__':
+    unittest.main()
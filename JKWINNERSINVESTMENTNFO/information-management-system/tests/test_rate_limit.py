@@ -0,0 +1,105 @@
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), 'cloud-config'))
+
+from flask import Flask, jsonify
+
+from rate_limit import (ConcurrencyLimiter, MemoryBucketStore, RateLimiter, SQLiteBucketStore,
+                        init_rate_limiting, limit_names, parse_limits)
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+class TestRateLimit(unittest.TestCase):
+
+    def test_parse_limits(self):
+        self.assertEqual(parse_limits('login=10/min, read=off,batch=5/30'),
+                         {'login': (10, 60.0), 'read': None, 'batch': (5, 30.0)})
+
+    def test_bucket_refills_over_time(self):
+        clock = FakeClock()
+        store = MemoryBucketStore(clock=clock)
+        self.assertEqual([store.take('k', 1.0, 2)[0] for _ in range(3)], [True, True, False])
+        allowed, retry_after = store.take('k', 1.0, 2)
+        self.assertFalse(allowed)
+        self.assertAlmostEqual(retry_after, 1.0)
+        clock.now += 1
+        self.assertTrue(store.take('k', 1.0, 2)[0])
+
+    def test_sqlite_buckets_are_reconciled_between_workers(self):
+        clock = FakeClock()
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'state.db')
+            first, second = SQLiteBucketStore(path, clock=clock), SQLiteBucketStore(path, clock=clock)
+            self.assertEqual([first.take('k', 0.01, 3)[0] for _ in range(2)], [True, True])
+            # Decided locally until the next sync
+            self.assertTrue(second.take('k', 0.01, 3)[0])
+            clock.now += 1
+            first.sync()
+            allowed, retry_after = second.take('k', 0.01, 3)
+            self.assertFalse(allowed)
+            self.assertAlmostEqual(retry_after, 99.0, places=3)
+            clock.now += 1
+            self.assertFalse(first.take('k', 0.01, 3)[0])
+            self.assertTrue(second.take('other', 0.01, 3)[0])
+
+    def test_sqlite_store_ignores_spending_before_start(self):
+        clock = FakeClock()
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'state.db')
+            first = SQLiteBucketStore(path, clock=clock)
+            first.take('k', 0.01, 1)
+            first.sync(force=True)
+            self.assertTrue(SQLiteBucketStore(path, clock=clock).take('k', 0.01, 1)[0])
+
+    def test_endpoint_limit_overrides_group(self):
+        limiter = RateLimiter({'write': (1, 60.0), 'add_member': None})
+        names = limit_names('add_member', 'POST')
+        self.assertTrue(all(limiter.check(names, 'ip:1')[0] for _ in range(5)))
+        self.assertTrue(limiter.check(limit_names('update_member', 'PUT'), 'ip:1')[0])
+        self.assertFalse(limiter.check(limit_names('update_member', 'PUT'), 'ip:1')[0])
+
+    def test_concurrency_limiter_sheds_past_cap(self):
+        limiter = ConcurrencyLimiter(1)
+        self.assertTrue(limiter.acquire())
+        self.assertFalse(limiter.acquire())
+        limiter.release()
+        self.assertTrue(limiter.acquire())
+        self.assertEqual(limiter.stats()['shed'], 1)
+
+class TestLoginLimits(unittest.TestCase):
+
+    def setUp(self):
+        app = Flask(__name__)
+
+        @app.route('/api/login', methods=['POST'])
+        def login():
+            return jsonify({'error': 'Invalid credentials'}), 401
+
+        init_rate_limiting(app, RateLimiter({'login': (3, 60.0)}, store=MemoryBucketStore(clock=FakeClock())))
+        self.client = app.test_client()
+
+    def login(self, username, ip):
+        return self.client.post('/api/login', json={'username': username, 'password': 'guess'},
+                                environ_base={'REMOTE_ADDR': ip}).status_code
+
+    def test_account_bucket_trips_across_addresses(self):
+        statuses = [self.login('victim', f'10.0.0.{i}') for i in range(5)]
+        self.assertEqual(statuses, [401, 401, 401, 429, 429])
+        # Other accounts from a fresh address are unaffected
+        self.assertEqual(self.login('someone_else', '10.0.1.1'), 401)
+
+    def test_address_bucket_still_applies(self):
+        statuses = [self.login(f'user{i}', '10.0.0.1') for i in range(4)]
+        self.assertEqual(statuses, [401, 401, 401, 429])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+import io
+import os
+import sqlite3
+import sys
+import unittest
+from datetime import datetime
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), 'cloud-config'))
+
+from sql_bulk import SQLBulkWriter, configured_database_url, dialect_from_url
+
+ROWS = [
+    ["O'Brien", 'Line one\nline two', None, True, 12, {'city': "Cape Town", 'note': "it's"}],
+    ['Back\\slash', 'Tab\there', 'x', False, 7, ['a', 'b']],
+    ['Plain', '', 'y', True, 0, {}]
+]
+COLUMNS = ['name', 'notes', 'extra', 'active', 'score', 'details']
+
+class TestSQLBulkWriter(unittest.TestCase):
+
+    def write(self, rows, **kwargs):
+        output = io.StringIO()
+        writer = SQLBulkWriter(output, **kwargs)
+        writer.begin()
+        writer.create_table('people', [(column, 'INTEGER' if column in ('active', 'score') else 'TEXT')
+                                       for column in COLUMNS])
+        writer.write_table('people', COLUMNS, rows)
+        writer.commit()
+        return output.getvalue(), writer
+
+    def test_sqlite_round_trip(self):
+        script, writer = self.write(ROWS * 3, dialect='sqlite', batch_rows=4)
+        self.assertEqual(script.count('INSERT INTO people'), 3)
+        self.assertEqual(writer.rows_written, 9)
+        connection = sqlite3.connect(':memory:')
+        connection.executescript(script)
+        rows = connection.execute('SELECT name, notes, extra, active, score, details FROM people').fetchall()
+        self.assertEqual(rows[:2], [
+            ("O'Brien", 'Line one\nline two', None, 1, 12, '{"city": "Cape Town", "note": "it\'s"}'),
+            ('Back\\slash', 'Tab\there', 'x', 0, 7, '["a", "b"]')
+        ])
+
+    def test_postgresql_literals(self):
+        writer = SQLBulkWriter(io.StringIO(), dialect='postgresql')
+        self.assertEqual(writer.literal(True), 'TRUE')
+        self.assertEqual(writer.literal("O'Brien\x00"), "'O''Brien'")
+        self.assertEqual(writer.literal(float('nan')), 'NULL')
+        self.assertEqual(writer.literal(datetime(2026, 1, 2, 3, 4)), "'2026-01-02T03:04:00'")
+
+    def test_postgresql_copy(self):
+        script, _ = self.write(ROWS[:2], dialect='postgresql', copy=True)
+        self.assertIn('COPY people (name, notes, extra, active, score, details) FROM stdin;\n', script)
+        self.assertIn("O'Brien\tLine one\\nline two\t\\N\tt\t12\t", script)
+        self.assertIn('Back\\\\slash\tTab\\there\tx\tf\t7\t["a", "b"]\n\\.\nCOMMIT;\n', script)
+
+    def test_rejects_bad_input(self):
+        with self.assertRaises(ValueError):
+            SQLBulkWriter(io.StringIO(), dialect='sqlite', copy=True)
+        writer = SQLBulkWriter(io.StringIO(), dialect='sqlite')
+        writer.start_table('people', COLUMNS)
+        with self.assertRaises(ValueError):
+            writer.write_row(['too', 'few'])
+
+    def test_dialect_from_url(self):
+        self.assertEqual(dialect_from_url('sqlite:///database.db'), 'sqlite')
+        self.assertEqual(dialect_from_url('postgresql+psycopg2://user@host/jkwi'), 'postgresql')
+        with self.assertRaises(ValueError):
+            dialect_from_url('mysql://host/db')
+
+    def test_configured_database_url(self):
+        with mock.patch.dict(os.environ, {'DATABASE_URL': 'postgresql://host/jkwi'}):
+            self.assertEqual(configured_database_url(), 'postgresql://host/jkwi')
+        with mock.patch.dict(os.environ):
+            os.environ.pop('DATABASE_URL', None)
+            # The project's own settings
+            self.assertEqual(dialect_from_url(configured_database_url()), 'sqlite')
+            self.assertIsNone(configured_database_url('/nonexistent/settings.py'))
+
+if __name__ == '__main__':
+    unittest.main()
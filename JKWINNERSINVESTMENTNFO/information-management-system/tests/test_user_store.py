@@ -0,0 +1,90 @@
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), 'cloud-config'))
+
+from local_store import CollectionVersions
+from user_store import CachedUserRepository, DuplicateUserError, SQLiteUserRepository, public_user
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+def new_user(username, email=None):
+    return {'username': username, 'email': email or f'{username}@example.com',
+            'password_hash': 'hash', 'division': 'Gauteng', 'created_at': '2024-01-01T00:00:00'}
+
+class TestSQLiteUserRepository(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.repository = SQLiteUserRepository(os.path.join(self.tmp.name, 'state.db'))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_duplicates_are_rejected(self):
+        self.repository.create_user(new_user('alice'))
+        with self.assertRaises(DuplicateUserError) as raised:
+            self.repository.create_user(new_user('alice', 'other@example.com'))
+        self.assertEqual(raised.exception.field, 'username')
+        with self.assertRaises(DuplicateUserError) as raised:
+            self.repository.create_user(new_user('bob', 'ALICE@example.com'))
+        self.assertEqual(raised.exception.field, 'email')
+
+    def test_public_user_only_returns_allowed_fields(self):
+        self.repository.create_user(new_user('alice'))
+        self.repository.record_login_attempt('alice', success=False)
+        user = public_user(self.repository.get_user('alice'))
+        self.assertNotIn('password_hash', user)
+        self.assertNotIn('failed_login_attempts', user)
+        self.assertFalse(user['is_admin'])
+
+class TestCachedUserRepository(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        path = os.path.join(self.tmp.name, 'state.db')
+        self.clock = FakeClock()
+        # Two workers sharing one state database
+        self.workers = [
+            CachedUserRepository(SQLiteUserRepository(path), ttl=60, versions=CollectionVersions(path),
+                                 sync_interval=1.0, clock=self.clock)
+            for _ in range(2)
+        ]
+        self.workers[0].create_user(new_user('alice'))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_cached_account_is_served_without_the_store(self):
+        first, _ = self.workers
+        first.get_user('alice')
+        first.get_user('alice')
+        self.assertEqual(first.stats()['hits'], 1)
+
+    def test_change_in_another_worker_evicts_cached_account(self):
+        first, second = self.workers
+        self.assertTrue(first.get_user('alice')['is_active'])
+        second.update_user('alice', {'is_active': False})
+        self.assertFalse(second.get_user('alice')['is_active'])
+        # Still cached until the next sync with the shared counter
+        self.assertTrue(first.get_user('alice')['is_active'])
+        self.clock.now += 1.0
+        self.assertFalse(first.get_user('alice')['is_active'])
+
+    def test_entries_expire_after_ttl(self):
+        first, _ = self.workers
+        first.get_user('alice')
+        self.clock.now += 61
+        first.get_user('alice')
+        self.assertEqual(first.stats()['misses'], 2)
+
+if __name__ == '__main__':
+    unittest.main()